@@ -0,0 +1,55 @@
+from app.state import WorkflowState
+from app.agents.content_agent import _clean_text
+from app.services.reddit_service import afetch_reddit_comments, fetch_reddit_comments
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _clean_comments(comments: list[dict]) -> list[dict]:
+    cleaned = []
+    for comment in comments:
+        body = _clean_text(comment["body"])
+        if body:
+            cleaned.append({"author": comment["author"], "score": comment["score"], "body": body})
+    return cleaned
+
+
+def extract_comments(state: WorkflowState) -> WorkflowState:
+    """
+    Selects the top comments of the post by score.
+
+    Tasks:
+    - Walk the comment tree (bounded depth, top-K by score, byte budget)
+    - Expand "more" stubs with batched /api/morechildren calls
+    - Clean comment bodies like the post body
+
+    Comments are supplementary: a failure here is logged and the pipeline
+    continues with no comments rather than short-circuiting. Skipped (no
+    request) when state["fetch_comments"] is False.
+
+    Sets:
+    - state["comments"]
+    """
+    if not state.get("fetch_comments", True):
+        return {**state, "comments": []}
+    try:
+        comments = fetch_reddit_comments(state["user_url"])
+        return {**state, "comments": _clean_comments(comments)}
+
+    except Exception:
+        logger.exception("Comment extraction failed for url=%s; continuing without comments", state.get("user_url"))
+        return {**state, "comments": []}
+
+
+async def aextract_comments(state: WorkflowState) -> WorkflowState:
+    """Async counterpart of extract_comments()."""
+    if not state.get("fetch_comments", True):
+        return {**state, "comments": []}
+    try:
+        comments = await afetch_reddit_comments(state["user_url"])
+        return {**state, "comments": _clean_comments(comments)}
+
+    except Exception:
+        logger.exception("Comment extraction failed for url=%s; continuing without comments", state.get("user_url"))
+        return {**state, "comments": []}
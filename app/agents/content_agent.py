@@ -1,40 +1,94 @@
+import hashlib
 import re
 from app.state import WorkflowState
-from app.services.reddit_service import fetch_reddit_post
+from app.services.reddit_service import afetch_reddit_post, fetch_reddit_post
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+# Precompiled patterns for _clean_text. Entities are decoded in one pass:
+# "&amp;lt;" style double escapes decode to "<" exactly as the old sequential
+# str.replace chain did ("&amp;" first, then the rest).
+_ENTITY_CHARS = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "#39": "'", "nbsp": " "}
+_ENTITY_RE = re.compile(r"&amp;(lt|gt|quot|#39|nbsp);|&(amp|lt|gt|quot|#39|nbsp);")
+_MD_LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_URL_RE = re.compile(r"https?://\S+")
+# Same matches as (\*{1,3}|_{1,3})(.*?)\1, but the literal first character lets
+# the regex engine skip ahead to candidate positions
+_EMPHASIS_RE = re.compile(r"\*(\*{0,2})(.*?)\*\1|_(_{0,2})(.*?)_\3")
+_BLANK_LINES_RE = re.compile(r"\n\n\n+")
+
+
+def _decode_entity(match: re.Match) -> str:
+    return _ENTITY_CHARS[match.group(1) or match.group(2)]
+
+
 def _clean_text(raw: str) -> str:
     """
     Removes HTML entities, Markdown artifacts, and normalizes whitespace.
+
+    Each pass is skipped when the text cannot match it (no "&", no "](", ...),
+    so plain selftexts are barely copied.
     """
     # Decode common HTML entities
-    html_entities = {
-        "&amp;": "&", "&lt;": "<", "&gt;": ">",
-        "&quot;": '"', "&#39;": "'", "&nbsp;": " ",
-    }
-    for entity, char in html_entities.items():
-        raw = raw.replace(entity, char)
+    if "&" in raw:
+        raw = _ENTITY_RE.sub(_decode_entity, raw)
 
     # Strip Markdown links: [text](url) → text
-    raw = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", raw)
+    if "](" in raw:
+        raw = _MD_LINK_RE.sub(r"\1", raw)
 
     # Strip standalone URLs
-    raw = re.sub(r"https?://\S+", "", raw)
+    if "://" in raw:
+        raw = _URL_RE.sub("", raw)
 
     # Remove bold/italic markers
-    raw = re.sub(r"(\*{1,3}|_{1,3})(.*?)\1", r"\2", raw)
+    if "*" in raw or "_" in raw:
+        raw = _EMPHASIS_RE.sub(r"\2\4", raw)
 
     # Normalize whitespace and newlines
-    raw = re.sub(r"\r\n|\r", "\n", raw)
-    raw = re.sub(r"\n{3,}", "\n\n", raw)
+    if "\r" in raw:
+        raw = raw.replace("\r\n", "\n").replace("\r", "\n")
+    if "\n\n\n" in raw:
+        raw = _BLANK_LINES_RE.sub("\n\n", raw)
     raw = raw.strip()
 
     return raw
 
 
+def _post_body(post_data: dict) -> str:
+    """Returns the cleaned body text of a Reddit post object."""
+    raw_content = post_data.get("selftext", "")
+
+    # Link posts have no selftext body
+    if not raw_content or raw_content in ("[removed]", "[deleted]"):
+        # Fall back to the post URL hint so the LLM still has context
+        raw_content = f"[Link post — no text body. Post URL: {post_data.get('url', '')}]"
+
+    return _clean_text(raw_content)
+
+
+def _hash_content(title: str, content: str) -> str:
+    return hashlib.sha256(f"{title.strip()}\n{content}".encode("utf-8")).hexdigest()
+
+
+def post_content_hash(post_data: dict) -> str:
+    """
+    SHA-256 of a post's title and cleaned body.
+
+    Matches state["content_hash"] after extract_content, so a changed hash
+    means the post was edited since it was last processed.
+    """
+    return _hash_content(post_data.get("title", ""), _post_body(post_data))
+
+
+def _content_update(state: WorkflowState, post_data: dict) -> WorkflowState:
+    cleaned = _post_body(post_data)
+    content_hash = _hash_content(post_data.get("title", ""), cleaned)
+    return {**state, "content": cleaned, "content_hash": content_hash}
+
+
 def extract_content(state: WorkflowState) -> WorkflowState:
     """
     Retrieves and cleans the main post body text.
@@ -45,24 +99,29 @@ def extract_content(state: WorkflowState) -> WorkflowState:
     - Normalize spacing
 
     MVP scope:
-    - Ignores comments
+    - Comments are handled by comments_agent
     - Ignores media attachments
 
     Sets:
     - state["content"]
+    - state["content_hash"]
     - state["error"] on failure
     """
     try:
-        post_data = fetch_reddit_post(state["user_url"])
-        raw_content = post_data.get("selftext", "")
+        # Reuse the post fetched by fetch_agent; fall back to the (cached) service
+        post_data = state.get("post_data") or fetch_reddit_post(state["user_url"])
+        return _content_update(state, post_data)
 
-        # Link posts have no selftext body
-        if not raw_content or raw_content in ("[removed]", "[deleted]"):
-            # Fall back to the post URL hint so the LLM still has context
-            raw_content = f"[Link post — no text body. Post URL: {post_data.get('url', '')}]"
+    except Exception as exc:
+        logger.exception("Content extraction failed for url=%s", state.get("user_url"))
+        return {**state, "error": f"Content extraction failed: {exc}"}
 
-        cleaned = _clean_text(raw_content)
-        return {**state, "content": cleaned}
+
+async def aextract_content(state: WorkflowState) -> WorkflowState:
+    """Async counterpart of extract_content()."""
+    try:
+        post_data = state.get("post_data") or await afetch_reddit_post(state["user_url"])
+        return _content_update(state, post_data)
 
     except Exception as exc:
         logger.exception("Content extraction failed for url=%s", state.get("user_url"))
@@ -0,0 +1,39 @@
+from app.state import WorkflowState
+from app.services.reddit_service import afetch_reddit_post, fetch_reddit_post
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def fetch_post(state: WorkflowState) -> WorkflowState:
+    """
+    Fetches the Reddit thread once for all extraction nodes.
+
+    The post object goes to state["post_data"]; the comment listing of the
+    same response lands in the comment cache for comments_agent. Skipped when
+    the post is already known (e.g. from a subreddit listing).
+
+    Sets:
+    - state["post_data"]
+    - state["error"] on failure
+    """
+    if state.get("post_data"):
+        return state
+    try:
+        return {**state, "post_data": fetch_reddit_post(state["user_url"])}
+
+    except Exception as exc:
+        logger.exception("Post fetch failed for url=%s", state.get("user_url"))
+        return {**state, "error": f"Post fetch failed: {exc}"}
+
+
+async def afetch_post(state: WorkflowState) -> WorkflowState:
+    """Async counterpart of fetch_post()."""
+    if state.get("post_data"):
+        return state
+    try:
+        return {**state, "post_data": await afetch_reddit_post(state["user_url"])}
+
+    except Exception as exc:
+        logger.exception("Post fetch failed for url=%s", state.get("user_url"))
+        return {**state, "error": f"Post fetch failed: {exc}"}
@@ -0,0 +1,97 @@
+import time
+from typing import Callable
+
+from app.services.ollama_service import achat_ollama, astream_ollama, chat_ollama, stream_ollama
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# on_token(node_name, chunk) — passed via config["configurable"]["on_token"]
+TokenCallback = Callable[[str, str], None]
+
+
+def get_token_callback(config: dict | None) -> TokenCallback | None:
+    """Returns the token callback from a LangGraph/runnable config, if any."""
+    if not config:
+        return None
+    return (config.get("configurable") or {}).get("on_token")
+
+
+def generate(node: str, request: dict, config: dict | None = None) -> tuple[str, float | None, dict]:
+    """
+    Runs one Ollama chat request for `node`.
+
+    When the run config carries an on_token callback the response is streamed
+    and every chunk is forwarded to it as it arrives; otherwise a single
+    blocking call is made.
+
+    Returns:
+        tuple: (response text, time-to-first-token in seconds or None if not
+        streamed, generation stats tagged with the node — see call_record())
+    """
+    on_token = get_token_callback(config)
+    if on_token is None:
+        content, stats = chat_ollama(**request)
+        return content, None, call_record(node, stats)
+
+    started = time.perf_counter()
+    ttft = None
+    parts: list[str] = []
+    stats: dict = {}
+    for chunk in stream_ollama(**request, on_stats=stats.update):
+        if ttft is None:
+            ttft = time.perf_counter() - started
+            logger.info("First token for node=%s after %.2fs", node, ttft)
+        parts.append(chunk)
+        on_token(node, chunk)
+    return _join(parts), ttft, call_record(node, stats, request["model"])
+
+
+async def agenerate(node: str, request: dict, config: dict | None = None) -> tuple[str, float | None, dict]:
+    """Async counterpart of generate()."""
+    on_token = get_token_callback(config)
+    if on_token is None:
+        content, stats = await achat_ollama(**request)
+        return content, None, call_record(node, stats)
+
+    started = time.perf_counter()
+    ttft = None
+    parts: list[str] = []
+    stats: dict = {}
+    async for chunk in astream_ollama(**request, on_stats=stats.update):
+        if ttft is None:
+            ttft = time.perf_counter() - started
+            logger.info("First token for node=%s after %.2fs", node, ttft)
+        parts.append(chunk)
+        on_token(node, chunk)
+    return _join(parts), ttft, call_record(node, stats, request["model"])
+
+
+def _join(parts: list[str]) -> str:
+    text = "".join(parts).strip()
+    if not text:
+        raise ValueError("Ollama returned an empty streamed response.")
+    return text
+
+
+def with_ttft(state: dict, node: str, ttft: float | None) -> dict:
+    """Returns state["ttft"] extended with this node's time-to-first-token."""
+    timings = dict(state.get("ttft") or {})
+    if ttft is not None:
+        timings[node] = round(ttft, 3)
+    return timings
+
+
+def call_record(node: str, stats: dict, model: str = "") -> dict:
+    """
+    Returns one state["llm_calls"] entry: the node plus Ollama's statistics.
+
+    A stream that ended without a final stats line is recorded with the
+    requested model only.
+    """
+    return {"node": node, "model": model, **stats}
+
+
+def with_llm_calls(state: dict, *calls: dict) -> list:
+    """Returns state["llm_calls"] extended with these calls' records."""
+    return [*(state.get("llm_calls") or []), *calls]
@@ -1,12 +1,10 @@
 import json
 from app.state import WorkflowState
+from app.agents.token_budget import OLLAMA_NUM_CTX, fit_payload, payload_token_budget
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
-# Maximum character length for content sent to the LLM
-MAX_CONTENT_LENGTH = 4000
-
 
 def build_structured_json(state: WorkflowState) -> WorkflowState:
     """
@@ -15,11 +13,14 @@ def build_structured_json(state: WorkflowState) -> WorkflowState:
 
     Rules:
     - No null/empty values allowed
-    - Content is truncated if it exceeds MAX_CONTENT_LENGTH
+    - Payload is sized to the OLLAMA_NUM_CTX token budget: lowest-scored
+      comments are dropped first, then content is truncated
+    - Top comments are included only when any were extracted
     - Output is serialization-safe (pure Python dict)
 
     Sets:
     - state["structured_json"]
+    - state["payload_tokens"]
     - state["error"] on failure
     """
     try:
@@ -32,19 +33,14 @@ def build_structured_json(state: WorkflowState) -> WorkflowState:
         if not content:
             content = "[No text content available for this post.]"
 
-        # Truncate long content with a clear marker
-        if len(content) > MAX_CONTENT_LENGTH:
-            content = content[:MAX_CONTENT_LENGTH] + " ... [truncated]"
-
-        payload = {
-            "title": title,
-            "content": content,
-        }
+        budget = payload_token_budget(OLLAMA_NUM_CTX)
+        payload, tokens = fit_payload(title, content, state.get("comments") or [], budget)
+        logger.debug("Structured payload uses ~%d of %d budgeted tokens", tokens, budget)
 
         # Validate serialization before storing
         json.dumps(payload)
 
-        return {**state, "structured_json": payload}
+        return {**state, "structured_json": payload, "payload_tokens": tokens}
 
     except Exception as exc:
         logger.exception("JSON structuring failed for state title=%s", state.get("title"))
@@ -1,59 +1,206 @@
-import json
+import asyncio
 import os
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.runnables import RunnableConfig
 from app.state import WorkflowState
-from app.services.ollama_service import call_ollama
+from app.agents.generation import agenerate, call_record, generate, with_llm_calls, with_ttft
+from app.agents.token_budget import (
+    ANALYSIS_OUTPUT_TOKENS,
+    OLLAMA_NUM_CTX,
+    TRUNCATION_MARKER,
+    compact_json,
+    estimate_tokens,
+    split_into_chunks,
+)
+from app.services.ollama_service import achat_ollama, chat_ollama
+from app.registry import get_prompt
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
-PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+# "auto" switches to map-reduce only when the post body did not fit the payload
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "auto")  # auto | single | map_reduce
+MAP_CONCURRENCY = int(os.getenv("OLLAMA_MAP_CONCURRENCY", "4"))
+CHUNK_OUTPUT_TOKENS = int(os.getenv("CHUNK_OUTPUT_TOKENS", "512"))
+MIN_CHUNK_OUTPUT_TOKENS = 64
 
+# llm_calls node name of the per-chunk calls in map-reduce mode
+MAP_NODE = "llm_analysis.map"
 
-def _load_prompt(filename: str) -> str:
-    """Load a prompt template from the prompts directory."""
-    path = PROMPTS_DIR / filename
-    if not path.exists():
-        raise FileNotFoundError(f"Prompt file not found: {path}")
-    return path.read_text(encoding="utf-8").strip()
 
+def _model_settings() -> dict:
+    model = os.getenv("OLLAMA_MODEL_LOCAL", "")
+    # model = os.getenv("OLLAMA_MODEL_CLOUD", "glm-5:cloud")
+    api_key = os.getenv("OLLAMA_API_KEY", "")
+    return {
+        "model": model,
+        "api_key": api_key or None,
+        "temperature": 0.5,
+        "num_ctx": OLLAMA_NUM_CTX,
+    }
 
-def run_llm_analysis(state: WorkflowState) -> WorkflowState:
+
+def _build_request(state: WorkflowState) -> dict:
+    """Builds the call_ollama keyword arguments for the analysis call."""
+    system_prompt = get_prompt("system_prompt.txt").text
+
+    # Inject structured JSON into user prompt
+    json_str = compact_json(state["structured_json"])
+    user_prompt = get_prompt("user_prompt.txt").render(STRUCTURED_JSON=json_str)
+
+    return {
+        **_model_settings(),
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+    }
+
+
+def _use_map_reduce(state: WorkflowState) -> bool:
+    if ANALYSIS_MODE == "map_reduce":
+        return True
+    if ANALYSIS_MODE == "single":
+        return False
+    return state["structured_json"].get("content", "").endswith(TRUNCATION_MARKER)
+
+
+def _map_requests(state: WorkflowState) -> list[dict]:
+    """Splits the full post body and builds one notes request per chunk."""
+    title = state["structured_json"].get("title", "")
+    system_prompt = get_prompt("chunk_system_prompt.txt").text
+    template = get_prompt("chunk_user_prompt.txt")
+
+    chunk_tokens = (
+        OLLAMA_NUM_CTX
+        - estimate_tokens(system_prompt + template.text + title)
+        - CHUNK_OUTPUT_TOKENS
+    )
+    chunks = split_into_chunks(state.get("content", ""), max(256, chunk_tokens))
+
+    # Size each part's notes so that all of them fit in the reduce prompt
+    reduce_budget = (
+        OLLAMA_NUM_CTX
+        - estimate_tokens(get_prompt("system_prompt.txt").text + get_prompt("reduce_user_prompt.txt").text)
+        - estimate_tokens(compact_json(_reduce_payload(state)))
+        - ANALYSIS_OUTPUT_TOKENS
+    )
+    notes_tokens = max(MIN_CHUNK_OUTPUT_TOKENS, min(CHUNK_OUTPUT_TOKENS, reduce_budget // max(1, len(chunks))))
+
+    return [
+        {
+            **_model_settings(),
+            "system_prompt": system_prompt,
+            "user_prompt": template.render(TITLE=title, PART=str(i), TOTAL=str(len(chunks)), CHUNK=chunk),
+            "num_predict": notes_tokens,
+        }
+        for i, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def _reduce_payload(state: WorkflowState) -> dict:
+    return {k: v for k, v in state["structured_json"].items() if k != "content"}
+
+
+def _reduce_request(state: WorkflowState, notes: list[str]) -> dict:
+    """Builds the request that merges per-chunk notes into the four-section analysis."""
+    partial = "\n\n".join(f"#### Part {i}\n{text}" for i, text in enumerate(notes, start=1))
+    user_prompt = get_prompt("reduce_user_prompt.txt").render(
+        TOTAL=str(len(notes)),
+        STRUCTURED_JSON=compact_json(_reduce_payload(state)),
+        PARTIAL_ANALYSES=partial,
+    )
+    return {
+        **_model_settings(),
+        "system_prompt": get_prompt("system_prompt.txt").text,
+        "user_prompt": user_prompt,
+    }
+
+
+def _map_reduce(state: WorkflowState, config: RunnableConfig | None) -> tuple[str, float | None, list[dict]]:
+    requests = _map_requests(state)
+    logger.info("Map-reduce analysis: %d chunks, concurrency=%d", len(requests), MAP_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=max(1, min(MAP_CONCURRENCY, len(requests)))) as pool:
+        results = list(pool.map(lambda request: chat_ollama(**request), requests))
+    notes = [result.content for result in results]
+    response, ttft, stats = generate("llm_analysis", _reduce_request(state, notes), config)
+    return response, ttft, [call_record(MAP_NODE, result.stats) for result in results] + [stats]
+
+
+async def _amap_reduce(state: WorkflowState, config: RunnableConfig | None) -> tuple[str, float | None, list[dict]]:
+    requests = _map_requests(state)
+    logger.info("Map-reduce analysis: %d chunks, concurrency=%d", len(requests), MAP_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, MAP_CONCURRENCY))
+
+    async def _notes(request: dict):
+        async with semaphore:
+            return await achat_ollama(**request)
+
+    results = await asyncio.gather(*(_notes(request) for request in requests))
+    notes = [result.content for result in results]
+    response, ttft, stats = await agenerate("llm_analysis", _reduce_request(state, notes), config)
+    return response, ttft, [call_record(MAP_NODE, result.stats) for result in results] + [stats]
+
+
+def run_llm_analysis(state: WorkflowState, config: RunnableConfig | None = None) -> WorkflowState:
     """
     Sends the structured JSON payload to the local Ollama LLM.
 
     Responsibilities:
-    - Load system prompt from prompts/system_prompt.txt
+    - Load system prompt from prompts/system_prompt.txt (cached by app.registry)
     - Inject structured_json into the user prompt template
     - Call Ollama and capture the response
 
+    Long posts (ANALYSIS_MODE=auto and the body was truncated, or
+    ANALYSIS_MODE=map_reduce) are analysed map-reduce style instead: the full
+    body is split on paragraph boundaries, up to OLLAMA_MAP_CONCURRENCY chunks
+    are summarised in parallel, and a final call merges the notes into the
+    usual four-section analysis.
+
     Design principle:
     - LLM receives normalized structured data — never raw scraped HTML.
 
+    Streams tokens to config["configurable"]["on_token"] when provided.
+
     Sets:
     - state["llm_response"]
+    - state["analysis_chunks"] (1 for a single-pass analysis)
+    - state["ttft"]["llm_analysis"] when streamed
+    - state["llm_calls"] (appends the generation stats of every call made)
     - state["error"] on failure
     """
     try:
-        system_prompt = _load_prompt("system_prompt.txt")
-        user_prompt_template = _load_prompt("user_prompt.txt")
-
-        # Inject structured JSON into user prompt
-        json_str = json.dumps(state["structured_json"], indent=2, ensure_ascii=False)
-        user_prompt = user_prompt_template.replace("{{STRUCTURED_JSON}}", json_str)
-
-        model = os.getenv("OLLAMA_MODEL_LOCAL", "")
-        # model = os.getenv("OLLAMA_MODEL_CLOUD", "glm-5:cloud")
-        api_key = os.getenv("OLLAMA_API_KEY", "")
-        response = call_ollama(
-            model=model,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            api_key=api_key or None,
-            temperature=0.5,
-        )
-
-        return {**state, "llm_response": response}
+        if _use_map_reduce(state):
+            response, ttft, calls = _map_reduce(state, config)
+        else:
+            response, ttft, stats = generate("llm_analysis", _build_request(state), config)
+            calls = [stats]
+        return {
+            **state,
+            "llm_response": response,
+            "analysis_chunks": max(1, len(calls) - 1),
+            "ttft": with_ttft(state, "llm_analysis", ttft),
+            "llm_calls": with_llm_calls(state, *calls),
+        }
+
+    except Exception as exc:
+        logger.exception("LLM analysis failed for title=%s", state.get("title"))
+        return {**state, "error": f"LLM analysis failed: {exc}"}
+
+
+async def arun_llm_analysis(state: WorkflowState, config: RunnableConfig | None = None) -> WorkflowState:
+    """Async counterpart of run_llm_analysis()."""
+    try:
+        if _use_map_reduce(state):
+            response, ttft, calls = await _amap_reduce(state, config)
+        else:
+            response, ttft, stats = await agenerate("llm_analysis", _build_request(state), config)
+            calls = [stats]
+        return {
+            **state,
+            "llm_response": response,
+            "analysis_chunks": max(1, len(calls) - 1),
+            "ttft": with_ttft(state, "llm_analysis", ttft),
+            "llm_calls": with_llm_calls(state, *calls),
+        }
 
     except Exception as exc:
         logger.exception("LLM analysis failed for title=%s", state.get("title"))
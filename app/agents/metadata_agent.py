@@ -1,34 +1,52 @@
 from app.state import WorkflowState
-from app.services.reddit_service import fetch_reddit_post
+from app.services.reddit_service import afetch_reddit_post, fetch_reddit_post
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _metadata_update(state: WorkflowState, post_data: dict) -> WorkflowState:
+    title = post_data.get("title", "").strip()
+    upvotes = int(post_data.get("score", 0))
+
+    if not title:
+        return {**state, "error": "Could not extract post title from Reddit response."}
+
+    return {**state, "post_data": post_data, "title": title, "upvotes": upvotes}
+
+
 def extract_metadata(state: WorkflowState) -> WorkflowState:
     """
-    Fetches and extracts post metadata from Reddit.
+    Extracts post metadata from the post fetched by fetch_agent.
 
     Extracts:
     - Post title
     - Upvote count (score)
 
-    Only handles metadata — content parsing is delegated to content_agent.
+    Only handles metadata — content parsing is delegated to content_agent,
+    which runs in parallel. When called outside the graph without a fetched
+    post, the post is fetched here and kept in state["post_data"].
 
     Sets:
+    - state["post_data"]
     - state["title"]
     - state["upvotes"]
     - state["error"] on failure
     """
     try:
-        post_data = fetch_reddit_post(state["user_url"])
-        title = post_data.get("title", "").strip()
-        upvotes = int(post_data.get("score", 0))
+        post_data = state.get("post_data") or fetch_reddit_post(state["user_url"])
+        return _metadata_update(state, post_data)
 
-        if not title:
-            return {**state, "error": "Could not extract post title from Reddit response."}
+    except Exception as exc:
+        logger.exception("Metadata extraction failed for url=%s", state.get("user_url"))
+        return {**state, "error": f"Metadata extraction failed: {exc}"}
 
-        return {**state, "title": title, "upvotes": upvotes}
+
+async def aextract_metadata(state: WorkflowState) -> WorkflowState:
+    """Async counterpart of extract_metadata()."""
+    try:
+        post_data = state.get("post_data") or await afetch_reddit_post(state["user_url"])
+        return _metadata_update(state, post_data)
 
     except Exception as exc:
         logger.exception("Metadata extraction failed for url=%s", state.get("user_url"))
@@ -1,57 +1,83 @@
 import os
-from pathlib import Path
+from langchain_core.runnables import RunnableConfig
 from app.state import WorkflowState
-from app.services.ollama_service import call_ollama
+from app.agents.generation import agenerate, generate, with_llm_calls, with_ttft
+from app.agents.token_budget import OLLAMA_NUM_CTX, compact_json
+from app.registry import get_prompt
 
-PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
 
+def _model_settings() -> dict:
+    model = os.getenv("OLLAMA_MODEL_CLOUD", "glm-5:cloud")
+    api_key = os.getenv("OLLAMA_API_KEY", "")
+    return {
+        "model": model,
+        "api_key": api_key or None,
+        "temperature": 0.7,
+        "num_ctx": OLLAMA_NUM_CTX,
+    }
 
-def _load_prompt(filename: str) -> str:
-    path = PROMPTS_DIR / filename
-    if not path.exists():
-        raise FileNotFoundError(f"Prompt file not found: {path}")
-    return path.read_text(encoding="utf-8").strip()
 
+def _build_request(state: WorkflowState) -> dict:
+    """Builds the call_ollama keyword arguments for the story call."""
+    system_prompt = get_prompt("story_system_prompt.txt").text
 
-def run_story_writer(state: WorkflowState) -> WorkflowState:
+    json_str = compact_json(state["structured_json"])
+    # Empty when the story runs in parallel with the analysis (fast story mode)
+    llm_analysis = state.get("llm_response") or "No analysis available."
+
+    user_prompt = get_prompt("story_user_prompt.txt").render(
+        STRUCTURED_JSON=json_str,
+        LLM_ANALYSIS=llm_analysis,
+    )
+
+    return {
+        **_model_settings(),
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+    }
+
+
+def run_story_writer(state: WorkflowState, config: RunnableConfig | None = None) -> WorkflowState:
     """
     Takes the structured JSON and LLM analysis and generates
     a polished, publishable horror short story.
 
     Requires:
     - state["structured_json"]
-    - state["llm_response"]
+    - state["llm_response"] (optional: empty in fast story mode, where the
+      story is written in parallel with the analysis)
+
+    Streams tokens to config["configurable"]["on_token"] when provided.
 
     Sets:
     - state["story"]
+    - state["ttft"]["story_writer"] when streamed
+    - state["llm_calls"] (appends this call's generation stats)
     - state["error"] on failure
     """
     try:
-        import json
+        story, ttft, stats = generate("story_writer", _build_request(state), config)
+        return {
+            **state,
+            "story": story,
+            "ttft": with_ttft(state, "story_writer", ttft),
+            "llm_calls": with_llm_calls(state, stats),
+        }
 
-        system_prompt = _load_prompt("story_system_prompt.txt")
-        user_prompt_template = _load_prompt("story_user_prompt.txt")
-
-        json_str = json.dumps(state["structured_json"], indent=2, ensure_ascii=False)
-        llm_analysis = state.get("llm_response", "No analysis available.")
-
-        user_prompt = (
-            user_prompt_template
-            .replace("{{STRUCTURED_JSON}}", json_str)
-            .replace("{{LLM_ANALYSIS}}", llm_analysis)
-        )
+    except Exception as exc:
+        return {**state, "error": f"Story writer failed: {exc}"}
 
-        model = os.getenv("OLLAMA_MODEL_CLOUD", "glm-5:cloud")
-        api_key = os.getenv("OLLAMA_API_KEY", "")
-        story = call_ollama(
-            model=model,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            api_key=api_key or None,
-            temperature=0.7,
-        )
 
-        return {**state, "story": story}
+async def arun_story_writer(state: WorkflowState, config: RunnableConfig | None = None) -> WorkflowState:
+    """Async counterpart of run_story_writer()."""
+    try:
+        story, ttft, stats = await agenerate("story_writer", _build_request(state), config)
+        return {
+            **state,
+            "story": story,
+            "ttft": with_ttft(state, "story_writer", ttft),
+            "llm_calls": with_llm_calls(state, stats),
+        }
 
     except Exception as exc:
-        return {**state, "error": f"Story writer failed: {exc}"}
\ No newline at end of file
+        return {**state, "error": f"Story writer failed: {exc}"}
@@ -0,0 +1,149 @@
+import json
+import os
+from app.registry import get_prompt
+
+# Context window the prompts are sized for; also sent to Ollama as options.num_ctx
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "8192"))
+
+# Tokens reserved for generated output
+ANALYSIS_OUTPUT_TOKENS = int(os.getenv("ANALYSIS_OUTPUT_TOKENS", "1024"))
+STORY_OUTPUT_TOKENS = int(os.getenv("STORY_OUTPUT_TOKENS", "3500"))  # ~2,000 words
+
+# Rough tokenizer-agnostic estimate: BPE vocabularies average ~4 UTF-8 bytes per
+# token on English prose; counting bytes also charges non-Latin text more.
+BYTES_PER_TOKEN = 4.0
+
+TRUNCATION_MARKER = " ... [truncated]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token-count estimate for `text`."""
+    return int(len(text.encode("utf-8")) / BYTES_PER_TOKEN) + 1
+
+
+def compact_json(payload: dict) -> str:
+    """Serializes a payload without indentation or padding whitespace."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def _prompt_overhead(*filenames: str) -> int:
+    return sum(estimate_tokens(get_prompt(name).text) for name in filenames)
+
+
+def payload_token_budget(num_ctx: int = OLLAMA_NUM_CTX) -> int:
+    """
+    Tokens available for the structured JSON payload.
+
+    The payload is embedded in both LLM calls, so the budget is the smaller of:
+    - analysis: num_ctx − analysis prompts − analysis output
+    - story:    num_ctx − story prompts − embedded analysis − story output
+    """
+    analysis = num_ctx - _prompt_overhead("system_prompt.txt", "user_prompt.txt") - ANALYSIS_OUTPUT_TOKENS
+    story = (
+        num_ctx
+        - _prompt_overhead("story_system_prompt.txt", "story_user_prompt.txt")
+        - ANALYSIS_OUTPUT_TOKENS
+        - STORY_OUTPUT_TOKENS
+    )
+    return max(256, min(analysis, story))
+
+
+def _truncate_to_tokens(text: str, tokens: int) -> str:
+    max_bytes = max(0, int(tokens * BYTES_PER_TOKEN) - len(TRUNCATION_MARKER.encode("utf-8")))
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", errors="ignore").rstrip() + TRUNCATION_MARKER
+
+
+def fit_payload(title: str, content: str, comments: list[dict], budget: int) -> tuple[dict, int]:
+    """
+    Builds the largest {"title", "content", "comments"} payload within `budget` tokens.
+
+    Lowest-scored comments are dropped first; if the post body alone still does
+    not fit, it is cut to the remaining budget with a truncation marker.
+
+    Returns:
+        tuple: (payload, estimated tokens of its compact serialization)
+    """
+    payload = {"title": title, "content": content}
+    kept = sorted(comments, key=lambda c: c.get("score", 0), reverse=True)
+    if kept:
+        payload["comments"] = kept
+
+    tokens = estimate_tokens(compact_json(payload))
+    while tokens > budget and kept:
+        kept.pop()
+        if kept:
+            payload["comments"] = kept
+        else:
+            payload.pop("comments")
+        tokens = estimate_tokens(compact_json(payload))
+
+    if tokens > budget:
+        without_content = estimate_tokens(compact_json({"title": title, "content": ""}))
+        payload["content"] = _truncate_to_tokens(content, budget - without_content)
+        tokens = estimate_tokens(compact_json(payload))
+
+    return payload, tokens
+
+
+def split_into_chunks(text: str, max_tokens: int) -> list[str]:
+    """
+    Splits text into consecutive chunks of at most ~max_tokens each.
+
+    Paragraphs (blank-line separated) are packed greedily and never split
+    unless a single paragraph exceeds the limit, in which case it is cut on
+    line or word boundaries where possible.
+    """
+    max_bytes = max(1, int(max_tokens * BYTES_PER_TOKEN))
+    chunks: list[str] = []
+    current: list[str] = []
+    current_bytes = 0
+
+    def _flush():
+        nonlocal current, current_bytes
+        if current:
+            chunks.append("\n\n".join(current))
+        current, current_bytes = [], 0
+
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        size = len(paragraph.encode("utf-8"))
+        if size > max_bytes:
+            _flush()
+            chunks.extend(_split_oversized(paragraph, max_bytes))
+            continue
+        if current and current_bytes + 2 + size > max_bytes:
+            _flush()
+        current.append(paragraph)
+        current_bytes += size + (2 if current_bytes else 0)
+    _flush()
+    return chunks
+
+
+def _split_oversized(paragraph: str, max_bytes: int) -> list[str]:
+    pieces = []
+    encoded = paragraph.encode("utf-8")
+    while len(encoded) > max_bytes:
+        # Back the byte cut off to a character boundary (never inside a multibyte
+        # sequence); take one whole character if even that does not fit
+        end = max_bytes
+        while end and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        if end == 0:
+            end = 1
+            while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+                end += 1
+        window = encoded[:end].decode("utf-8")
+        cut = max(window.rfind("\n"), window.rfind(" "))
+        if cut <= 0:
+            cut = len(window)
+        head = window[:cut]
+        pieces.append(head.strip())
+        encoded = encoded[len(head.encode("utf-8")):].lstrip()
+    if encoded:
+        pieces.append(encoded.decode("utf-8"))
+    return [p for p in pieces if p]
@@ -0,0 +1,245 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.logger import get_logger
+from app.metrics import record_job
+from app.registry import get_workflow
+from app.services.reddit_service import reserve_comment_cache
+from app.services.results_store import results_store
+from app.singleflight import pipeline_key
+from app.state import initial_state, public_result
+
+logger = get_logger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # pipelines run concurrently
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "900"))  # seconds a finished result is reused
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "256"))  # finished jobs kept in memory
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "32"))  # jobs waiting for a worker; 0 = unbounded
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "error"
+
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit() when `max_queued` jobs are already waiting."""
+
+
+class PipelineJob:
+    """
+    One pipeline run, observable from other threads while it runs.
+
+    Progress comes from the compiled graph's streamed task events: `nodes`
+    maps each node that started to its status ("running", "done", "error")
+    and elapsed seconds, and LLM output is collected per node as it streams.
+    The same progress is kept as an ordered event log ("node", "token" and a
+    final "done" event) for subscribers such as the API's SSE stream.
+    """
+
+    def __init__(self, url: str, key: tuple | None = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.url = url
+        self.key = key
+        self.status = PENDING
+        self.nodes: dict[str, dict] = {}
+        self.result: dict | None = None
+        self.submitted_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self._chunks: dict[str, list[str]] = {}
+        self._events: list[tuple[str, dict]] = []
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Blocks until the run has finished; False on timeout."""
+        return self._done.wait(timeout)
+
+    def _emit(self, event: str, data: dict) -> None:
+        """Appends to the event log and wakes subscribers. Hold self._lock."""
+        self._events.append((event, data))
+        self._changed.notify_all()
+
+    def events_since(self, index: int, timeout: float | None = None) -> tuple[list[tuple[str, dict]], bool]:
+        """
+        Returns the events after the first `index` ones, waiting up to
+        `timeout` seconds when there are none yet, and whether the log is
+        complete (the job has finished).
+        """
+        with self._changed:
+            if len(self._events) <= index and self.finished_at is None:
+                self._changed.wait(timeout)
+            return self._events[index:], self.finished_at is not None
+
+    def _on_token(self, node: str, chunk: str) -> None:
+        with self._lock:
+            self._chunks.setdefault(node, []).append(chunk)
+            self._emit("token", {"node": node, "text": chunk})
+
+    def _on_task(self, event: dict) -> None:
+        node = event["name"]
+        with self._lock:
+            if "input" in event:
+                self.nodes[node] = {"status": RUNNING, "elapsed": None, "started": time.monotonic()}
+                self._emit("node", {"node": node, "status": RUNNING})
+                return
+            entry = self.nodes.setdefault(node, {"started": time.monotonic()})
+            changes = event.get("result") or {}
+            failed = event.get("error") is not None or bool(changes.get("error"))
+            entry["status"] = FAILED if failed else DONE
+            # Prefer the node's own measurement over the time between stream events
+            entry["elapsed"] = (changes.get("timings") or {}).get(node, time.monotonic() - entry["started"])
+            self._emit("node", {"node": node, "status": entry["status"], "elapsed": entry["elapsed"]})
+
+    def run(self, app=None) -> dict:
+        """Drives the graph to completion on the calling thread; returns the final state."""
+        if app is None:
+            app = get_workflow()
+        with self._lock:
+            self.status = RUNNING
+            self.started_at = time.time()
+
+        state = initial_state(self.url)
+        config = {"configurable": {"on_token": self._on_token}}
+        try:
+            for mode, chunk in app.stream(state, config=config, stream_mode=["tasks", "values"]):
+                if mode == "values":
+                    state = chunk
+                else:
+                    self._on_task(chunk)
+        except Exception as exc:
+            logger.exception("Pipeline job %s crashed for url=%s", self.id, self.url)
+            state = {**state, "error": f"Pipeline crashed: {exc}"}
+
+        with self._lock:
+            self.result = state
+            self.status = FAILED if state.get("error") else DONE
+            self.finished_at = time.time()
+            self._emit("done", {"status": self.status, "result": public_result(state)})
+        self._done.set()
+        return state
+
+    def snapshot(self) -> dict:
+        """Consistent copy of the job's progress, safe to render from another thread."""
+        with self._lock:
+            end = self.finished_at or time.time()
+            return {
+                "id": self.id,
+                "url": self.url,
+                "status": self.status,
+                "nodes": {
+                    node: {"status": entry["status"], "elapsed": entry["elapsed"]}
+                    for node, entry in self.nodes.items()
+                },
+                "text": {node: "".join(chunks) for node, chunks in self._chunks.items()},
+                "error": (self.result or {}).get("error"),
+                "elapsed": round(end - self.started_at, 3) if self.started_at else None,
+            }
+
+
+class JobManager:
+    """
+    Runs pipelines as background jobs on a bounded thread pool.
+
+    Submitting a post that already has a running job with the same settings
+    (see app.singleflight.pipeline_key) returns that job, so several viewers
+    follow one run. Successful results are reused for `result_ttl` seconds;
+    the `max_finished` most recently finished jobs (failed ones included)
+    stay available through get(). New runs are refused with
+    QueueFull while `max_queued` jobs are waiting for a worker. Finished
+    results are saved to the results store.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        result_ttl: float = JOB_RESULT_TTL,
+        max_finished: int = JOB_MAX_FINISHED,
+        max_queued: int = JOB_MAX_QUEUED,
+    ):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        reserve_comment_cache(workers)
+        self._jobs: dict[str, PipelineJob] = {}
+        self._latest: dict[tuple, PipelineJob] = {}  # pipeline key → most recent job
+        self._lock = threading.Lock()
+
+    def _reusable(self, job: PipelineJob) -> bool:
+        if not job.finished:
+            return True
+        return job.status == DONE and time.time() - job.finished_at < self.result_ttl
+
+    def _prune(self) -> None:
+        """
+        Forgets the oldest finished jobs beyond `max_finished`. Hold self._lock.
+
+        Failed and expired jobs stay visible (to sessions and GET /jobs/<id>)
+        until they are pruned by count; expiry only stops submit() reusing them.
+        """
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+            if self._latest.get(job.key) is job:
+                del self._latest[job.key]
+
+    def submit(self, url: str, fast_story: bool | None = None, rerun: bool = False) -> PipelineJob:
+        """
+        Starts a pipeline job for `url`, or returns the running (or recently
+        finished) job for the same post and settings. `rerun` forces a new
+        run unless one is already in flight.
+
+        Raises:
+            QueueFull: If a new run is needed and the queue is at capacity.
+        """
+        app = get_workflow(fast_story)
+        key = pipeline_key(url, graph=app)
+        with self._lock:
+            job = self._latest.get(key)
+            if job is not None and self._reusable(job) and not (rerun and job.finished):
+                record_job("attached")
+                return job
+            queued = self._count(PENDING)
+            if self.max_queued and queued >= self.max_queued:
+                record_job("rejected")
+                raise QueueFull(f"{queued} jobs are already waiting for a worker")
+            self._prune()
+            job = PipelineJob(url.strip(), key)
+            self._jobs[job.id] = job
+            self._latest[key] = job
+        record_job("started")
+        self._executor.submit(self._run, job, app)
+        return job
+
+    @staticmethod
+    def _run(job: PipelineJob, app) -> None:
+        results_store.add(job.run(app))
+
+    def _count(self, status: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == status)
+
+    def stats(self) -> dict:
+        """Worker and queue occupancy, for health checks."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "pending": self._count(PENDING),
+                "running": self._count(RUNNING),
+                "finished": sum(1 for job in self._jobs.values() if job.finished),
+            }
+
+    def get(self, job_id: str) -> PipelineJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -3,11 +3,12 @@ import os
 import sys
 
 
-def configure_logging(level: str | int | None = None) -> None:
+def configure_logging(level: str | int | None = None, stream=None) -> None:
     """Configure root logger for the application.
 
     This sets a simple console handler and a sensible default format.
     Calling multiple times will reset existing handlers to avoid duplicates.
+    Logs go to stdout unless another `stream` (e.g. sys.stderr) is given.
     """
     if level is None:
         level = os.getenv("LOG_LEVEL", "INFO")
@@ -23,7 +24,7 @@ def configure_logging(level: str | int | None = None) -> None:
     for h in list(root.handlers):
         root.removeHandler(h)
 
-    handler = logging.StreamHandler(sys.stdout)
+    handler = logging.StreamHandler(stream or sys.stdout)
     handler.setFormatter(logging.Formatter(fmt))
     root.addHandler(handler)
     root.setLevel(level)
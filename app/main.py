@@ -5,21 +5,62 @@ Reddit LangGraph MVP — Entry Point
 Usage:
     python -m app.main
     python -m app.main --url "https://www.reddit.com/r/Python/comments/abc123/my_post/"
+    python -m app.main --urls-file urls.txt --workers 16 > results.ndjson
+    cat urls.txt | python -m app.main --urls-file -
+    python -m app.main --urls-file urls.txt --async --workers 200
+    python -m app.main --subreddit nosleep --sort top --time-filter week --min-score 500
+    python -m app.main --urls-file urls.txt --metrics-port 9100
+    python -m app.main --url "..." --fast-story
 
 Environment variables:
     OLLAMA_MODEL     Ollama model to use (default: llama3.2)
     OLLAMA_BASE_URL  Ollama server URL   (default: http://localhost:11434)
+    OLLAMA_KEEP_ALIVE  How long Ollama keeps models loaded (default: 30m)
+    OLLAMA_WARMUP    Preload the pipeline models at startup (default: 1)
+    METRICS_PORT     Serve Prometheus metrics on this port (default: off)
+    METRICS_HOST     Address the metrics endpoint listens on (default: 127.0.0.1)
+    FAST_STORY       Write the story in parallel with the analysis (default: 0)
+    RESULTS_DB_PATH  SQLite file results are stored in (default: .cache/results.sqlite3)
 """
 
 import argparse
+import asyncio
 import json
+import os
 import sys
-from app.logger import get_logger
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Iterator, TextIO, Union
+from app.logger import configure_logging, get_logger
 
 logger = get_logger(__name__)
 
-from app.state import initial_state
-from app.workflow import build_workflow
+from app.state import initial_state, public_result
+from app.metrics import METRICS_HOST, start_metrics_server
+from app.registry import get_workflow, start_warm_up
+from app.services.http_client import close_async_clients, set_concurrency_limit
+from app.services.llm_cache import llm_cache
+from app.services.ollama_pool import get_ollama_pool
+from app.services.ollama_service import summarize_generation
+from app.services.rate_limit import reddit_rate_limiter
+from app.services.results_store import results_store
+from app.singleflight import pipeline_flight, pipeline_key
+from app.workflow import FAST_STORY
+from app.agents.content_agent import post_content_hash
+from app.services.checkpoints import UNCHANGED, CheckpointStore
+from app.services.reddit_service import (
+    LISTING_COMMENTS,
+    LISTING_SORTS,
+    LISTING_TIME_FILTERS,
+    iter_subreddit_posts,
+    post_url,
+    reserve_comment_cache,
+    subreddit_name,
+)
+
+# A batch item is either a post URL or a post object from a subreddit listing
+BatchItem = Union[str, dict]
 
 
 def parse_args() -> argparse.Namespace:
@@ -38,15 +79,441 @@ def parse_args() -> argparse.Namespace:
         dest="output_json",
         help="Output the full result as JSON instead of formatted text",
     )
+    parser.add_argument(
+        "--no-stream",
+        action="store_false",
+        dest="stream",
+        help="Wait for complete LLM responses instead of printing tokens as they arrive",
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_false",
+        dest="llm_cache",
+        help="Bypass the persistent LLM response cache and always call Ollama",
+    )
+    parser.add_argument(
+        "--no-store-results",
+        action="store_false",
+        dest="store_results",
+        help="Do not save results to the results store (see python -m app.results)",
+    )
+    parser.add_argument(
+        "--no-warmup",
+        action="store_false",
+        dest="warmup",
+        help="Do not preload the Ollama models before the first request",
+    )
+    parser.add_argument(
+        "--fast-story",
+        action="store_true",
+        default=FAST_STORY,
+        help="Write the story in parallel with the analysis (faster; the story prompt gets no analysis)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.getenv("METRICS_PORT", "0")),
+        help=f"Serve Prometheus metrics at http://{METRICS_HOST}:PORT/metrics while running "
+             "(METRICS_HOST sets the address; default: off)",
+    )
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument(
+        "--urls-file",
+        type=str,
+        default=None,
+        help="File with one Reddit post URL per line ('-' reads stdin); results are written as NDJSON",
+    )
+    batch.add_argument(
+        "--subreddit",
+        type=str,
+        default=None,
+        help="Crawl a subreddit listing and analyse its posts (results are written as NDJSON)",
+    )
+    batch.add_argument(
+        "--sort",
+        choices=LISTING_SORTS,
+        default="new",
+        help="Listing to crawl with --subreddit (default: new)",
+    )
+    batch.add_argument(
+        "--time-filter",
+        choices=LISTING_TIME_FILTERS,
+        default=None,
+        help="Time window for --sort top",
+    )
+    batch.add_argument(
+        "--since-hours",
+        type=float,
+        default=None,
+        help="Only crawl posts created within the last N hours",
+    )
+    batch.add_argument(
+        "--min-score",
+        type=int,
+        default=None,
+        help="Only crawl posts with at least this score",
+    )
+    batch.add_argument(
+        "--max-posts",
+        type=int,
+        default=None,
+        help="Stop crawling after this many posts",
+    )
+    batch.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --subreddit: skip posts already processed with unchanged content (checkpointed on disk)",
+    )
+    batch.add_argument(
+        "--listing-comments",
+        action="store_true",
+        default=LISTING_COMMENTS,
+        help="With --subreddit: also extract comments, at one extra Reddit request per post "
+             "(default: analyse listing posts without comments)",
+    )
+    batch.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of pipelines run concurrently in batch mode (default: 8)",
+    )
+    batch.add_argument(
+        "--async",
+        action="store_true",
+        dest="use_async",
+        help="Run the batch on a single asyncio event loop instead of a thread pool",
+    )
+    batch.add_argument(
+        "--reddit-concurrency",
+        type=int,
+        default=4,
+        help="Max concurrent Reddit requests in batch mode (default: 4)",
+    )
+    batch.add_argument(
+        "--ollama-concurrency",
+        type=int,
+        default=2,
+        help="Max concurrent Ollama requests in batch mode (default: 2)",
+    )
     return parser.parse_args()
 
 
-def run_pipeline(url: str) -> dict:
-    """Execute the full LangGraph pipeline for a given URL."""
-    state = initial_state(url)
-    app = build_workflow()
-    result = app.invoke(state)
-    return result
+def run_pipeline(
+    url: str,
+    app=None,
+    on_token=None,
+    post_data: dict | None = None,
+    coalesce: bool = True,
+    fetch_comments: bool = True,
+) -> dict:
+    """
+    Execute the full LangGraph pipeline for a given URL.
+
+    Uses the process-wide compiled graph unless another one is passed as `app`.
+    Pass `on_token(node, chunk)` to stream LLM output as it is generated, and
+    `post_data` when the post object is already known (skips the Reddit fetch),
+    and `fetch_comments=False` to run without comments (no thread request).
+
+    Concurrent calls for the same post and graph share one run (see
+    app.singleflight); a caller that attaches to a run in flight gets its
+    result but not its streamed tokens. `coalesce=False` always runs.
+    """
+    state = initial_state(url, post_data, fetch_comments)
+    if app is None:
+        app = get_workflow()
+    config = {"configurable": {"on_token": on_token}} if on_token else None
+    if not coalesce:
+        return app.invoke(state, config=config)
+    key = pipeline_key(url, graph=app, comments=fetch_comments)
+    result, _ = pipeline_flight.do(key, app.invoke, state, config=config)
+    return {**result}
+
+
+async def arun_pipeline(
+    url: str,
+    app=None,
+    post_data: dict | None = None,
+    coalesce: bool = True,
+    fetch_comments: bool = True,
+) -> dict:
+    """Async counterpart of run_pipeline(), driving the graph with ainvoke()."""
+    state = initial_state(url, post_data, fetch_comments)
+    if app is None:
+        app = get_workflow()
+    if not coalesce:
+        return await app.ainvoke(state)
+    key = pipeline_key(url, graph=app, comments=fetch_comments)
+    result, _ = await pipeline_flight.ado(key, app.ainvoke, state)
+    return {**result}
+
+
+def _read_urls(stream: TextIO) -> Iterable[str]:
+    """Yields non-empty, non-comment lines from a URL list."""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _unpack(item: BatchItem) -> tuple[str, dict | None]:
+    """Returns (url, post_data) for a batch item."""
+    if isinstance(item, dict):
+        return post_url(item), item
+    return item, None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _write_record(out: TextIO, result: dict, elapsed: float) -> None:
+    record = {**public_result(result), "elapsed_seconds": round(elapsed, 3)}
+    out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    out.flush()
+
+
+def _add_llm_calls(llm_calls: list[dict], counted: set[int], result: dict) -> None:
+    """
+    Collects a result's LLM call records once per run: coalesced results
+    share the same record objects. `counted` holds the ids of collected ones.
+    """
+    for call in result.get("llm_calls") or []:
+        if id(call) not in counted:
+            counted.add(id(call))
+            llm_calls.append(call)
+
+
+def _batch_summary(latencies: list[float], failed: int, wall: float, llm_calls: list[dict]) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies)
+    return {
+        "total": total,
+        "succeeded": total - failed,
+        "failed": failed,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_min": round(total / wall * 60, 2) if wall else 0.0,
+        "latency_p50": round(_percentile(latencies, 50), 3),
+        "latency_p95": round(_percentile(latencies, 95), 3),
+        "latency_max": round(latencies[-1], 3) if latencies else 0.0,
+        "llm_models": summarize_generation(llm_calls),
+    }
+
+
+def run_batch(
+    urls: Iterable[BatchItem],
+    workers: int = 8,
+    out: TextIO = sys.stdout,
+    on_result: Callable[[dict], None] | None = None,
+    app=None,
+    listing_comments: bool = LISTING_COMMENTS,
+) -> dict:
+    """
+    Runs the pipeline for every URL (or listing post) through a bounded worker pool.
+
+    The compiled graph (`app`, default: the process-wide one) is shared by all workers. At most 2 × workers
+    URLs are pending at a time, so arbitrarily long inputs are read lazily.
+    Each result is written to `out` as one JSON line as soon as it completes,
+    and passed to `on_result` if given. Listing posts get comments only with
+    `listing_comments` (one thread request per post).
+
+    Returns:
+        dict: Throughput and latency summary for the batch.
+    """
+    if app is None:
+        app = get_workflow()
+    latencies: list[float] = []
+    llm_calls: list[dict] = []
+    counted: set[int] = set()
+    failed = 0
+    started = time.perf_counter()
+
+    def _run(item: BatchItem) -> tuple[dict, float]:
+        t0 = time.perf_counter()
+        url, post_data = _unpack(item)
+        try:
+            result = run_pipeline(
+                url, app=app, post_data=post_data, fetch_comments=post_data is None or listing_comments,
+            )
+        except Exception as exc:
+            logger.exception("Pipeline crashed for url=%s", url)
+            result = {"user_url": url, "error": f"Pipeline crashed: {exc}"}
+        return result, time.perf_counter() - t0
+
+    def _emit(result: dict, elapsed: float) -> None:
+        nonlocal failed
+        latencies.append(elapsed)
+        _add_llm_calls(llm_calls, counted, result)
+        if result.get("error"):
+            failed += 1
+        _write_record(out, result, elapsed)
+        if on_result is not None:
+            on_result(result)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pipeline") as pool:
+        pending = set()
+        for url in urls:
+            pending.add(pool.submit(_run, url))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _emit(*future.result())
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _emit(*future.result())
+
+    return _batch_summary(latencies, failed, time.perf_counter() - started, llm_calls)
+
+
+async def arun_batch(
+    urls: Iterable[BatchItem],
+    workers: int = 100,
+    out: TextIO = sys.stdout,
+    on_result: Callable[[dict], None] | None = None,
+    app=None,
+    listing_comments: bool = LISTING_COMMENTS,
+) -> dict:
+    """
+    Async counterpart of run_batch(): up to `workers` pipelines are in flight
+    on the running event loop at once, with no thread per post.
+    """
+    if app is None:
+        app = get_workflow()
+    latencies: list[float] = []
+    llm_calls: list[dict] = []
+    counted: set[int] = set()
+    failed = 0
+    started = time.perf_counter()
+
+    async def _run(item: BatchItem) -> tuple[dict, float]:
+        t0 = time.perf_counter()
+        url, post_data = _unpack(item)
+        try:
+            result = await arun_pipeline(
+                url, app=app, post_data=post_data, fetch_comments=post_data is None or listing_comments,
+            )
+        except Exception as exc:
+            logger.exception("Pipeline crashed for url=%s", url)
+            result = {"user_url": url, "error": f"Pipeline crashed: {exc}"}
+        return result, time.perf_counter() - t0
+
+    def _emit(result: dict, elapsed: float) -> None:
+        nonlocal failed
+        latencies.append(elapsed)
+        _add_llm_calls(llm_calls, counted, result)
+        if result.get("error"):
+            failed += 1
+        _write_record(out, result, elapsed)
+        if on_result is not None:
+            on_result(result)
+
+    try:
+        pending = set()
+        for url in urls:
+            pending.add(asyncio.create_task(_run(url)))
+            if len(pending) >= workers:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    _emit(*task.result())
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                _emit(*task.result())
+    finally:
+        await close_async_clients()
+
+    return _batch_summary(latencies, failed, time.perf_counter() - started, llm_calls)
+
+
+def print_batch_summary(summary: dict, stream: TextIO = sys.stderr) -> None:
+    print("\n" + "=" * 60, file=stream)
+    print("  BATCH SUMMARY", file=stream)
+    print("=" * 60, file=stream)
+    print(f"Posts      : {summary['total']:,} ({summary['succeeded']:,} ok, {summary['failed']:,} failed)", file=stream)
+    print(f"Wall time  : {summary['wall_seconds']:.1f}s", file=stream)
+    print(f"Throughput : {summary['throughput_per_min']:.1f} posts/min", file=stream)
+    print(
+        f"Latency    : p50 {summary['latency_p50']:.1f}s · p95 {summary['latency_p95']:.1f}s"
+        f" · max {summary['latency_max']:.1f}s",
+        file=stream,
+    )
+    crawl = summary.get("crawl")
+    if crawl and crawl.get("incremental"):
+        resumed = f" · resumed after {crawl['resumed_from']}" if crawl.get("resumed_from") else ""
+        print(
+            f"Crawl      : {crawl.get('new', 0):,} new · {crawl.get('edited', 0):,} edited"
+            f" · {crawl.get('unchanged', 0):,} unchanged (skipped){resumed}",
+            file=stream,
+        )
+    if crawl:
+        print(
+            "Comments   : " + (
+                "extracted (one thread request per post)" if crawl["comments"]
+                else "not extracted for listing posts (--listing-comments to include them)"
+            ),
+            file=stream,
+        )
+    limiter = summary.get("reddit_rate_limit")
+    if limiter:
+        print(
+            f"Reddit     : {limiter['requests']:,} requests · {limiter['throttled']:,} throttled"
+            f" · waited {limiter['total_wait_seconds']:.1f}s total (max {limiter['max_wait_seconds']:.1f}s)",
+            file=stream,
+        )
+    coalesced = summary.get("coalesced")
+    if coalesced and coalesced["shared"]:
+        print(
+            f"Coalesced  : {coalesced['shared']:,} duplicate posts shared an in-flight run"
+            f" ({coalesced['runs']:,} runs started)",
+            file=stream,
+        )
+    stored = summary.get("results_store")
+    if stored and stored["enabled"]:
+        print(f"Stored     : {stored['stored']:,} results in {stored['path']}", file=stream)
+    cache = summary.get("llm_cache")
+    if cache and cache["enabled"]:
+        print(
+            f"LLM cache  : {cache['hits']:,} hits · {cache['misses']:,} misses"
+            f" ({cache['hit_rate']:.0%}) · {cache['entries']:,} entries",
+            file=stream,
+        )
+    for host in summary.get("ollama_hosts") or []:
+        print(
+            f"Ollama     : {host['url']} · {host['requests']:,} requests · {host['errors']:,} errors"
+            + (" · ejected" if host["ejected"] else ""),
+            file=stream,
+        )
+    print_llm_models(summary.get("llm_models") or {}, stream)
+    print("=" * 60, file=stream)
+
+
+def print_llm_models(models: dict, stream: TextIO = sys.stderr) -> None:
+    """Prints per-model prompt/generation throughput from summarize_generation()."""
+    for model, totals in models.items():
+        prompt_rate, eval_rate = totals["prompt_tokens_per_second"], totals["eval_tokens_per_second"]
+        print(
+            f"Model      : {model} · {totals['calls']:,} calls ({totals['cached']:,} cached)"
+            f" · load {totals['load_seconds']:.1f}s",
+            file=stream,
+        )
+        print(
+            f"             prompt {totals['prompt_tokens']:,} tok"
+            f" @ {f'{prompt_rate:,.0f} tok/s' if prompt_rate else 'n/a'}"
+            f" · generation {totals['eval_tokens']:,} tok"
+            f" @ {f'{eval_rate:,.1f} tok/s' if eval_rate else 'n/a'}",
+            file=stream,
+        )
+
+
+SECTION_HEADERS = {
+    "structured_json": "── Structured JSON Payload ──────────────────────────────",
+    "llm_analysis":    "── LLM Analysis ─────────────────────────────────────────",
+    "story_writer":    "── Generated Story ──────────────────────────────────────",
+}
 
 
 def pretty_print(result: dict) -> None:
@@ -61,20 +528,216 @@ def pretty_print(result: dict) -> None:
     print(f"\n📌  Title   : {result.get('title', 'N/A')}")
     print(f"⬆️   Upvotes : {result.get('upvotes', 0):,}")
 
-    print("\n── Structured JSON Payload ──────────────────────────────")
+    print("\n" + SECTION_HEADERS["structured_json"])
     print(json.dumps(result.get("structured_json", {}), indent=2, ensure_ascii=False))
 
-    print("\n── LLM Analysis ─────────────────────────────────────────")
+    print("\n" + SECTION_HEADERS["llm_analysis"])
     print(result.get("llm_response", "No response."))
 
-    print("\n── Generated Story ──────────────────────────────────────")
+    print("\n" + SECTION_HEADERS["story_writer"])
     print(result.get("story", "No story generated."))
 
+    print()
+    print_llm_models(summarize_generation(result.get("llm_calls", [])), sys.stdout)
+    print("=" * 60 + "\n")
+
+
+def stream_pretty_print(url: str, app=None) -> dict:
+    """
+    Runs the pipeline and renders the same report as pretty_print(), but
+    progressively: each section is printed as soon as its node finishes and
+    LLM text is printed token by token as Ollama streams it.
+
+    In fast story mode the analysis and the story are generated at the same
+    time. Only one of them streams live; the other is buffered and printed
+    once the live section is complete.
+    """
+    lock = threading.Lock()
+    live: list[str] = []            # node currently streaming to stdout (at most one)
+    queued: dict[str, dict] = {}    # node -> {"chunks": [...], "text": final text or None}
+
+    def _promote() -> None:
+        while not live and queued:
+            node = next(iter(queued))
+            entry = queued.pop(node)
+            print("\n" + SECTION_HEADERS[node])
+            if entry["text"] is not None:
+                print("".join(entry["chunks"]) or entry["text"])
+            else:
+                print("".join(entry["chunks"]), end="", flush=True)
+                live.append(node)
+
+    def on_token(node: str, chunk: str) -> None:
+        with lock:
+            if not live and not queued:
+                live.append(node)
+                print("\n" + SECTION_HEADERS[node])
+            if live and live[0] == node:
+                print(chunk, end="", flush=True)
+            else:
+                queued.setdefault(node, {"chunks": [], "text": None})["chunks"].append(chunk)
+
+    def on_done(node: str, text: str) -> None:
+        with lock:
+            if live and live[0] == node:
+                print()
+                live.clear()
+            else:
+                queued.setdefault(node, {"chunks": [], "text": None})["text"] = text
+            _promote()
+
+    print("\n" + "=" * 60)
+    print("  REDDIT LANGGRAPH MVP — ANALYSIS RESULT")
+    print("=" * 60)
+
+    if app is None:
+        app = get_workflow()
+    result = initial_state(url)
+    config = {"configurable": {"on_token": on_token}}
+    # "updates" carry each node's changes as it finishes; "values" the merged state
+    for mode, chunk in app.stream(result, config=config, stream_mode=["updates", "values"]):
+        if mode == "values":
+            result = chunk
+            continue
+        for node, changes in chunk.items():
+            view = {**result, **(changes or {})}
+            if view.get("error"):
+                continue
+            if node == "extract_metadata":
+                print(f"\n📌  Title   : {view.get('title', 'N/A')}")
+                print(f"⬆️   Upvotes : {view.get('upvotes', 0):,}")
+            elif node == "build_json":
+                print("\n" + SECTION_HEADERS["structured_json"])
+                print(json.dumps(view.get("structured_json", {}), indent=2, ensure_ascii=False))
+            elif node in ("llm_analysis", "story_writer"):
+                key = "llm_response" if node == "llm_analysis" else "story"
+                on_done(node, view.get(key, ""))
+
+    if result.get("error"):
+        print(f"\n❌  Pipeline failed: {result['error']}")
+        return result
+
+    for node, seconds in result.get("ttft", {}).items():
+        logger.info("Time to first token for %s: %.2fs", node, seconds)
+    print()
+    print_llm_models(summarize_generation(result.get("llm_calls", [])), sys.stdout)
     print("=" * 60 + "\n")
+    return result
+
+
+def _skip_unchanged(posts: Iterable[dict], store: CheckpointStore, stats: dict) -> Iterator[dict]:
+    """Drops listing posts whose content hash matches the last processed version."""
+    for post in posts:
+        decision = store.classify(post.get("name", ""), post_content_hash(post))
+        stats[decision] = stats.get(decision, 0) + 1
+        if decision != UNCHANGED:
+            yield post
+
+
+def _checkpoint_result(store: CheckpointStore) -> Callable[[dict], None]:
+    def _record(result: dict) -> None:
+        post = result.get("post_data") or {}
+        if result.get("error") or not post.get("name"):
+            return
+        store.record(post.get("subreddit", ""), post["name"], post.get("created_utc", 0), result["content_hash"])
+    return _record
+
+
+def _combine(*callbacks: Callable[[dict], None] | None) -> Callable[[dict], None]:
+    active = [callback for callback in callbacks if callback is not None]
+
+    def _call(result: dict) -> None:
+        for callback in active:
+            callback(result)
+    return _call
+
+
+def main_batch(args: argparse.Namespace) -> int:
+    # stdout carries the NDJSON results, so keep log lines off it
+    configure_logging(stream=sys.stderr)
+    set_concurrency_limit("reddit", args.reddit_concurrency)
+    set_concurrency_limit("ollama", args.ollama_concurrency)
+    reserve_comment_cache(args.workers)
+
+    on_result = None
+    crawl_stats: dict = {}
+    if args.incremental:
+        if not args.subreddit:
+            logger.error("--incremental requires --subreddit")
+            return 1
+        store = CheckpointStore()
+        on_result = _checkpoint_result(store)
+
+    on_result = _combine(on_result, results_store.add)
+    app = get_workflow(fast_story=args.fast_story)
+
+    def _run(urls: Iterable[BatchItem]) -> dict:
+        if args.use_async:
+            return asyncio.run(arun_batch(
+                urls, workers=args.workers, on_result=on_result, app=app, listing_comments=args.listing_comments,
+            ))
+        return run_batch(
+            urls, workers=args.workers, on_result=on_result, app=app, listing_comments=args.listing_comments,
+        )
+
+    if args.subreddit:
+        since = time.time() - args.since_hours * 3600 if args.since_hours else None
+        if args.incremental and since is None and args.sort == "new":
+            # Resume where the last crawl stopped: the newest listing page ends the crawl
+            checkpoint = store.checkpoint(subreddit_name(args.subreddit))
+            if checkpoint:
+                since = checkpoint["newest_created_utc"]
+                crawl_stats["resumed_from"] = checkpoint["newest_fullname"]
+                logger.info(
+                    "Resuming r/%s after %s (checkpointed %s)",
+                    subreddit_name(args.subreddit), checkpoint["newest_fullname"],
+                    time.strftime("%Y-%m-%d %H:%M", time.localtime(checkpoint["updated_at"])),
+                )
+        posts = iter_subreddit_posts(
+            args.subreddit,
+            sort=args.sort,
+            time_filter=args.time_filter,
+            since=since,
+            min_score=args.min_score,
+            max_posts=args.max_posts,
+        )
+        if args.incremental:
+            posts = _skip_unchanged(posts, store, crawl_stats)
+        summary = _run(posts)
+    elif args.urls_file == "-":
+        summary = _run(_read_urls(sys.stdin))
+    else:
+        with open(args.urls_file, encoding="utf-8") as fh:
+            summary = _run(_read_urls(fh))
+
+    if args.subreddit:
+        summary["crawl"] = {**crawl_stats, "incremental": args.incremental, "comments": args.listing_comments}
+    summary["llm_cache"] = llm_cache.stats()
+    summary["reddit_rate_limit"] = reddit_rate_limiter.snapshot()
+    summary["coalesced"] = pipeline_flight.stats()
+    results_store.flush()
+    summary["results_store"] = results_store.snapshot()
+    if get_ollama_pool().multi_host:
+        summary["ollama_hosts"] = get_ollama_pool().snapshot()
+    print_batch_summary(summary)
+    return 0 if not summary["failed"] else 1
 
 
 def main() -> int:
     args = parse_args()
+    if not args.llm_cache:
+        llm_cache.enabled = False
+    if not args.store_results:
+        results_store.enabled = False
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    # Models load while the URL is typed or the batch input is opened
+    warmer = start_warm_up() if args.warmup else None
+
+    if args.urls_file or args.subreddit:
+        if warmer:
+            warmer.join()
+        return main_batch(args)
 
     url = args.url
     if not url:
@@ -83,14 +746,21 @@ def main() -> int:
     if not url:
         logger.error("No URL provided by user")
         return 1
+    if warmer:
+        warmer.join()
     logger.info("Running pipeline for: %s", url)
-    result = run_pipeline(url)
+    app = get_workflow(fast_story=args.fast_story)
 
     if args.output_json:
-        print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        result = run_pipeline(url, app=app)
+        print(json.dumps(public_result(result), indent=2, ensure_ascii=False, default=str))
+    elif args.stream:
+        result = stream_pretty_print(url, app=app)
     else:
+        result = run_pipeline(url, app=app)
         pretty_print(result)
 
+    results_store.add(result)
     return 0 if not result.get("error") else 1
 
 
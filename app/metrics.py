@@ -0,0 +1,286 @@
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# /metrics has no authentication; bind a public address (0.0.0.0) only on a trusted network
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Seconds; spans fast parsing nodes up to slow cloud LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[tuple[str, str], ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key → [per-bucket counts..., sum, count]
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observes the duration of the `with` block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = self._header()
+        for key, series in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                labels = _format_labels(key + (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+NODE_SECONDS = REGISTRY.register(Histogram(
+    "pipeline_node_duration_seconds", "Time spent in each pipeline node.", ("node",)))
+NODE_ERRORS = REGISTRY.register(Counter(
+    "pipeline_node_errors_total", "Node runs that ended with state['error'] set.", ("node",)))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Outbound HTTP request latency, including streamed bodies.", ("service",)))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "Outbound HTTP requests by response status.", ("service", "status")))
+HTTP_BYTES = REGISTRY.register(Counter(
+    "http_response_bytes_total", "Response body bytes received.", ("service",)))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit/miss).", ("cache", "result")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "ollama_tokens_total", "Tokens processed by Ollama, by model and phase (prompt/eval).", ("model", "phase")))
+LLM_SECONDS = REGISTRY.register(Counter(
+    "ollama_phase_seconds_total", "Ollama-reported time by model and phase (load/prompt/eval).", ("model", "phase")))
+PIPELINE_JOBS = REGISTRY.register(Counter(
+    "pipeline_jobs_total", "Job submissions by outcome (started/attached/rejected).", ("outcome",)))
+SINGLEFLIGHT_CALLS = REGISTRY.register(Counter(
+    "singleflight_calls_total", "Coalesced calls by flight and role (leader runs it, shared attaches).", ("flight", "role")))
+
+
+def record_http(service: str, seconds: float, status: int | str, nbytes: int) -> None:
+    """Records one outbound HTTP request to `service` ("reddit", "ollama")."""
+    HTTP_SECONDS.observe(seconds, service=service)
+    HTTP_REQUESTS.inc(service=service, status=status)
+    HTTP_BYTES.inc(nbytes, service=service)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def record_job(outcome: str) -> None:
+    PIPELINE_JOBS.inc(outcome=outcome)
+
+
+def record_singleflight(flight: str, leader: bool) -> None:
+    SINGLEFLIGHT_CALLS.inc(flight=flight, role="leader" if leader else "shared")
+
+
+def record_generation(stats: dict) -> None:
+    """Records the statistics of one finished (uncached) Ollama generation."""
+    model = stats["model"]
+    LLM_TOKENS.inc(stats["prompt_eval_count"], model=model, phase="prompt")
+    LLM_TOKENS.inc(stats["eval_count"], model=model, phase="eval")
+    LLM_SECONDS.inc(stats["load_duration"], model=model, phase="load")
+    LLM_SECONDS.inc(stats["prompt_eval_duration"], model=model, phase="prompt")
+    LLM_SECONDS.inc(stats["eval_duration"], model=model, phase="eval")
+
+
+def record_node(node: str, seconds: float, failed: bool) -> None:
+    NODE_SECONDS.observe(seconds, node=node)
+    if failed:
+        NODE_ERRORS.inc(node=node)
+
+
+def with_timing(state: dict, node: str, seconds: float) -> dict:
+    """Returns state["timings"] extended with this node's wall time."""
+    timings = dict(state.get("timings") or {})
+    timings[node] = round(seconds, 4)
+    return timings
+
+
+def _accepts_config(func) -> bool:
+    return "config" in inspect.signature(func).parameters
+
+
+def instrument_node(node: str, func):
+    """
+    Wraps a sync node: records its duration and errors, and adds
+    state["timings"][node]. The wrapper always accepts `config` and forwards
+    it only to nodes that take one.
+    """
+    takes_config = _accepts_config(func)
+
+    def _instrumented(state: dict, config=None) -> dict:
+        started = time.perf_counter()
+        result = func(state, config) if takes_config else func(state)
+        elapsed = time.perf_counter() - started
+        record_node(node, elapsed, bool(result.get("error")))
+        return {**result, "timings": with_timing(result, node, elapsed)}
+
+    _instrumented.__name__ = getattr(func, "__name__", node)
+    return _instrumented
+
+
+def ainstrument_node(node: str, afunc):
+    """Async counterpart of instrument_node()."""
+    takes_config = _accepts_config(afunc)
+
+    async def _instrumented(state: dict, config=None) -> dict:
+        started = time.perf_counter()
+        result = await (afunc(state, config) if takes_config else afunc(state))
+        elapsed = time.perf_counter() - started
+        record_node(node, elapsed, bool(result.get("error")))
+        return {**result, "timings": with_timing(result, node, elapsed)}
+
+    _instrumented.__name__ = getattr(afunc, "__name__", node)
+    return _instrumented
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 — scrapes are not worth a log line each
+        pass
+
+
+def start_metrics_server(port: int, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """
+    Serves GET /metrics in Prometheus text format from a daemon thread.
+
+    Returns the server; call shutdown() on it to stop serving.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Serving Prometheus metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
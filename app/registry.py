@@ -0,0 +1,217 @@
+"""
+Process-level registry of expensive, reusable pipeline resources.
+
+Holds the compiled LangGraph workflow and the parsed prompt templates so that
+per-run setup is a dictionary lookup. Prompt files are re-parsed only when
+their mtime changes, so edits are still picked up without a restart.
+warm_up() preloads the Ollama models the pipeline uses at process start.
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROMPTS_DIR = Path(__file__).parent / "prompts"
+
+# Matches {{PLACEHOLDER}} slots in prompt templates
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Z0-9_]+)\}\}")
+
+
+class PromptTemplate:
+    """A prompt file pre-split into literal segments and placeholder slots."""
+
+    def __init__(self, text: str):
+        self.text = text
+        # re.split with one group alternates literal, slot name, literal, ...
+        self._parts = PLACEHOLDER_PATTERN.split(text)
+        self.slots = tuple(self._parts[1::2])
+
+    def render(self, **values: str) -> str:
+        """
+        Fills the placeholder slots in one pass.
+
+        Values are inserted verbatim, so placeholder-like text inside a value
+        is never substituted again. Slots without a value are left as-is.
+        """
+        if not self.slots:
+            return self.text
+        out = []
+        for i, part in enumerate(self._parts):
+            if i % 2 == 0:
+                out.append(part)
+            else:
+                out.append(values.get(part, "{{" + part + "}}"))
+        return "".join(out)
+
+
+_prompts: dict[str, tuple[float, PromptTemplate]] = {}
+_prompts_lock = threading.Lock()
+
+_workflows: dict = {}
+_workflow_lock = threading.Lock()
+
+# Set to 0 to skip preloading models at startup
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1").lower() not in ("0", "false", "no")
+
+
+def get_prompt(filename: str) -> PromptTemplate:
+    """
+    Returns the parsed template for a file in the prompts directory.
+
+    Raises:
+        FileNotFoundError: If the prompt file does not exist.
+    """
+    path = PROMPTS_DIR / filename
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Prompt file not found: {path}") from None
+
+    entry = _prompts.get(filename)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+
+    with _prompts_lock:
+        entry = _prompts.get(filename)
+        if entry is None or entry[0] != mtime:
+            logger.debug("Loading prompt template %s", path)
+            template = PromptTemplate(path.read_text(encoding="utf-8").strip())
+            entry = (mtime, template)
+            _prompts[filename] = entry
+        return entry[1]
+
+
+def get_workflow(fast_story: bool | None = None):
+    """
+    Returns the process-wide compiled workflow, building it on first use.
+
+    `fast_story` selects the layout that writes the story in parallel with
+    the analysis; None uses the FAST_STORY setting.
+    """
+    # Imported lazily: workflow → agents → registry would otherwise be circular
+    from app.workflow import FAST_STORY, build_workflow
+
+    if fast_story is None:
+        fast_story = FAST_STORY
+    workflow = _workflows.get(fast_story)
+    if workflow is not None:
+        return workflow
+    with _workflow_lock:
+        if fast_story not in _workflows:
+            _workflows[fast_story] = build_workflow(fast_story)
+        return _workflows[fast_story]
+
+
+def pipeline_models() -> dict[str, int]:
+    """
+    Returns {model: num_ctx} for the LLM nodes served by the local Ollama.
+
+    Models routed to Ollama Cloud (OLLAMA_API_KEY set) are left out: their
+    residency is not ours to manage.
+    """
+    # Imported lazily for the same reason as in get_workflow()
+    from app.agents import llm_agent, story_agent
+
+    models: dict[str, int] = {}
+    for settings in (llm_agent._model_settings(), story_agent._model_settings()):
+        if settings["model"] and not settings["api_key"]:
+            models[settings["model"]] = settings["num_ctx"]
+    return models
+
+
+def warm_up() -> dict[str, dict[str, str]]:
+    """
+    Builds the workflow and preloads every pipeline model into each Ollama
+    host (OLLAMA_HOSTS) so the first request does not pay the model load.
+
+    Models already resident (per /api/ps) are left alone, and in a multi-host
+    pool only the models a host has pulled are loaded there. Failures are
+    logged, never raised: a cold model only makes the first request slower.
+
+    Returns:
+        dict: host URL → {model: "resident", "loaded" or "failed: <reason>"}.
+    """
+    get_workflow()
+    models = pipeline_models()
+    if not models:
+        return {}
+
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.ollama_pool import get_ollama_pool
+
+    pool = get_ollama_pool()
+    if pool.multi_host:
+        pool.probe()
+    hosts = {
+        host.url: {m: ctx for m, ctx in models.items() if host.serves(m)}
+        for host in pool.hosts
+    }
+    with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+        results = executor.map(_warm_up_host, hosts, hosts.values())
+        return dict(zip(hosts, results))
+
+
+def _running(base_url: str) -> set[str]:
+    """Models loaded on `base_url`, compared by model_key()."""
+    from app.services.ollama_pool import model_key
+    from app.services.ollama_service import list_running_models
+
+    return {model_key(name) for name in list_running_models(base_url)}
+
+
+def _warm_up_host(base_url: str, models: dict[str, int]) -> dict[str, str]:
+    from app.services.ollama_pool import model_key
+    from app.services.ollama_service import preload_model
+
+    try:
+        running = _running(base_url)
+    except Exception as exc:
+        logger.warning("Ollama warm-up skipped, %s not reachable: %s", base_url, exc)
+        return {model: f"failed: {exc}" for model in models}
+
+    status = {}
+    for model, num_ctx in models.items():
+        if model_key(model) in running:
+            status[model] = "resident"
+            continue
+        try:
+            seconds = preload_model(model, num_ctx, base_url)
+            logger.info("Preloaded Ollama model %s on %s in %.1fs", model, base_url, seconds)
+            status[model] = "loaded"
+        except Exception as exc:
+            logger.warning("Could not preload Ollama model %s on %s: %s", model, base_url, exc)
+            status[model] = f"failed: {exc}"
+
+    # Loading one model can evict another when the server keeps too few resident
+    try:
+        running = _running(base_url)
+    except Exception:
+        running = {model_key(m) for m in models}
+    evicted = [m for m in models if status[m] in ("resident", "loaded") and model_key(m) not in running]
+    if evicted:
+        logger.warning(
+            "Ollama on %s evicted %s while warming up; raise OLLAMA_MAX_LOADED_MODELS on the server "
+            "or use the same model for analysis and story",
+            base_url, ", ".join(evicted),
+        )
+        for model in evicted:
+            status[model] = "failed: evicted"
+    return status
+
+
+def start_warm_up() -> threading.Thread | None:
+    """
+    Runs warm_up() on a daemon thread (unless OLLAMA_WARMUP=0) so startup
+    work such as prompting for a URL overlaps the model load.
+
+    join() the returned thread before the first request.
+    """
+    if not OLLAMA_WARMUP:
+        return None
+    thread = threading.Thread(target=warm_up, name="ollama-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Reddit LangGraph MVP — results store lookup and export
+
+Usage:
+    python -m app.results get "https://www.reddit.com/r/Python/comments/abc123/my_post/"
+    python -m app.results query --subreddit nosleep --min-score 500 --order score --limit 20
+    python -m app.results export --subreddit nosleep --since 2025-01-01 > nosleep.ndjson
+    python -m app.results export --format csv --model llama3.2 --output results.csv
+    python -m app.results stats
+
+Environment variables:
+    RESULTS_DB_PATH  SQLite file to read (default: .cache/results.sqlite3)
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from app.services.results_store import ORDERINGS, SUMMARY_COLUMNS, ResultsStore, RESULTS_DB_PATH
+
+
+def _date(value: str) -> float:
+    """YYYY-MM-DD (UTC) → Unix seconds."""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a date like 2025-01-31, got {value!r}")
+
+
+def _add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--subreddit", default=None, help="Only results from this subreddit")
+    parser.add_argument("--model", default=None, help="Only results analysed with this model")
+    parser.add_argument("--min-score", type=int, default=None, help="Only posts with at least this score")
+    parser.add_argument("--since", type=_date, default=None, help="Only posts created on or after this date (UTC)")
+    parser.add_argument("--until", type=_date, default=None, help="Only posts created before this date (UTC)")
+    parser.add_argument(
+        "--since-hours",
+        type=float,
+        default=None,
+        help="Only posts created in the last N hours (overrides --since)",
+    )
+
+
+def _filters(args: argparse.Namespace) -> dict:
+    since = time.time() - args.since_hours * 3600 if args.since_hours else args.since
+    return {
+        "subreddit": args.subreddit,
+        "model": args.model,
+        "min_score": args.min_score,
+        "since": since,
+        "until": args.until,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Look up and export stored pipeline results")
+    parser.add_argument("--db", default=RESULTS_DB_PATH, help=f"Results database (default: {RESULTS_DB_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get = commands.add_parser("get", help="Print the stored result for one post as JSON")
+    get.add_argument("post", help="Post URL or ID")
+    get.add_argument("--content-hash", default=None, help="A specific content version (default: latest)")
+
+    query = commands.add_parser("query", help="List matching results, one line each")
+    _add_filters(query)
+    query.add_argument("--order", choices=list(ORDERINGS), default="created", help="Sort key (default: created)")
+    query.add_argument("--asc", action="store_true", help="Sort ascending (default: descending)")
+    query.add_argument("--limit", type=int, default=50, help="Max results (default: 50)")
+    query.add_argument("--offset", type=int, default=0)
+
+    export = commands.add_parser("export", help="Write matching results as NDJSON (full results) or CSV (summary)")
+    _add_filters(export)
+    export.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    export.add_argument("--output", default="-", help="Output file (default: stdout)")
+
+    commands.add_parser("stats", help="Result counts per subreddit and model")
+    return parser.parse_args()
+
+
+def _print_rows(rows: list[dict]) -> None:
+    for row in rows:
+        created = datetime.fromtimestamp(row["created_utc"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+        print(
+            f"{row['post_id']:<10} r/{row['subreddit']:<20} {row['score']:>7,}  {created}  "
+            f"{row['model']:<20} {row['title'][:60]}"
+        )
+
+
+def _export(store: ResultsStore, args: argparse.Namespace) -> int:
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    written = 0
+    try:
+        writer = csv.DictWriter(out, fieldnames=SUMMARY_COLUMNS, extrasaction="ignore") if args.format == "csv" else None
+        if writer:
+            writer.writeheader()
+        for row in store.iter_results(**_filters(args)):
+            if writer:
+                writer.writerow(row)
+            else:
+                out.write(json.dumps(row["result"], ensure_ascii=False, default=str) + "\n")
+            written += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Exported {written:,} results", file=sys.stderr)
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    store = ResultsStore(path=args.db)
+    try:
+        if args.command == "get":
+            result = store.get(args.post, args.content_hash)
+            if result is None:
+                print(f"No stored result for {args.post}", file=sys.stderr)
+                return 1
+            print(json.dumps(result, indent=2, ensure_ascii=False, default=str))
+        elif args.command == "query":
+            _print_rows(store.query(
+                **_filters(args),
+                order_by=args.order,
+                descending=not args.asc,
+                limit=args.limit,
+                offset=args.offset,
+            ))
+        elif args.command == "export":
+            return _export(store, args)
+        else:
+            print(json.dumps(store.stats(), indent=2, ensure_ascii=False))
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Reddit LangGraph MVP — HTTP job API
+
+Usage:
+    python -m app.server --port 8080 --workers 4 --max-queued 32
+
+Endpoints:
+    POST /jobs               {"url": "...", "fast_story": false, "rerun": false}
+                             → 202 with the job (200 when an existing job is reused),
+                               429 when the queue is full
+    GET  /jobs/<id>          Job status, per-node progress and, once finished, the result
+    GET  /jobs/<id>/events   Server-Sent Events: "node", "token" and a final "done" event
+    GET  /healthz            Worker and queue occupancy
+    GET  /metrics            Prometheus metrics
+
+Environment variables:
+    API_HOST, API_PORT       Listen address (default: 127.0.0.1:8080). The API has no
+                             authentication; bind a public address only behind one
+    API_SSE_HEARTBEAT        Seconds between SSE keep-alive comments (default: 15)
+    JOB_WORKERS, JOB_MAX_QUEUED, JOB_RESULT_TTL, JOB_MAX_FINISHED  See app/jobs.py
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.logger import configure_logging, get_logger
+from app.jobs import JOB_MAX_QUEUED, JOB_WORKERS, JobManager, PipelineJob, QueueFull
+from app.metrics import CONTENT_TYPE, REGISTRY
+from app.registry import start_warm_up
+from app.state import public_result
+
+logger = get_logger(__name__)
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_SSE_HEARTBEAT = float(os.getenv("API_SSE_HEARTBEAT", "15"))
+
+# Seconds a client is told to wait after a 429
+RETRY_AFTER_SECONDS = 5
+MAX_BODY_BYTES = 64 * 1024
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]+)(/events)?$")
+
+
+def job_view(job: PipelineJob) -> dict:
+    """Status document for GET /jobs/<id>: progress without the token text, plus the result once finished."""
+    view = job.snapshot()
+    view.pop("text")
+    if job.finished:
+        view["result"] = public_result(job.result)
+    return view
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    server_version = "RedditCrawlerAPI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+        payload = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str, headers: dict | None = None) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def _read_json(self) -> dict | None:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return None
+        if length <= 0 or length > MAX_BODY_BYTES:
+            return None
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+        return body if isinstance(body, dict) else None
+
+    def do_POST(self):
+        received_at = time.time()
+        if self.path.split("?", 1)[0] != "/jobs":
+            self._send_error(404, "Not found")
+            return
+        body = self._read_json()
+        url = (body or {}).get("url")
+        if not isinstance(url, str) or not url.strip():
+            self._send_error(400, 'Expected a JSON body like {"url": "https://www.reddit.com/r/.../comments/..."}')
+            return
+
+        fast_story, rerun = body.get("fast_story"), body.get("rerun", False)
+        if not isinstance(fast_story, (bool, type(None))) or not isinstance(rerun, bool):
+            self._send_error(400, '"fast_story" and "rerun" must be JSON booleans')
+            return
+        try:
+            job = self.manager.submit(url, fast_story=fast_story, rerun=rerun)
+        except QueueFull as exc:
+            self._send_error(429, f"Queue full: {exc}", {"Retry-After": str(RETRY_AFTER_SECONDS)})
+            return
+
+        # A job submitted before this request is a running or cached one being reused
+        created = job.submitted_at >= received_at
+        self._send_json(202 if created else 200, job_view(job), {"Location": f"/jobs/{job.id}"})
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            self._send_json(200, {"status": "ok", **self.manager.stats()})
+            return
+        if path == "/metrics":
+            body = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        match = JOB_PATH.match(path)
+        job = self.manager.get(match.group(1)) if match else None
+        if job is None:
+            self._send_error(404, "Unknown job" if match else "Not found")
+            return
+        if match.group(2):
+            self._stream_events(job)
+        else:
+            self._send_json(200, job_view(job))
+
+    def _stream_events(self, job: PipelineJob) -> None:
+        """
+        Replays the job's event log and follows it until the "done" event.
+
+        Event ids are positions in the log, so a reconnecting client that
+        sends Last-Event-ID resumes where it left off.
+        """
+        try:
+            index = int(self.headers.get("Last-Event-ID", -1)) + 1
+        except ValueError:
+            index = 0
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        try:
+            while True:
+                events, complete = job.events_since(index, timeout=API_SSE_HEARTBEAT)
+                if not events and not complete:
+                    self.wfile.write(b": keep-alive\n\n")
+                for event, data in events:
+                    message = f"id: {index}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+                    self.wfile.write(message.encode("utf-8"))
+                    index += 1
+                self.wfile.flush()
+                if complete and not events:
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("SSE client for job %s disconnected", job.id)
+
+    def log_message(self, format, *args):  # noqa: A002 — route access logs through the app logger
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def make_api_server(manager: JobManager, port: int = API_PORT, host: str = API_HOST) -> ThreadingHTTPServer:
+    """Binds the job API to host:port (0 picks a free port) without serving yet."""
+    server = ThreadingHTTPServer((host, port), _ApiHandler)
+    server.daemon_threads = True
+    server.manager = manager
+    return server
+
+
+def start_api_server(manager: JobManager, port: int = API_PORT, host: str = API_HOST) -> ThreadingHTTPServer:
+    """
+    Serves the job API from a daemon thread.
+
+    Returns the server; call shutdown() on it to stop serving.
+    """
+    server = make_api_server(manager, port, host)
+    threading.Thread(target=server.serve_forever, name="api-server", daemon=True).start()
+    logger.info("Serving the job API on http://%s:%d", host, server.server_address[1])
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="HTTP job API for the Reddit LangGraph pipeline")
+    parser.add_argument("--host", default=API_HOST, help=f"Listen address (default: {API_HOST})")
+    parser.add_argument("--port", type=int, default=API_PORT, help=f"Listen port (default: {API_PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=JOB_WORKERS,
+        help=f"Pipelines run concurrently (default: {JOB_WORKERS})",
+    )
+    parser.add_argument(
+        "--max-queued",
+        type=int,
+        default=JOB_MAX_QUEUED,
+        help=f"Jobs allowed to wait for a worker before submissions get 429 (0 = unbounded, default: {JOB_MAX_QUEUED})",
+    )
+    parser.add_argument(
+        "--no-warmup",
+        action="store_false",
+        dest="warmup",
+        help="Do not preload the Ollama models at startup",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging()
+    if args.warmup:
+        start_warm_up()
+
+    manager = JobManager(workers=args.workers, max_queued=args.max_queued)
+    server = make_api_server(manager, args.port, args.host)
+    logger.info(
+        "Serving the job API on http://%s:%d (%d workers, max %d queued)",
+        args.host, server.server_address[1], args.workers, args.max_queued,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+        manager.shutdown(wait=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
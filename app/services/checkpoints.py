@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = Path(__file__).resolve().parents[2] / ".cache" / "checkpoints.sqlite3"
+
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", str(DEFAULT_CHECKPOINT_PATH))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subreddit_checkpoints (
+    subreddit           TEXT PRIMARY KEY,
+    newest_fullname     TEXT NOT NULL,
+    newest_created_utc  REAL NOT NULL,
+    updated_at          REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed_posts (
+    fullname      TEXT PRIMARY KEY,
+    subreddit     TEXT NOT NULL,
+    content_hash  TEXT NOT NULL,
+    processed_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_processed_posts_subreddit ON processed_posts (subreddit);
+"""
+
+# classify() outcomes
+NEW = "new"
+EDITED = "edited"
+UNCHANGED = "unchanged"
+
+
+class CheckpointStore:
+    """
+    Persistent record of what an incremental crawl has already processed.
+
+    Per subreddit it keeps the newest processed post fullname (t3_<id>); per
+    post it keeps the content hash it was analysed with. classify() tells a
+    crawler whether a listing post is new, edited or safe to skip.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def classify(self, fullname: str, content_hash: str) -> str:
+        """Returns NEW, EDITED or UNCHANGED for a post and its current content hash."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT content_hash FROM processed_posts WHERE fullname = ?", (fullname,)
+            ).fetchone()
+        if row is None:
+            return NEW
+        return UNCHANGED if row[0] == content_hash else EDITED
+
+    def record(self, subreddit: str, fullname: str, created_utc: float, content_hash: str) -> None:
+        """Marks a post as processed and advances the subreddit checkpoint if it is newer."""
+        subreddit = subreddit.lower()
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO processed_posts (fullname, subreddit, content_hash, processed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (fullname, subreddit, content_hash, now),
+                )
+                conn.execute(
+                    "INSERT INTO subreddit_checkpoints (subreddit, newest_fullname, newest_created_utc, updated_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(subreddit) DO UPDATE SET "
+                    "newest_fullname = excluded.newest_fullname, "
+                    "newest_created_utc = excluded.newest_created_utc, "
+                    "updated_at = excluded.updated_at "
+                    "WHERE excluded.newest_created_utc > subreddit_checkpoints.newest_created_utc",
+                    (subreddit, fullname, created_utc, now),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def checkpoint(self, subreddit: str) -> dict | None:
+        """Returns the stored checkpoint for a subreddit, or None if never crawled."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT newest_fullname, newest_created_utc, updated_at FROM subreddit_checkpoints "
+                "WHERE subreddit = ?",
+                (subreddit.lower(),),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"newest_fullname": row[0], "newest_created_utc": row[1], "updated_at": row[2]}
@@ -0,0 +1,99 @@
+import heapq
+from itertools import count
+
+
+class CommentSelector:
+    """
+    Bounded, score-ranked selection over a Reddit comment tree.
+
+    feed() walks listing children with an explicit stack (no recursion, so
+    arbitrarily deep threads are safe) and keeps only the `top_k` highest-scored
+    comments in a min-heap, so memory stays O(top_k + stack) however large the
+    thread is. Comments deeper than `max_depth` are ignored. IDs from `more`
+    stubs within the depth limit are queued (up to `max_more_ids`) so the caller
+    can expand them with batched /api/morechildren requests and feed() the
+    returned things back in.
+    """
+
+    def __init__(self, top_k: int, max_depth: int, max_more_ids: int):
+        self.top_k = top_k
+        self.max_depth = max_depth
+        self.max_more_ids = max_more_ids
+        self.seen = 0
+        self._heap: list[tuple[int, int, dict]] = []
+        self._tiebreak = count()
+        self._more_ids: list[str] = []
+        self._queued_more = 0
+
+    def feed(self, children: list, depth: int = 0) -> None:
+        """
+        Adds listing children (t1 comments and `more` stubs) to the selection.
+
+        Children carrying their own data["depth"] (as /api/morechildren
+        results do) use it; otherwise depth is inferred from nesting.
+        """
+        stack = [(child, depth) for child in reversed(children or [])]
+        while stack:
+            child, inferred_depth = stack.pop()
+            kind = child.get("kind")
+            data = child.get("data") or {}
+            depth = data.get("depth", inferred_depth)
+            if depth > self.max_depth:
+                continue
+
+            if kind == "more":
+                self._queue_more(data.get("children") or [])
+                continue
+            if kind != "t1":
+                continue
+
+            self.seen += 1
+            body = data.get("body", "")
+            if body and body not in ("[removed]", "[deleted]"):
+                self._offer(data, depth)
+
+            replies = data.get("replies")
+            if isinstance(replies, dict):
+                for reply in reversed(replies.get("data", {}).get("children", [])):
+                    stack.append((reply, depth + 1))
+
+    def _offer(self, data: dict, depth: int) -> None:
+        item = (int(data.get("score", 0)), next(self._tiebreak), {
+            "id": data.get("id", ""),
+            "author": data.get("author", "[deleted]"),
+            "score": int(data.get("score", 0)),
+            "depth": depth,
+            "body": data.get("body", ""),
+        })
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, item)
+        elif item[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def _queue_more(self, ids: list[str]) -> None:
+        room = self.max_more_ids - self._queued_more
+        if room <= 0:
+            return
+        accepted = ids[:room]
+        self._more_ids.extend(accepted)
+        self._queued_more += len(accepted)
+
+    def take_more_ids(self, batch_size: int = 100) -> list[str]:
+        """Pops up to `batch_size` queued `more` child IDs for one morechildren call."""
+        batch, self._more_ids = self._more_ids[:batch_size], self._more_ids[batch_size:]
+        return batch
+
+    def result(self, max_bytes: int) -> list[dict]:
+        """
+        Returns the selected comments, highest score first, keeping only as
+        many as fit in `max_bytes` of UTF-8 body text.
+        """
+        selected = []
+        used = 0
+        for _, _, comment in sorted(self._heap, key=lambda item: (-item[0], item[1])):
+            size = len(comment["body"].encode("utf-8"))
+            if used + size > max_bytes:
+                continue
+            used += size
+            selected.append(comment)
+        return selected
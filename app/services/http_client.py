@@ -0,0 +1,239 @@
+import asyncio
+import os
+import random
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Connection pool and retry policy shared by all outbound HTTP clients
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# Optional per-client caps on concurrent in-flight requests (unset = unlimited)
+_limits: dict[str, threading.BoundedSemaphore] = {}
+_limit_values: dict[str, int] = {}
+
+# Async clients and semaphores are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_async_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+class _Retry(Retry):
+    """
+    urllib3 Retry that honours Retry-After only on statuses in status_forcelist.
+
+    Stock Retry also replays any 413/429/503 carrying Retry-After, which would
+    bypass callers that handle those themselves (Reddit's rate limiter, the
+    Ollama pool's failover to another host).
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        has_retry_after = has_retry_after and status_code in (self.status_forcelist or ())
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def _build_session(pool_maxsize: int, retry_statuses: tuple[int, ...]) -> requests.Session:
+    retry = _Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=0,  # never replay a request whose response was partially read
+        status=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        status_forcelist=retry_statuses,
+        allowed_methods=None,  # retry POST too: /api/chat is safe to replay on 429/5xx
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand the last response back so raise_for_status() reports it
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(
+    name: str,
+    pool_maxsize: int | None = None,
+    retry_statuses: tuple[int, ...] = RETRY_STATUSES,
+) -> requests.Session:
+    """
+    Returns the process-wide keep-alive session registered under `name`.
+
+    The session is created on first use and reused by every caller afterwards,
+    so TCP/TLS connections to the same host are pooled across nodes and threads.
+    The underlying urllib3 pools are thread-safe; callers must not mutate the
+    session's shared headers or cookies.
+
+    Args:
+        name:         Logical client name (e.g. "reddit", "ollama").
+        pool_maxsize: Max pooled connections per host (default HTTP_POOL_MAXSIZE).
+        retry_statuses: Response codes retried with backoff (default 429 and 5xx).
+
+    The options only apply when the session is first created.
+    """
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            logger.debug("Creating HTTP session name=%s", name)
+            session = _build_session(pool_maxsize or HTTP_POOL_MAXSIZE, retry_statuses)
+            _sessions[name] = session
+        return session
+
+
+def close_sessions() -> None:
+    """Closes every pooled session; they are recreated lazily on next use."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def set_concurrency_limit(name: str, limit: int | None) -> None:
+    """
+    Caps the number of concurrent in-flight requests for client `name`.
+
+    Pass None or 0 to remove the cap. Intended to be configured once at
+    startup (e.g. by the batch runner) before worker threads are started.
+    """
+    if limit:
+        _limits[name] = threading.BoundedSemaphore(limit)
+        _limit_values[name] = limit
+    else:
+        _limits.pop(name, None)
+        _limit_values.pop(name, None)
+
+
+@contextmanager
+def concurrency_slot(name: str):
+    """Blocks until a request slot for client `name` is free, if it is capped."""
+    semaphore = _limits.get(name)
+    if semaphore is None:
+        yield
+        return
+    with semaphore:
+        yield
+
+
+@asynccontextmanager
+async def async_concurrency_slot(name: str):
+    """Async counterpart of concurrency_slot(), using a per-loop asyncio.Semaphore."""
+    limit = _limit_values.get(name)
+    if not limit:
+        yield
+        return
+    loop_limits = _async_limits.setdefault(asyncio.get_running_loop(), {})
+    semaphore = loop_limits.get(name)
+    if semaphore is None:
+        semaphore = loop_limits[name] = asyncio.Semaphore(limit)
+    async with semaphore:
+        yield
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """
+    Returns the keep-alive httpx.AsyncClient registered under `name` for the
+    running event loop, creating it on first use.
+
+    Connection errors are retried by the transport; use async_request() to also
+    retry on 429/5xx responses.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get(name)
+    if client is None:
+        logger.debug("Creating async HTTP client name=%s", name)
+        limits = httpx.Limits(
+            max_connections=HTTP_POOL_MAXSIZE,
+            max_keepalive_connections=HTTP_POOL_MAXSIZE,
+        )
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            limits=limits,
+            transport=httpx.AsyncHTTPTransport(retries=HTTP_MAX_RETRIES, limits=limits),
+        )
+        clients[name] = client
+    return client
+
+
+async def close_async_clients() -> None:
+    """Closes the async clients bound to the running event loop."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Seconds to wait before the next attempt, preferring the Retry-After header."""
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return retry_after
+    return HTTP_BACKOFF_FACTOR * (2 ** attempt) + random.uniform(0, HTTP_BACKOFF_FACTOR)
+
+
+async def async_request(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    retry_statuses: tuple[int, ...] = RETRY_STATUSES,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Sends a request with the same status retry policy as the sync sessions:
+    up to HTTP_MAX_RETRIES retries on 429/5xx with exponential backoff,
+    honouring Retry-After. The last response is returned unraised.
+    """
+    attempt = 0
+    while True:
+        response = await client.request(method, url, **kwargs)
+        if response.status_code not in retry_statuses or attempt >= HTTP_MAX_RETRIES:
+            return response
+        delay = _retry_delay(response, attempt)
+        logger.debug("Retrying %s %s after status=%s in %.2fs", method, url, response.status_code, delay)
+        await response.aclose()
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,230 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import httpx
+import requests
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Comma-separated Ollama base URLs; empty = OLLAMA_BASE_URL only
+OLLAMA_HOSTS = os.getenv("OLLAMA_HOSTS", "")
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))  # seconds between probes
+OLLAMA_MAX_FAILURES = int(os.getenv("OLLAMA_MAX_FAILURES", "3"))  # consecutive failures before ejection
+OLLAMA_EJECT_SECONDS = float(os.getenv("OLLAMA_EJECT_SECONDS", "30"))
+
+# Statuses that say "this host cannot serve the request right now" (404: model not pulled there)
+FAILOVER_STATUSES = (404, 500, 502, 503, 504)
+
+
+def model_key(name: str) -> str:
+    """
+    Name used to compare models across the Ollama API: /api/tags and /api/ps
+    report untagged models with their implicit ":latest" tag.
+    """
+    name = name.strip()
+    return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+
+def is_host_failure(exc: BaseException) -> bool:
+    """True when `exc` means the host is down, busy or lacks the model — worth another host."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) in FAILOVER_STATUSES
+
+
+class OllamaHost:
+    """Routing state of one Ollama endpoint."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.models: set[str] | None = None  # model_key() names; None until the first successful probe
+        self.failures = 0                    # consecutive
+        self.ejected_until = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def serves(self, model: str) -> bool:
+        return self.models is None or model_key(model) in self.models
+
+
+class OllamaPool:
+    """
+    Routes Ollama requests across several servers.
+
+    Each request goes to the available host with the fewest requests in
+    flight, preferring hosts whose /api/tags lists the model. A host is
+    ejected for `eject_seconds` after `max_failures` consecutive failures or a
+    failed health probe. Probes run every `health_interval` seconds on a
+    daemon thread, started on first use, and put recovered hosts back.
+    With a single host the pool only does bookkeeping.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        health_interval: float = OLLAMA_HEALTH_INTERVAL,
+        max_failures: int = OLLAMA_MAX_FAILURES,
+        eject_seconds: float = OLLAMA_EJECT_SECONDS,
+    ):
+        self.hosts = [OllamaHost(url) for url in dict.fromkeys(urls)]
+        self.health_interval = health_interval
+        self.max_failures = max(1, max_failures)
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+        self._prober: threading.Thread | None = None
+        self._rotation = 0
+
+    @property
+    def multi_host(self) -> bool:
+        return len(self.hosts) > 1
+
+    def _choose(self, model: str, exclude: list[OllamaHost]) -> OllamaHost:
+        now = time.monotonic()
+        candidates = [h for h in self.hosts if h not in exclude] or list(self.hosts)
+        available = [h for h in candidates if h.available(now)]
+        if not available:
+            # Every host is ejected: try the one due back soonest rather than fail outright
+            return min(candidates, key=lambda h: h.ejected_until)
+        with_model = [h for h in available if h.serves(model)] or available
+        # Rotate the starting point so ties spread evenly across hosts
+        self._rotation = (self._rotation + 1) % len(with_model)
+        ordered = with_model[self._rotation:] + with_model[:self._rotation]
+        return min(ordered, key=lambda h: h.outstanding)
+
+    def acquire(self, model: str, exclude: list[OllamaHost] | None = None) -> OllamaHost:
+        """Picks a host for `model` (skipping `exclude`) and counts the request as in flight."""
+        if self.multi_host:
+            self._start_health_checks()
+        with self._lock:
+            host = self._choose(model, exclude or [])
+            host.outstanding += 1
+            host.requests += 1
+            return host
+
+    def release(self, host: OllamaHost, model: str, exc: BaseException | None = None) -> None:
+        """Ends a request; a host failure counts towards ejection, success resets the count."""
+        with self._lock:
+            host.outstanding -= 1
+            if exc is None:
+                host.failures = 0
+                return
+            if not is_host_failure(exc):
+                return
+            host.errors += 1
+            host.failures += 1
+            if getattr(getattr(exc, "response", None), "status_code", None) == 404 and host.models is not None:
+                host.models.discard(model_key(model))
+            if host.failures >= self.max_failures:
+                host.ejected_until = time.monotonic() + self.eject_seconds
+                logger.warning(
+                    "Ejecting Ollama host %s for %.0fs after %d failures: %s",
+                    host.url, self.eject_seconds, host.failures, exc,
+                )
+
+    @contextmanager
+    def route(self, model: str, tried: list[OllamaHost]) -> Iterator[str]:
+        """
+        Yields the base URL to send one request for `model` to.
+
+        The chosen host is appended to `tried`; pass the same list on retry to
+        fail over to a host that has not been tried yet.
+        """
+        host = self.acquire(model, tried)
+        tried.append(host)
+        try:
+            yield host.url
+        except BaseException as exc:
+            self.release(host, model, exc)
+            raise
+        else:
+            self.release(host, model)
+
+    def should_fail_over(self, exc: BaseException, tried: list[OllamaHost]) -> bool:
+        """True when `exc` is a host failure and some host has not been tried yet."""
+        if not is_host_failure(exc) or len(tried) >= len(self.hosts):
+            return False
+        logger.warning("Ollama host %s failed (%s); failing over", tried[-1].url, exc)
+        return True
+
+    def probe(self) -> None:
+        """Refreshes every host's model list; unreachable hosts are ejected."""
+        # Imported lazily: ollama_service imports this module
+        from app.services.ollama_service import list_available_models
+
+        for host in self.hosts:
+            try:
+                models = {model_key(name) for name in list_available_models(host.url)}
+            except Exception as exc:
+                with self._lock:
+                    if host.available(time.monotonic()):
+                        logger.warning("Ollama host %s failed its health check: %s", host.url, exc)
+                    host.ejected_until = time.monotonic() + self.eject_seconds
+                continue
+            with self._lock:
+                if not host.available(time.monotonic()):
+                    logger.info("Ollama host %s is healthy again", host.url)
+                host.models = models
+                host.failures = 0
+                host.ejected_until = 0.0
+
+    def _start_health_checks(self) -> None:
+        if self._prober is not None:
+            return
+        with self._lock:
+            if self._prober is not None:
+                return
+            self._prober = threading.Thread(target=self._probe_forever, name="ollama-health", daemon=True)
+            self._prober.start()
+
+    def _probe_forever(self) -> None:
+        while True:
+            self.probe()
+            time.sleep(self.health_interval)
+
+    def snapshot(self) -> list[dict]:
+        """Per-host counters for logging and batch summaries."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": h.url,
+                    "requests": h.requests,
+                    "errors": h.errors,
+                    "outstanding": h.outstanding,
+                    "ejected": not h.available(now),
+                    "models": sorted(h.models) if h.models is not None else None,
+                }
+                for h in self.hosts
+            ]
+
+
+def _configured_hosts() -> list[str]:
+    # Imported lazily: ollama_service imports this module
+    from app.services.ollama_service import OLLAMA_BASE_URL
+
+    hosts = [url.strip() for url in OLLAMA_HOSTS.split(",") if url.strip()]
+    return hosts or [OLLAMA_BASE_URL]
+
+
+_pool: OllamaPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_ollama_pool() -> OllamaPool:
+    """Returns the process-wide pool built from OLLAMA_HOSTS, creating it on first use."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OllamaPool(_configured_hosts())
+        return _pool
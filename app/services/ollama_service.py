@@ -1,14 +1,45 @@
+import json
 import os
-import requests
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Iterator, NamedTuple
 from dotenv import load_dotenv
 load_dotenv()
+from app.services.llm_cache import cache_key, llm_cache
+from app.services.http_client import (
+    RETRY_STATUSES,
+    async_concurrency_slot,
+    async_request,
+    concurrency_slot,
+    get_async_client,
+    get_session,
+)
+from app.services.ollama_pool import get_ollama_pool
+from app.metrics import record_cache, record_generation, record_http
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_CLOUD_BASE_URL = os.getenv("OLLAMA_CLOUD_BASE_URL", "https://ollama.com")
-REQUEST_TIMEOUT = 300  # seconds — cloud APIs can be slower than local LLMs
+REQUEST_TIMEOUT = float(os.getenv("OLLAMA_REQUEST_TIMEOUT", "300"))  # seconds — cloud APIs can be slower than local LLMs
+# How long the local server keeps a model loaded after a request ("30m", "1h", seconds; -1 = forever, "" = server default)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Token counts Ollama reports with a finished generation
+COUNT_FIELDS = ("prompt_eval_count", "eval_count")
+# Phase durations Ollama reports in nanoseconds; kept in seconds
+DURATION_FIELDS = ("load_duration", "prompt_eval_duration", "eval_duration", "total_duration")
+
+
+class ChatResult(NamedTuple):
+    """Response text plus the generation statistics of one /api/chat call."""
+    content: str
+    stats: dict
+
+
+# on_stats(stats) — called once a streamed response has finished
+StatsCallback = Callable[[dict], None]
 
 
 # def call_ollama(model: str, system_prompt: str, user_prompt: str) -> str:
@@ -63,6 +94,7 @@ def call_ollama(
     num_thread: int | None = None,
     num_gpu: int | None = None,
     penalize_newline: bool | None = None,
+    use_cache: bool = True,
 ) -> str:
     """
     Sends a chat completion request to a locally running Ollama instance.
@@ -83,14 +115,8 @@ def call_ollama(
         num_thread:    CPU threads.
         num_gpu:       GPU layers.
         penalize_newline: Penalize newlines.
+        use_cache:     Serve/store the response via the persistent LLM cache.
     """
-    base_url = OLLAMA_CLOUD_BASE_URL if api_key else OLLAMA_BASE_URL
-    endpoint = f"{base_url}/api/chat"
-
-    headers = {}
-    if api_key:
-        headers["Authorization"] = f"Bearer {api_key}"
-
     options = {
         "temperature": temperature,
         "top_p": top_p,
@@ -114,11 +140,416 @@ def call_ollama(
         "num_gpu": num_gpu,
         "penalize_newline": penalize_newline,
     }
+    return chat_ollama(model, system_prompt, user_prompt, api_key, use_cache, **options).content
+
+
+def chat_ollama(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str | None = None,
+    use_cache: bool = True,
+    **options,
+) -> ChatResult:
+    """
+    Like call_ollama(), but also returns the generation statistics.
+
+    Accepts the same keyword options as call_ollama(); None values are
+    omitted. Cached responses carry zeroed statistics with "cached": True.
+    Local requests are routed through the OLLAMA_HOSTS pool and fail over to
+    another host when one is down, busy or lacks the model.
+
+    Returns:
+        ChatResult: (response text, stats) — see generation_stats().
+
+    Raises:
+        requests.HTTPError: If the Ollama API returns an error status.
+        ValueError: If the response structure is unexpected.
+    """
+    payload, headers = _prepare_chat(model, system_prompt, user_prompt, api_key, options)
+
+    key, cached = _cache_lookup(payload, use_cache)
+    if cached is not None:
+        return ChatResult(cached, generation_stats({}, model, cached=True))
+
+    tried: list = []
+    while True:
+        try:
+            with _route(model, api_key, tried) as base_url:
+                logger.debug("Calling Ollama endpoint %s/api/chat model=%s", base_url, model)
+                with concurrency_slot("ollama"):
+                    started = time.perf_counter()
+                    response = _session().post(
+                        f"{base_url}/api/chat",
+                        json=payload,
+                        headers=headers if headers else None,
+                        timeout=REQUEST_TIMEOUT,
+                    )
+                    record_http("ollama", time.perf_counter() - started, response.status_code, len(response.content))
+                response.raise_for_status()
+            break
+        except Exception as exc:
+            if _fail_over(exc, api_key, tried):
+                continue
+            _log_failure(exc)
+            raise
+
+    data = response.json()
+    content = _extract_content(data)
+    if key:
+        llm_cache.put(key, model, content)
+    return ChatResult(content, _record_stats(data, model))
+
+
+async def acall_ollama(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str | None = None,
+    use_cache: bool = True,
+    **options,
+) -> str:
+    """
+    Async counterpart of call_ollama().
+
+    Accepts the same sampling/runtime keyword options as call_ollama()
+    (temperature, top_p, num_ctx, ...); None values are omitted.
+
+    Raises:
+        httpx.HTTPStatusError: If the Ollama API returns an error status.
+        ValueError: If the response structure is unexpected.
+    """
+    return (await achat_ollama(model, system_prompt, user_prompt, api_key, use_cache, **options)).content
+
+
+async def achat_ollama(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str | None = None,
+    use_cache: bool = True,
+    **options,
+) -> ChatResult:
+    """Async counterpart of chat_ollama()."""
+    payload, headers = _prepare_chat(model, system_prompt, user_prompt, api_key, options)
+
+    key, cached = _cache_lookup(payload, use_cache)
+    if cached is not None:
+        return ChatResult(cached, generation_stats({}, model, cached=True))
+
+    tried: list = []
+    while True:
+        try:
+            with _route(model, api_key, tried) as base_url:
+                logger.debug("Calling Ollama endpoint (async) %s/api/chat model=%s", base_url, model)
+                async with async_concurrency_slot("ollama"):
+                    started = time.perf_counter()
+                    response = await async_request(
+                        get_async_client("ollama"),
+                        "POST",
+                        f"{base_url}/api/chat",
+                        retry_statuses=_retry_statuses(),
+                        json=payload,
+                        headers=headers or None,
+                        timeout=REQUEST_TIMEOUT,
+                    )
+                    record_http("ollama", time.perf_counter() - started, response.status_code, len(response.content))
+                response.raise_for_status()
+            break
+        except Exception as exc:
+            if _fail_over(exc, api_key, tried):
+                continue
+            _log_failure(exc)
+            raise
+
+    data = response.json()
+    content = _extract_content(data)
+    if key:
+        llm_cache.put(key, model, content)
+    return ChatResult(content, _record_stats(data, model))
+
+
+def stream_ollama(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str | None = None,
+    use_cache: bool = True,
+    on_stats: StatsCallback | None = None,
+    **options,
+) -> Iterator[str]:
+    """
+    Streaming variant of call_ollama(): yields content chunks as Ollama's
+    NDJSON stream arrives instead of waiting for the full completion.
+
+    Accepts the same keyword options as acall_ollama(). The request is only
+    sent once iteration starts. A cached response is yielded as one chunk; a
+    fully received stream is written to the cache. `on_stats` receives the
+    generation statistics from the final stream line (see chat_ollama()).
+    A request fails over to another host only before its first chunk.
+
+    Raises:
+        requests.HTTPError: If the Ollama API returns an error status.
+        ValueError: If the stream reports an error.
+    """
+    payload, headers = _prepare_chat(model, system_prompt, user_prompt, api_key, options, stream=True)
+
+    key, cached = _cache_lookup(payload, use_cache)
+    if cached is not None:
+        if on_stats:
+            on_stats(generation_stats({}, model, cached=True))
+        yield cached
+        return
+
+    parts: list[str] = []
+    tried: list = []
+    while True:
+        try:
+            with _route(model, api_key, tried) as base_url:
+                logger.debug("Streaming from Ollama endpoint %s/api/chat model=%s", base_url, model)
+                with concurrency_slot("ollama"):
+                    started = time.perf_counter()
+                    with _session().post(
+                        f"{base_url}/api/chat",
+                        json=payload,
+                        headers=headers if headers else None,
+                        timeout=REQUEST_TIMEOUT,
+                        stream=True,
+                    ) as response:
+                        nbytes = 0
+                        try:
+                            response.raise_for_status()
+                            for line in response.iter_lines():
+                                nbytes += len(line)
+                                data = _parse_stream_line(line)
+                                chunk = data.get("message", {}).get("content", "")
+                                if chunk:
+                                    parts.append(chunk)
+                                    yield chunk
+                                if data.get("done"):
+                                    stats = _record_stats(data, model)
+                                    if on_stats:
+                                        on_stats(stats)
+                        finally:
+                            # Timed over the whole body, so slow generation shows up as latency
+                            record_http("ollama", time.perf_counter() - started, response.status_code, nbytes)
+            break
+        except Exception as exc:
+            if not parts and _fail_over(exc, api_key, tried):
+                continue
+            _log_failure(exc)
+            raise
+
+    if key and "".join(parts).strip():
+        llm_cache.put(key, model, "".join(parts).strip())
+
+
+async def astream_ollama(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str | None = None,
+    use_cache: bool = True,
+    on_stats: StatsCallback | None = None,
+    **options,
+) -> AsyncIterator[str]:
+    """Async counterpart of stream_ollama()."""
+    payload, headers = _prepare_chat(model, system_prompt, user_prompt, api_key, options, stream=True)
+
+    key, cached = _cache_lookup(payload, use_cache)
+    if cached is not None:
+        if on_stats:
+            on_stats(generation_stats({}, model, cached=True))
+        yield cached
+        return
+
+    parts: list[str] = []
+    tried: list = []
+    while True:
+        try:
+            with _route(model, api_key, tried) as base_url:
+                logger.debug("Streaming from Ollama endpoint (async) %s/api/chat model=%s", base_url, model)
+                async with async_concurrency_slot("ollama"):
+                    client = get_async_client("ollama")
+                    started = time.perf_counter()
+                    async with client.stream(
+                        "POST",
+                        f"{base_url}/api/chat",
+                        json=payload,
+                        headers=headers or None,
+                        timeout=REQUEST_TIMEOUT,
+                    ) as response:
+                        nbytes = 0
+                        try:
+                            if response.is_error:
+                                await response.aread()
+                                nbytes = len(response.content)
+                                response.raise_for_status()
+
+                            async for line in response.aiter_lines():
+                                nbytes += len(line.encode("utf-8"))
+                                data = _parse_stream_line(line)
+                                chunk = data.get("message", {}).get("content", "")
+                                if chunk:
+                                    parts.append(chunk)
+                                    yield chunk
+                                if data.get("done"):
+                                    stats = _record_stats(data, model)
+                                    if on_stats:
+                                        on_stats(stats)
+                        finally:
+                            record_http("ollama", time.perf_counter() - started, response.status_code, nbytes)
+            break
+        except Exception as exc:
+            if not parts and _fail_over(exc, api_key, tried):
+                continue
+            _log_failure(exc)
+            raise
+
+    if key and "".join(parts).strip():
+        llm_cache.put(key, model, "".join(parts).strip())
+
+
+@contextmanager
+def _route(model: str, api_key: str | None, tried: list) -> Iterator[str]:
+    """Yields the base URL for one attempt: Ollama Cloud, or a host from the pool."""
+    if api_key:
+        tried.append(OLLAMA_CLOUD_BASE_URL)
+        yield OLLAMA_CLOUD_BASE_URL
+        return
+    with get_ollama_pool().route(model, tried) as base_url:
+        yield base_url
+
+
+def _fail_over(exc: Exception, api_key: str | None, tried: list) -> bool:
+    return not api_key and get_ollama_pool().should_fail_over(exc, tried)
+
+
+def _session():
+    # With several hosts a busy or failing server is retried on another host, not re-polled
+    if get_ollama_pool().multi_host:
+        return get_session("ollama-pool", retry_statuses=())
+    return get_session("ollama")
+
+
+def _retry_statuses() -> tuple[int, ...]:
+    return () if get_ollama_pool().multi_host else RETRY_STATUSES
+
+
+def _log_failure(exc: Exception) -> None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        logger.error("Ollama API request failed: %s", exc)
+    else:
+        logger.error("Ollama API request failed with status %s: %s", response.status_code, response.text)
+
+
+def _cache_lookup(payload: dict, use_cache: bool) -> tuple[str | None, str | None]:
+    """Returns (cache key, cached response) for a chat payload; both None when bypassed."""
+    if not use_cache or not llm_cache.enabled:
+        return None, None
+    key = cache_key(payload)
+    cached = llm_cache.get(key)
+    record_cache("llm", cached is not None)
+    if cached is not None:
+        logger.debug("LLM cache hit model=%s key=%s", payload["model"], key[:12])
+    return key, cached
+
+
+def _parse_stream_line(line: str | bytes) -> dict:
+    """Decodes one /api/chat NDJSON stream line ({} for keep-alive blank lines)."""
+    if not line:
+        return {}
+    data = json.loads(line)
+    if data.get("error"):
+        raise ValueError(f"Ollama stream error: {data['error']}")
+    return data
+
+
+def generation_stats(data: dict, model: str, cached: bool = False) -> dict:
+    """
+    Extracts the generation statistics from a final /api/chat response.
+
+    Returns:
+        dict: model, cached, prompt_eval_count, eval_count and the
+        load/prompt_eval/eval/total durations in seconds (missing fields are 0).
+    """
+    stats = {"model": data.get("model") or model, "cached": cached}
+    for field in COUNT_FIELDS:
+        stats[field] = int(data.get(field) or 0)
+    for field in DURATION_FIELDS:
+        stats[field] = round((data.get(field) or 0) / 1e9, 4)
+    return stats
+
+
+def _record_stats(data: dict, model: str) -> dict:
+    stats = generation_stats(data, model)
+    record_generation(stats)
+    logger.debug(
+        "Ollama model=%s prompt=%d tok in %.2fs, eval=%d tok in %.2fs, load %.2fs",
+        stats["model"], stats["prompt_eval_count"], stats["prompt_eval_duration"],
+        stats["eval_count"], stats["eval_duration"], stats["load_duration"],
+    )
+    return stats
+
+
+def summarize_generation(calls: list[dict]) -> dict:
+    """
+    Aggregates per-call generation statistics by model.
+
+    Returns:
+        dict: model → calls, cached, token and duration totals, and
+        prompt/eval throughput in tokens per second (None when unmeasured).
+    """
+    models: dict[str, dict] = {}
+    for call in calls:
+        totals = models.setdefault(call.get("model", ""), {
+            "calls": 0, "cached": 0, "prompt_tokens": 0, "eval_tokens": 0,
+            "load_seconds": 0.0, "prompt_eval_seconds": 0.0, "eval_seconds": 0.0,
+        })
+        totals["calls"] += 1
+        totals["cached"] += bool(call.get("cached"))
+        totals["prompt_tokens"] += call.get("prompt_eval_count", 0)
+        totals["eval_tokens"] += call.get("eval_count", 0)
+        totals["load_seconds"] += call.get("load_duration", 0.0)
+        totals["prompt_eval_seconds"] += call.get("prompt_eval_duration", 0.0)
+        totals["eval_seconds"] += call.get("eval_duration", 0.0)
+
+    for totals in models.values():
+        for key in ("load_seconds", "prompt_eval_seconds", "eval_seconds"):
+            totals[key] = round(totals[key], 4)
+        totals["prompt_tokens_per_second"] = _rate(totals["prompt_tokens"], totals["prompt_eval_seconds"])
+        totals["eval_tokens_per_second"] = _rate(totals["eval_tokens"], totals["eval_seconds"])
+    return models
+
+
+def _rate(tokens: int, seconds: float) -> float | None:
+    return round(tokens / seconds, 1) if seconds > 0 else None
+
+
+def _prepare_chat(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    api_key: str | None,
+    options: dict,
+    stream: bool = False,
+) -> tuple[dict, dict]:
+    """
+    Builds the (payload, headers) pair for an /api/chat request.
+
+    The endpoint is chosen per attempt by _route(): Ollama Cloud when an API
+    key is given, otherwise a host from the OLLAMA_HOSTS pool.
+    """
+    headers = {}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+
     options = {k: v for k, v in options.items() if v is not None}
 
     payload = {
         "model": model,
-        "stream": False,
+        "stream": stream,
         "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user",   "content": user_prompt},
@@ -128,21 +559,26 @@ def call_ollama(
     if options:
         payload["options"] = options
 
-    logger.debug("Calling Ollama endpoint %s model=%s", endpoint, model)
-    response = requests.post(
-        endpoint,
-        json=payload,
-        headers=headers if headers else None,
-        timeout=REQUEST_TIMEOUT,
-    )
+    keep_alive = _keep_alive()
+    if keep_alive is not None and not api_key:
+        payload["keep_alive"] = keep_alive
+
+    return payload, headers
+
+
+def _keep_alive() -> str | int | None:
+    """OLLAMA_KEEP_ALIVE as Ollama expects it: a duration string or a number of seconds."""
+    value = OLLAMA_KEEP_ALIVE.strip()
+    if not value:
+        return None
     try:
-        response.raise_for_status()
-    except Exception:
-        logger.exception("Ollama API request failed with status %s: %s", response.status_code if response is not None else None, response.text if response is not None else None)
-        raise
+        return int(value)
+    except ValueError:
+        return value
 
-    data = response.json()
 
+def _extract_content(data: dict) -> str:
+    """Returns the assistant message text from an /api/chat response."""
     # Ollama /api/chat response shape: {"message": {"role": "assistant", "content": "..."}}
     message = data.get("message", {})
     content = message.get("content", "")
@@ -154,14 +590,55 @@ def call_ollama(
     return content.strip()
 
 
-def list_available_models() -> list[str]:
+def list_available_models(base_url: str = OLLAMA_BASE_URL) -> list[str]:
     """
     Returns a list of model names currently available in the local Ollama instance.
-    Useful for debugging and validation.
+    Useful for debugging and validation, and used as the host pool's health probe.
     """
-    endpoint = f"{OLLAMA_BASE_URL}/api/tags"
+    endpoint = f"{base_url}/api/tags"
     logger.debug("Listing available Ollama models from %s", endpoint)
-    response = requests.get(endpoint, timeout=10)
+    response = get_session("ollama").get(endpoint, timeout=10)
     response.raise_for_status()
     data = response.json()
     return [m["name"] for m in data.get("models", [])]
+
+
+def list_running_models(base_url: str = OLLAMA_BASE_URL) -> list[str]:
+    """Returns the names of the models currently loaded in the local Ollama instance."""
+    endpoint = f"{base_url}/api/ps"
+    response = get_session("ollama").get(endpoint, timeout=10)
+    response.raise_for_status()
+    return [m.get("name") or m.get("model", "") for m in response.json().get("models", [])]
+
+
+def preload_model(model: str, num_ctx: int | None = None, base_url: str = OLLAMA_BASE_URL) -> float:
+    """
+    Loads `model` into the local Ollama instance without generating anything,
+    and keeps it resident for OLLAMA_KEEP_ALIVE.
+
+    Pass the `num_ctx` later requests will use: Ollama reloads a model whose
+    context size changes, which would waste the warm-up.
+
+    Returns:
+        float: Seconds Ollama spent loading the model (0 if it was already loaded).
+
+    Raises:
+        requests.HTTPError: If the Ollama API returns an error status
+                            (e.g. the model is not pulled).
+    """
+    endpoint = f"{base_url}/api/chat"
+    # A chat request without messages only loads the model
+    payload = {"model": model, "messages": [], "stream": False}
+    if num_ctx:
+        payload["options"] = {"num_ctx": num_ctx}
+    keep_alive = _keep_alive()
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+
+    logger.debug("Preloading Ollama model %s", model)
+    with concurrency_slot("ollama"):
+        started = time.perf_counter()
+        response = get_session("ollama").post(endpoint, json=payload, timeout=REQUEST_TIMEOUT)
+        record_http("ollama", time.perf_counter() - started, response.status_code, len(response.content))
+    response.raise_for_status()
+    return generation_stats(response.json(), model)["load_duration"]
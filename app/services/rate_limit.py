@@ -0,0 +1,138 @@
+import asyncio
+import os
+import threading
+import time
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fallback budget used until Reddit's X-Ratelimit-* headers have been seen
+REDDIT_REQUESTS_PER_MINUTE = float(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "60"))
+REDDIT_BURST = float(os.getenv("REDDIT_BURST", "5"))
+
+
+def _header_float(headers, name: str) -> float | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    Thread- and asyncio-safe token bucket that adapts to Reddit's rate-limit headers.
+
+    Callers reserve a token before every request and sleep until their slot
+    comes up, so excess requests queue in arrival order instead of failing.
+    After each response, X-Ratelimit-Remaining / X-Ratelimit-Reset re-pace the
+    bucket to spread the remaining budget evenly over the reset window; a 429
+    pauses all callers until Retry-After (or the window reset) has passed.
+    """
+
+    def __init__(self, requests_per_minute: float = REDDIT_REQUESTS_PER_MINUTE, burst: float = REDDIT_BURST):
+        self.default_rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, burst)
+        self.rate = self.default_rate
+        self.tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._window_reset_at = 0.0
+        self._lock = threading.Lock()
+        self.remaining: float | None = None
+        self.requests = 0
+        self.throttled = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self._window_reset_at and self.rate != self.default_rate:
+            # The header-derived pace only applies until the window resets
+            self.rate = self.default_rate
+        start = max(self._updated_at, self._paused_until)
+        if now > start:
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._updated_at = max(now, self._updated_at)
+
+    def _reserve(self) -> float:
+        """Takes one token and returns how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.requests += 1
+            delay = max(0.0, self._paused_until - now)
+            if self.tokens < 0:
+                delay += -self.tokens / self.rate
+            if delay > 0:
+                self.waits += 1
+                self.total_wait += delay
+                self.max_wait = max(self.max_wait, delay)
+            return delay
+
+    def acquire(self) -> float:
+        """Blocks until a request may be sent. Returns the seconds waited."""
+        delay = self._reserve()
+        if delay > 0:
+            logger.debug("Reddit rate limiter: waiting %.2fs", delay)
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self) -> float:
+        """Async counterpart of acquire()."""
+        delay = self._reserve()
+        if delay > 0:
+            logger.debug("Reddit rate limiter: waiting %.2fs", delay)
+            await asyncio.sleep(delay)
+        return delay
+
+    def update_from_headers(self, headers) -> None:
+        """Re-paces the bucket from X-Ratelimit-Remaining / X-Ratelimit-Reset."""
+        remaining = _header_float(headers, "X-Ratelimit-Remaining")
+        reset = _header_float(headers, "X-Ratelimit-Reset")
+        if remaining is None or reset is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.remaining = remaining
+            self._window_reset_at = now + reset
+            if remaining < 1:
+                self._paused_until = max(self._paused_until, now + reset)
+                self.tokens = min(self.tokens, 0.0)
+            else:
+                self.rate = max(remaining / max(reset, 1.0), 1e-3)
+                self.tokens = min(self.tokens, remaining)
+
+    def penalize(self, retry_after: float | None) -> None:
+        """Pauses every caller after a 429, for Retry-After or until the window resets."""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            pause = retry_after if retry_after is not None else max(self._window_reset_at - now, 1.0 / self.rate)
+            self._paused_until = max(self._paused_until, now + pause)
+            self.tokens = min(self.tokens, 0.0)
+        logger.warning("Reddit returned 429; pausing requests for %.1fs", pause)
+
+    def snapshot(self) -> dict:
+        """Current budget and cumulative wait statistics."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "tokens": round(self.tokens, 2),
+                "rate_per_minute": round(self.rate * 60, 2),
+                "paused_for": round(max(0.0, self._paused_until - now), 2),
+                "header_remaining": self.remaining,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "waits": self.waits,
+                "total_wait_seconds": round(self.total_wait, 2),
+                "max_wait_seconds": round(self.max_wait, 2),
+            }
+
+
+reddit_rate_limiter = RateLimiter()
@@ -1,5 +1,22 @@
-import requests
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator
 from urllib.parse import urlparse, urlunparse
+
+from app.services.http_client import (
+    async_concurrency_slot,
+    async_request,
+    concurrency_slot,
+    get_async_client,
+    get_session,
+    parse_retry_after,
+)
+from app.services.comment_tree import CommentSelector
+from app.metrics import record_cache, record_http
+from app.services.rate_limit import reddit_rate_limiter
 from app.logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,7 +27,135 @@ HEADERS = {
     "Accept": "application/json",
 }
 
-REQUEST_TIMEOUT = 15  # seconds
+REQUEST_TIMEOUT = float(os.getenv("REDDIT_REQUEST_TIMEOUT", "15"))  # seconds
+
+REDDIT_BASE_URL = "https://www.reddit.com"
+
+# Where API requests are sent. Empty uses each post URL's own host; set it to
+# point the client at a local stand-in (e.g. the benchmark fixtures server).
+REDDIT_API_BASE_URL = os.getenv("REDDIT_API_BASE_URL", "").rstrip("/")
+
+# Listing crawler settings
+LISTING_SORTS = ("new", "hot", "top")
+LISTING_TIME_FILTERS = ("hour", "day", "week", "month", "year", "all")
+LISTING_PAGE_SIZE = 100  # Reddit's maximum page size
+
+# 429s are queued by the rate limiter rather than retried blindly by the transport
+RETRY_STATUSES = (500, 502, 503, 504)
+MAX_THROTTLED_ATTEMPTS = int(os.getenv("REDDIT_MAX_THROTTLED_ATTEMPTS", "5"))
+
+# Process-wide post cache limits (entries / seconds). A size of 0 disables caching.
+POST_CACHE_SIZE = int(os.getenv("REDDIT_POST_CACHE_SIZE", "256"))
+POST_CACHE_TTL = float(os.getenv("REDDIT_POST_CACHE_TTL", "300"))
+
+# Comment listings can be large, so fewer of them are kept than posts
+COMMENT_CACHE_SIZE = int(os.getenv("REDDIT_COMMENT_CACHE_SIZE", "32"))
+
+# Listings carry no comments: extracting them costs one thread request per listing post
+LISTING_COMMENTS = os.getenv("REDDIT_LISTING_COMMENTS", "").lower() in ("1", "true", "yes")
+
+# Comment selection limits (see fetch_reddit_comments)
+COMMENTS_TOP_K = int(os.getenv("REDDIT_COMMENTS_TOP_K", "20"))
+COMMENTS_MAX_DEPTH = int(os.getenv("REDDIT_COMMENTS_MAX_DEPTH", "3"))
+COMMENTS_MAX_BYTES = int(os.getenv("REDDIT_COMMENTS_MAX_BYTES", "8000"))
+MORE_CHILDREN_BATCHES = int(os.getenv("REDDIT_MORE_CHILDREN_BATCHES", "2"))
+MORE_CHILDREN_BATCH_SIZE = 100  # Reddit's per-request limit for /api/morechildren
+
+# Post .json requests return comments best-first so the top-K fill early
+THREAD_PARAMS = {"sort": "top"}
+
+# Matches the base-36 post ID in .../comments/<post_id>/...
+POST_ID_PATTERN = re.compile(r"/comments/([a-z0-9]+)", re.IGNORECASE)
+
+
+class PostCache:
+    """
+    Thread-safe LRU cache of Reddit post data with a per-entry TTL.
+
+    Entries are keyed by canonical post ID, so different spellings of the same
+    post URL (www/old, trailing slash, slug, query string) share one entry.
+    Cached dicts are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, name: str, maxsize: int = POST_CACHE_SIZE, ttl: float = POST_CACHE_TTL):
+        self.name = name  # label on cache_lookups_total
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        record_cache(self.name, entry is not None)
+        return entry[1] if entry is not None else None
+
+    def put(self, key: str, value: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+post_cache = PostCache("post")
+comment_cache = PostCache("comment", maxsize=COMMENT_CACHE_SIZE)
+
+
+def reserve_comment_cache(in_flight: int) -> None:
+    """
+    Grows the comment cache to hold one listing per in-flight pipeline, so a
+    thread fetched by fetch_post is not evicted before its comments are
+    extracted (which would fetch it again). A disabled cache stays disabled.
+    """
+    if 0 < comment_cache.maxsize < in_flight:
+        comment_cache.maxsize = in_flight
+
+
+def canonical_post_id(reddit_url: str) -> str:
+    """
+    Returns the lowercase base-36 post ID for a Reddit post URL.
+
+    Example:
+        https://old.reddit.com/r/Python/comments/ABC123/my_post/?utm=x → abc123
+
+    Raises:
+        ValueError: If the URL does not contain a /comments/<id> segment.
+    """
+    match = POST_ID_PATTERN.search(urlparse(reddit_url).path)
+    if not match:
+        raise ValueError(f"Could not determine Reddit post ID from URL: {reddit_url}")
+    return match.group(1).lower()
 
 
 def _to_json_url(reddit_url: str) -> str:
@@ -23,13 +168,82 @@ def _to_json_url(reddit_url: str) -> str:
     """
     parsed = urlparse(reddit_url)
     path = parsed.path.rstrip("/") + ".json"
+    if REDDIT_API_BASE_URL:
+        api = urlparse(REDDIT_API_BASE_URL)
+        parsed = parsed._replace(scheme=api.scheme, netloc=api.netloc)
     return urlunparse(parsed._replace(path=path, query="", fragment=""))
 
 
-def fetch_reddit_post(url: str) -> dict:
+def _api_url(path: str) -> str:
+    """Returns the API URL for a site-relative path (e.g. "/api/morechildren.json")."""
+    return (REDDIT_API_BASE_URL or REDDIT_BASE_URL) + path
+
+
+def _get(url: str, params: dict | None = None):
+    """
+    GETs a Reddit API URL through the process-wide rate limiter.
+
+    Throttled (429) responses pause the limiter and the request is re-queued,
+    up to MAX_THROTTLED_ATTEMPTS times.
+
+    Raises:
+        requests.HTTPError: If the final response is an error status.
+    """
+    for _ in range(MAX_THROTTLED_ATTEMPTS):
+        reddit_rate_limiter.acquire()
+        with concurrency_slot("reddit"):
+            started = time.perf_counter()
+            response = get_session("reddit", retry_statuses=RETRY_STATUSES).get(
+                url, params=params, headers=HEADERS, timeout=REQUEST_TIMEOUT
+            )
+            record_http("reddit", time.perf_counter() - started, response.status_code, len(response.content))
+        reddit_rate_limiter.update_from_headers(response.headers)
+        if response.status_code != 429:
+            break
+        reddit_rate_limiter.penalize(parse_retry_after(response.headers.get("Retry-After")))
+    try:
+        response.raise_for_status()
+    except Exception:
+        logger.exception("Reddit API request failed for url=%s status=%s", url, response.status_code)
+        raise
+    return response
+
+
+async def _aget(url: str, params: dict | None = None):
+    """Async counterpart of _get()."""
+    for _ in range(MAX_THROTTLED_ATTEMPTS):
+        await reddit_rate_limiter.aacquire()
+        async with async_concurrency_slot("reddit"):
+            started = time.perf_counter()
+            response = await async_request(
+                get_async_client("reddit"),
+                "GET",
+                url,
+                retry_statuses=RETRY_STATUSES,
+                params=params,
+                headers=HEADERS,
+                timeout=REQUEST_TIMEOUT,
+            )
+            record_http("reddit", time.perf_counter() - started, response.status_code, len(response.content))
+        reddit_rate_limiter.update_from_headers(response.headers)
+        if response.status_code != 429:
+            break
+        reddit_rate_limiter.penalize(parse_retry_after(response.headers.get("Retry-After")))
+    try:
+        response.raise_for_status()
+    except Exception:
+        logger.exception("Reddit API request failed for url=%s status=%s", url, response.status_code)
+        raise
+    return response
+
+
+def fetch_reddit_post(url: str, use_cache: bool = True) -> dict:
     """
     Fetches Reddit post data using the public .json API endpoint.
 
+    Results are served from the process-wide post cache when a fresh entry
+    exists for the same post ID; pass use_cache=False to force a network fetch.
+
     Returns:
         dict: The post's 'data' object from the Reddit API response.
 
@@ -37,18 +251,66 @@ def fetch_reddit_post(url: str) -> dict:
         ValueError: If the response structure is unexpected.
         requests.HTTPError: If the HTTP request fails.
     """
-    json_url = _to_json_url(url)
+    cache_key = canonical_post_id(url)
+    if use_cache:
+        cached = post_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Post cache hit for id=%s", cache_key)
+            return cached
+
+    return _fetch_thread(url)[0]
+
 
+def _fetch_thread(url: str) -> tuple[dict, dict]:
+    """Fetches a post .json from the network; returns (post, comment listing) and caches both."""
+    json_url = _to_json_url(url)
     logger.debug("Fetching Reddit JSON URL: %s", json_url)
-    response = requests.get(json_url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
-    try:
-        response.raise_for_status()
-    except Exception:
-        logger.exception("Reddit API request failed for url=%s status=%s", json_url, response.status_code if response is not None else None)
-        raise
+    response = _get(json_url, params=THREAD_PARAMS)
+    return _store_thread(canonical_post_id(url), response.json())
+
+
+async def afetch_reddit_post(url: str, use_cache: bool = True) -> dict:
+    """
+    Async counterpart of fetch_reddit_post(), sharing the same post cache.
 
-    payload = response.json()
+    Raises:
+        ValueError: If the response structure is unexpected.
+        httpx.HTTPStatusError: If the HTTP request fails.
+    """
+    cache_key = canonical_post_id(url)
+    if use_cache:
+        cached = post_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Post cache hit for id=%s", cache_key)
+            return cached
+
+    return (await _afetch_thread(url))[0]
+
+
+async def _afetch_thread(url: str) -> tuple[dict, dict]:
+    """Async counterpart of _fetch_thread()."""
+    json_url = _to_json_url(url)
+    logger.debug("Fetching Reddit JSON URL (async): %s", json_url)
+    response = await _aget(json_url, params=THREAD_PARAMS)
+    return _store_thread(canonical_post_id(url), response.json())
 
+
+def _store_thread(cache_key: str, payload) -> tuple[dict, dict]:
+    """
+    Caches a post .json payload's post and comment listing and returns both.
+
+    Callers use the returned listing directly; the caches only save later
+    requests and may be disabled or expire immediately.
+    """
+    post_data = _parse_post_payload(payload)
+    post_cache.put(cache_key, post_data)
+    comments = payload[1] if len(payload) > 1 and isinstance(payload[1], dict) else {}
+    comment_cache.put(cache_key, comments)
+    return post_data, comments
+
+
+def _parse_post_payload(payload) -> dict:
+    """Extracts the post 'data' object from a Reddit post .json payload."""
     # Reddit returns a list with [post_listing, comments_listing]
     if not isinstance(payload, list) or len(payload) < 1:
         raise ValueError("Unexpected Reddit API response structure.")
@@ -65,3 +327,175 @@ def fetch_reddit_post(url: str) -> dict:
         raise ValueError("Post data object is empty.")
 
     return post_data
+
+
+def post_url(post_data: dict) -> str:
+    """Returns the canonical post URL for a Reddit post object."""
+    return REDDIT_BASE_URL + post_data.get("permalink", "")
+
+
+def subreddit_name(subreddit: str) -> str:
+    """Strips slashes and an "r/" prefix: " /r/Python/ " → "Python"."""
+    name = subreddit.strip().strip("/")
+    return name[2:] if name.lower().startswith("r/") else name
+
+
+def iter_subreddit_posts(
+    subreddit: str,
+    sort: str = "new",
+    time_filter: str | None = None,
+    since: float | None = None,
+    min_score: int | None = None,
+    max_posts: int | None = None,
+) -> Iterator[dict]:
+    """
+    Lazily pages through /r/<subreddit>/<sort>.json and yields post objects.
+
+    Pages of LISTING_PAGE_SIZE posts are requested one at a time using the
+    `after` cursor, only when the consumer asks for more. Every yielded post is
+    also stored in the post cache, so the pipeline never re-fetches it.
+
+    Args:
+        subreddit:   Subreddit name, with or without the "r/" prefix.
+        sort:        One of LISTING_SORTS.
+        time_filter: Reddit's `t` window for sort="top" (e.g. "day", "week").
+        since:       Only yield posts created at or after this Unix timestamp.
+                     With sort="new" paging stops at the first older post.
+        min_score:   Only yield posts with at least this score.
+        max_posts:   Stop after yielding this many posts.
+
+    Raises:
+        ValueError: If sort/time_filter are invalid or the listing is malformed.
+        requests.HTTPError: If a page request fails.
+    """
+    if sort not in LISTING_SORTS:
+        raise ValueError(f"Unsupported listing sort '{sort}'. Expected one of {LISTING_SORTS}.")
+    if time_filter is not None and time_filter not in LISTING_TIME_FILTERS:
+        raise ValueError(f"Unsupported time filter '{time_filter}'. Expected one of {LISTING_TIME_FILTERS}.")
+
+    listing_url = _api_url(f"/r/{subreddit_name(subreddit)}/{sort}.json")
+
+    params = {"limit": LISTING_PAGE_SIZE}
+    if time_filter and sort == "top":
+        params["t"] = time_filter
+
+    yielded = 0
+    after = None
+    while True:
+        if after:
+            params["after"] = after
+        logger.debug("Fetching listing page %s after=%s", listing_url, after)
+        listing = _get(listing_url, params=params).json()
+        if not isinstance(listing, dict) or "data" not in listing:
+            raise ValueError("Unexpected Reddit listing response structure.")
+
+        data = listing["data"]
+        for child in data.get("children", []):
+            post = child.get("data", {})
+            if child.get("kind") != "t3" or not post:
+                continue
+            if since is not None and post.get("created_utc", 0) < since:
+                if sort == "new":
+                    return
+                continue
+            if min_score is not None and post.get("score", 0) < min_score:
+                continue
+
+            if post.get("id"):
+                post_cache.put(post["id"].lower(), post)
+            yield post
+            yielded += 1
+            if max_posts is not None and yielded >= max_posts:
+                return
+
+        after = data.get("after")
+        if not after:
+            return
+
+
+def _comment_selector(top_k: int, max_depth: int, more_batches: int) -> CommentSelector:
+    return CommentSelector(top_k, max_depth, more_batches * MORE_CHILDREN_BATCH_SIZE)
+
+
+def _more_children_params(post_id: str, ids: list[str]) -> dict:
+    return {
+        "api_type": "json",
+        "link_id": f"t3_{post_id}",
+        "children": ",".join(ids),
+        "sort": "top",
+        "limit_children": "false",
+    }
+
+
+def _more_children_things(payload: dict) -> list:
+    return payload.get("json", {}).get("data", {}).get("things", [])
+
+
+def fetch_reddit_comments(
+    url: str,
+    top_k: int = COMMENTS_TOP_K,
+    max_depth: int = COMMENTS_MAX_DEPTH,
+    max_bytes: int = COMMENTS_MAX_BYTES,
+    more_batches: int = MORE_CHILDREN_BATCHES,
+) -> list[dict]:
+    """
+    Returns the top-K comments of a post by score.
+
+    The comment listing comes from the comment cache when the post was fetched
+    earlier in the run; otherwise the post .json is fetched once (listing
+    posts always take that request, see LISTING_COMMENTS). `more` stubs
+    within `max_depth` are expanded with at most `more_batches`
+    /api/morechildren calls of up to 100 IDs each.
+
+    Returns:
+        list[dict]: {"id", "author", "score", "depth", "body"} dicts, highest
+        score first, whose bodies fit in `max_bytes` in total.
+    """
+    if top_k <= 0:
+        return []
+    post_id = canonical_post_id(url)
+    listing = comment_cache.get(post_id)
+    if listing is None:
+        logger.debug("Comment listing for id=%s not cached; fetching the thread", post_id)
+        listing = _fetch_thread(url)[1]
+
+    selector = _comment_selector(top_k, max_depth, more_batches)
+    selector.feed(listing.get("data", {}).get("children", []))
+    for _ in range(more_batches):
+        ids = selector.take_more_ids(MORE_CHILDREN_BATCH_SIZE)
+        if not ids:
+            break
+        response = _get(_api_url("/api/morechildren.json"), params=_more_children_params(post_id, ids))
+        selector.feed(_more_children_things(response.json()))
+
+    logger.debug("Selected comments for id=%s from %d seen", post_id, selector.seen)
+    return selector.result(max_bytes)
+
+
+async def afetch_reddit_comments(
+    url: str,
+    top_k: int = COMMENTS_TOP_K,
+    max_depth: int = COMMENTS_MAX_DEPTH,
+    max_bytes: int = COMMENTS_MAX_BYTES,
+    more_batches: int = MORE_CHILDREN_BATCHES,
+) -> list[dict]:
+    """Async counterpart of fetch_reddit_comments()."""
+    if top_k <= 0:
+        return []
+    post_id = canonical_post_id(url)
+    listing = comment_cache.get(post_id)
+    if listing is None:
+        logger.debug("Comment listing for id=%s not cached; fetching the thread", post_id)
+        listing = (await _afetch_thread(url))[1]
+
+    selector = _comment_selector(top_k, max_depth, more_batches)
+    selector.feed(listing.get("data", {}).get("children", []))
+    for _ in range(more_batches):
+        ids = selector.take_more_ids(MORE_CHILDREN_BATCH_SIZE)
+        if not ids:
+            break
+        response = await _aget(_api_url("/api/morechildren.json"), params=_more_children_params(post_id, ids))
+        selector.feed(_more_children_things(response.json()))
+
+    logger.debug("Selected comments for id=%s from %d seen", post_id, selector.seen)
+    return selector.result(max_bytes)
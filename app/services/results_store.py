@@ -0,0 +1,382 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+from app.logger import get_logger
+from app.services.reddit_service import canonical_post_id
+from app.state import public_result
+
+logger = get_logger(__name__)
+
+DEFAULT_RESULTS_PATH = Path(__file__).resolve().parents[2] / ".cache" / "results.sqlite3"
+
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", str(DEFAULT_RESULTS_PATH))
+RESULTS_BATCH_SIZE = int(os.getenv("RESULTS_BATCH_SIZE", "50"))  # rows per write transaction
+RESULTS_FLUSH_SECONDS = float(os.getenv("RESULTS_FLUSH_SECONDS", "2"))  # max delay before a queued row is written
+RESULTS_STORE_DISABLED = os.getenv("RESULTS_STORE_DISABLED", "").lower() in ("1", "true", "yes")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    post_id       TEXT NOT NULL,
+    content_hash  TEXT NOT NULL,
+    subreddit     TEXT NOT NULL,
+    title         TEXT NOT NULL,
+    author        TEXT NOT NULL,
+    url           TEXT NOT NULL,
+    score         INTEGER NOT NULL,
+    created_utc   REAL NOT NULL,
+    model         TEXT NOT NULL,
+    analysis      TEXT NOT NULL,
+    story         TEXT NOT NULL,
+    data          TEXT NOT NULL,
+    stored_at     REAL NOT NULL,
+    UNIQUE (post_id, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_results_subreddit_created ON results (subreddit, created_utc);
+CREATE INDEX IF NOT EXISTS idx_results_score ON results (score);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_utc);
+CREATE INDEX IF NOT EXISTS idx_results_model_created ON results (model, created_utc);
+CREATE INDEX IF NOT EXISTS idx_results_post_stored ON results (post_id, stored_at);
+"""
+
+# Summary columns returned by query(); `analysis`, `story` and `data` make up the full result
+SUMMARY_COLUMNS = (
+    "post_id", "content_hash", "subreddit", "title", "author", "url",
+    "score", "created_utc", "model", "stored_at",
+)
+
+# query(order_by=...) → column
+ORDERINGS = {"created": "created_utc", "score": "score", "stored": "stored_at"}
+
+# Result fields kept in their own columns rather than in `data`
+_COLUMN_FIELDS = ("llm_response", "story")
+
+
+def _analysis_model(result: dict) -> str:
+    """The model that produced the analysis (the story model when there is no analysis call)."""
+    calls = result.get("llm_calls") or []
+    for call in calls:
+        if call.get("node") == "llm_analysis" and call.get("model"):
+            return call["model"]
+    return next((call["model"] for call in calls if call.get("model")), "")
+
+
+def result_row(result: dict) -> tuple | None:
+    """
+    Converts a finished pipeline state into a `results` row.
+
+    Returns None for results that cannot be stored: failed runs and states
+    without the raw post (post_data), which carries the subreddit and
+    creation time.
+    """
+    post = result.get("post_data") or {}
+    if result.get("error") or not post:
+        return None
+    try:
+        post_id = canonical_post_id(result.get("user_url", ""))
+    except ValueError:
+        post_id = str(post.get("id", "")).lower()
+    if not post_id:
+        return None
+
+    public = public_result(result)
+    data = {k: v for k, v in public.items() if k not in _COLUMN_FIELDS}
+    return (
+        post_id,
+        result.get("content_hash") or "",
+        str(post.get("subreddit", "")).lower(),
+        result.get("title") or post.get("title", ""),
+        post.get("author") or "",
+        result.get("user_url", ""),
+        int(result.get("upvotes", post.get("score", 0)) or 0),
+        float(post.get("created_utc", 0) or 0),
+        _analysis_model(result),
+        result.get("llm_response") or "",
+        result.get("story") or "",
+        json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str),
+        time.time(),
+    )
+
+
+class ResultsStore:
+    """
+    Persistent, indexed store of finished pipeline results.
+
+    One row per (post ID, content hash): re-analysing an unchanged post
+    replaces its row, an edited post gets a new one. Rows are indexed by
+    subreddit, score, creation time and model. add() only queues a result;
+    queued rows are written in one transaction once `batch_size` are pending
+    or after `flush_seconds`, whichever comes first. Reads flush first.
+    """
+
+    def __init__(
+        self,
+        path: str = RESULTS_DB_PATH,
+        batch_size: int = RESULTS_BATCH_SIZE,
+        flush_seconds: float = RESULTS_FLUSH_SECONDS,
+        enabled: bool = not RESULTS_STORE_DISABLED,
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()          # guards the connection
+        self._pending: list[tuple] = []
+        self._pending_lock = threading.Lock()
+        self._flusher: threading.Thread | None = None
+        self._wakeup = threading.Event()
+        self.stored = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def add(self, result: dict) -> bool:
+        """Queues a finished pipeline state for writing; False if it is not storable."""
+        if not self.enabled:
+            return False
+        row = result_row(result)
+        if row is None:
+            return False
+        with self._pending_lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+        else:
+            self._start_flusher()
+        return True
+
+    def flush(self) -> int:
+        """Writes all queued rows in one transaction; returns how many were written."""
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute("BEGIN")
+                try:
+                    conn.executemany(
+                        "INSERT INTO results (post_id, content_hash, subreddit, title, author, url, score, "
+                        "created_utc, model, analysis, story, data, stored_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(post_id, content_hash) DO UPDATE SET "
+                        "subreddit = excluded.subreddit, title = excluded.title, author = excluded.author, "
+                        "url = excluded.url, score = excluded.score, created_utc = excluded.created_utc, "
+                        "model = excluded.model, analysis = excluded.analysis, story = excluded.story, "
+                        "data = excluded.data, stored_at = excluded.stored_at",
+                        rows,
+                    )
+                    conn.execute("COMMIT")
+                    self.stored += len(rows)
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error:
+                logger.exception("Results store write failed; %d results not stored", len(rows))
+                return 0
+        logger.debug("Stored %d results", len(rows))
+        return len(rows)
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        with self._pending_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, name="results-flush", daemon=True)
+            self._flusher.start()
+
+    def _flush_forever(self) -> None:
+        while not self._wakeup.wait(self.flush_seconds):
+            self.flush()
+
+    def close(self) -> None:
+        """Writes queued rows and closes the database."""
+        self._wakeup.set()
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def _read(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        self.flush()
+        with self._lock:
+            conn = self._connection()
+            conn.row_factory = sqlite3.Row
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.row_factory = None
+
+    @staticmethod
+    def _full(row: sqlite3.Row) -> dict:
+        """Rebuilds the stored public result from a row."""
+        return {**json.loads(row["data"]), "llm_response": row["analysis"], "story": row["story"]}
+
+    def get(self, post: str, content_hash: str | None = None) -> dict | None:
+        """
+        Returns the stored result for a post URL, ID or fullname: the given content
+        version, or the most recently stored one. None if not stored.
+        """
+        try:
+            post_id = canonical_post_id(post)
+        except ValueError:
+            post_id = post.strip().lower().removeprefix("t3_")
+        if content_hash:
+            rows = self._read(
+                "SELECT data, analysis, story FROM results WHERE post_id = ? AND content_hash = ?",
+                (post_id, content_hash),
+            )
+        else:
+            rows = self._read(
+                "SELECT data, analysis, story FROM results WHERE post_id = ? ORDER BY stored_at DESC LIMIT 1",
+                (post_id,),
+            )
+        return self._full(rows[0]) if rows else None
+
+    def contains(self, post_id: str, content_hash: str) -> bool:
+        """True when this exact post version has been stored (dedupe before re-analysing)."""
+        return bool(self._read(
+            "SELECT 1 FROM results WHERE post_id = ? AND content_hash = ?", (post_id.lower(), content_hash)
+        ))
+
+    @staticmethod
+    def _where(
+        subreddit: str | None = None,
+        model: str | None = None,
+        min_score: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> tuple[str, tuple]:
+        clauses, params = [], []
+        if subreddit:
+            clauses.append("subreddit = ?")
+            params.append(subreddit.lower())
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if since is not None:
+            clauses.append("created_utc >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_utc < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+    def query(
+        self,
+        subreddit: str | None = None,
+        model: str | None = None,
+        min_score: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        order_by: str = "created",
+        descending: bool = True,
+        limit: int | None = 100,
+        offset: int = 0,
+        full: bool = False,
+    ) -> list[dict]:
+        """
+        Returns stored results matching every given filter.
+
+        Args:
+            subreddit:  Exact subreddit name (case-insensitive).
+            model:      Analysis model.
+            min_score:  Minimum post score.
+            since/until: Post creation time window (Unix seconds, until exclusive).
+            order_by:   "created", "score" or "stored".
+            limit:      Max rows (None = all).
+            full:       Include the whole result ("result") instead of summary columns only.
+
+        Raises:
+            ValueError: If `order_by` is not one of ORDERINGS.
+        """
+        if order_by not in ORDERINGS:
+            raise ValueError(f"order_by must be one of {', '.join(ORDERINGS)}")
+        where, params = self._where(subreddit, model, min_score, since, until)
+        columns = ", ".join(SUMMARY_COLUMNS + (("data", "analysis", "story") if full else ()))
+        sql = (
+            f"SELECT {columns} FROM results{where} "
+            f"ORDER BY {ORDERINGS[order_by]} {'DESC' if descending else 'ASC'} LIMIT ? OFFSET ?"
+        )
+        rows = self._read(sql, params + (limit if limit is not None else -1, offset))
+        out = []
+        for row in rows:
+            item = {column: row[column] for column in SUMMARY_COLUMNS}
+            if full:
+                item["result"] = self._full(row)
+            out.append(item)
+        return out
+
+    def iter_results(self, page_size: int = 500, **filters) -> Iterator[dict]:
+        """
+        Yields full query() rows page by page (for exports), oldest post first.
+
+        Pages are keyed on creation time and row id, so memory stays flat and
+        rows written meanwhile do not shift pages.
+        """
+        where, params = self._where(**filters)
+        joiner = " AND " if where else " WHERE "
+        last = (float("-inf"), -1)
+        columns = ", ".join(("rowid",) + SUMMARY_COLUMNS + ("data", "analysis", "story"))
+        while True:
+            rows = self._read(
+                f"SELECT {columns} FROM results{where}{joiner}(created_utc, rowid) > (?, ?) "
+                "ORDER BY created_utc, rowid LIMIT ?",
+                params + last + (page_size,),
+            )
+            for row in rows:
+                yield {**{column: row[column] for column in SUMMARY_COLUMNS}, "result": self._full(row)}
+            if len(rows) < page_size:
+                return
+            last = (rows[-1]["created_utc"], rows[-1]["rowid"])
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self._read(f"SELECT COUNT(*) AS n FROM results{where}", params)[0]["n"]
+
+    def snapshot(self) -> dict:
+        """Results written by this process, for batch summaries."""
+        return {"enabled": self.enabled, "path": self.path, "stored": self.stored}
+
+    def stats(self) -> dict:
+        """Row counts per subreddit and model, for the CLI and batch summaries."""
+        by_subreddit = self._read(
+            "SELECT subreddit, COUNT(*) AS n FROM results GROUP BY subreddit ORDER BY n DESC LIMIT 20"
+        )
+        by_model = self._read("SELECT model, COUNT(*) AS n FROM results GROUP BY model ORDER BY n DESC")
+        return {
+            "path": self.path,
+            "results": self.count(),
+            "posts": self._read("SELECT COUNT(DISTINCT post_id) AS n FROM results")[0]["n"],
+            "subreddits": {row["subreddit"]: row["n"] for row in by_subreddit},
+            "models": {row["model"]: row["n"] for row in by_model},
+        }
+
+
+results_store = ResultsStore()
+# Queued rows are written on interpreter exit
+atexit.register(results_store.close)
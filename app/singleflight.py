@@ -0,0 +1,147 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.logger import get_logger
+from app.metrics import record_singleflight
+from app.services.llm_cache import llm_cache
+from app.services.reddit_service import canonical_post_id
+
+logger = get_logger(__name__)
+
+
+class _Call:
+    """One in-flight execution and the callers waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _resolve(future: asyncio.Future, call: _Call) -> None:
+    if future.done():  # the waiter was cancelled
+        return
+    if isinstance(call.error, asyncio.CancelledError):
+        future.cancel()
+    elif call.error is not None:
+        future.set_exception(call.error)
+    else:
+        future.set_result(call.result)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result (or exception).
+    Nothing is cached: once the call has finished, the next caller for the
+    key runs it again. Sync callers (threads) and async callers (on any event
+    loop) can attach to each other's calls.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.shared = 0
+
+    def _join(self, key: Hashable) -> tuple[_Call, bool]:
+        """Returns the call for `key` and whether this caller leads it. Hold self._lock."""
+        call = self._calls.get(key)
+        if call is not None:
+            self.shared += 1
+            return call, False
+        call = self._calls[key] = _Call()
+        self.runs += 1
+        return call, True
+
+    def _finish(self, key: Hashable, call: _Call, result: Any, error: BaseException | None) -> None:
+        with self._lock:
+            del self._calls[key]
+            call.result, call.error = result, error
+            call.done.set()
+            waiters, call.waiters = call.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, call)
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> tuple[Any, bool]:
+        """
+        Runs `func(*args, **kwargs)` unless a call with the same key is in flight.
+
+        Returns:
+            tuple: (result, shared) — shared is True when the result came from
+            another caller's execution.
+
+        Raises:
+            Whatever the leading execution raised.
+        """
+        with self._lock:
+            call, leader = self._join(key)
+        record_singleflight(self.name, leader)
+        if not leader:
+            logger.debug("Attached to in-flight %s call for key=%s", self.name, key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as exc:
+            self._finish(key, call, None, exc)
+            raise
+        self._finish(key, call, result, None)
+        return result, False
+
+    async def ado(self, key: Hashable, afunc: Callable[..., Awaitable[Any]], *args, **kwargs) -> tuple[Any, bool]:
+        """Async counterpart of do(): awaits `afunc(*args, **kwargs)` or an in-flight call."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call, leader = self._join(key)
+            if not leader:
+                future = loop.create_future()
+                call.waiters.append((loop, future))
+        record_singleflight(self.name, leader)
+        if not leader:
+            logger.debug("Attached to in-flight %s call for key=%s", self.name, key)
+            return await future, True
+
+        try:
+            result = await afunc(*args, **kwargs)
+        except BaseException as exc:
+            self._finish(key, call, None, exc)
+            raise
+        self._finish(key, call, result, None)
+        return result, False
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def stats(self) -> dict:
+        """Executions started and calls that attached to one instead, for batch summaries."""
+        with self._lock:
+            return {"runs": self.runs, "shared": self.shared, "in_flight": len(self._calls)}
+
+
+def pipeline_key(url: str, **config: Hashable) -> tuple:
+    """
+    Singleflight key for one pipeline run: the canonical post ID plus every
+    setting that changes the result (the graph layout, the LLM cache, ...).
+
+    URLs without a post ID key on the stripped URL; the run fails validation
+    either way.
+    """
+    try:
+        post = canonical_post_id(url)
+    except ValueError:
+        post = url.strip()
+    return (post, ("llm_cache", llm_cache.enabled), *sorted(config.items()))
+
+
+# Process-wide: CLI batches, the Streamlit server's sessions and API jobs share it
+pipeline_flight = SingleFlight("pipeline")
@@ -1,29 +1,80 @@
-from typing import Optional
+import operator
+from typing import Annotated, Optional
 from typing_extensions import TypedDict
 
 
+def merge_dicts(current: dict, update: dict) -> dict:
+    """Reducer for per-node dicts written by parallel branches (timings, ttft)."""
+    return {**(current or {}), **(update or {})}
+
+
+def first_error(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Reducer that keeps the first error when parallel branches both fail."""
+    return current or update
+
+
 class WorkflowState(TypedDict):
-    """Shared state passed between all LangGraph nodes."""
+    """
+    Shared state passed between all LangGraph nodes.
+
+    Annotated fields can be written by parallel branches in the same step and
+    are combined with their reducer; every other field has one writer per step.
+    """
     user_url: str
     is_valid: bool
+    post_data: dict     # raw Reddit post object, fetched once per run by fetch_agent
     title: str
     upvotes: int
     content: str
+    content_hash: str   # sha256 of title + cleaned content, for edit detection
+    comments: list      # top comments by score: {"author", "score", "body"}
+    fetch_comments: bool  # False skips comment extraction (listing posts without --listing-comments)
     structured_json: dict
+    payload_tokens: int # estimated tokens of the compact structured_json
     llm_response: str
+    analysis_chunks: int  # chunks analysed (1 = single pass, >1 = map-reduce)
     story: str          # ← new field
-    error: Optional[str]
+    ttft: Annotated[dict, merge_dicts]         # node name → seconds to first streamed token
+    timings: Annotated[dict, merge_dicts]      # node name → wall seconds spent in the node
+    llm_calls: Annotated[list, operator.add]   # per Ollama call: node, model, token counts, phase durations
+    error: Annotated[Optional[str], first_error]
 
 
-def initial_state(url: str) -> WorkflowState:
+# Internal fields that are not part of the user-facing result
+PRIVATE_FIELDS = ("post_data",)
+
+
+def initial_state(url: str, post_data: dict | None = None, fetch_comments: bool = True) -> WorkflowState:
+    """
+    Builds the starting state for one run.
+
+    Pass `post_data` when the post object is already known (e.g. from a
+    subreddit listing) so the pipeline does not fetch it again. Listing posts
+    carry no comments; with `fetch_comments=False` the run goes without them
+    instead of fetching the thread.
+    """
     return WorkflowState(
         user_url=url,
         is_valid=False,
+        post_data=post_data or {},
         title="",
         upvotes=0,
         content="",
+        content_hash="",
+        comments=[],
+        fetch_comments=fetch_comments,
         structured_json={},
+        payload_tokens=0,
         llm_response="",
+        analysis_chunks=0,
         story="",        # ← new field
+        ttft={},
+        timings={},
+        llm_calls=[],
         error=None,
-    )
\ No newline at end of file
+    )
+
+
+def public_result(state: dict) -> dict:
+    """Returns a copy of the final state without internal fields."""
+    return {k: v for k, v in state.items() if k not in PRIVATE_FIELDS}
@@ -1,64 +1,153 @@
+import os
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from app.state import WorkflowState
+from app.metrics import ainstrument_node, instrument_node
 from app.agents.validator import validate_url
-from app.agents.metadata_agent import extract_metadata
-from app.agents.content_agent import extract_content
+from app.agents.fetch_agent import afetch_post, fetch_post
+from app.agents.metadata_agent import aextract_metadata, extract_metadata
+from app.agents.content_agent import aextract_content, extract_content
+from app.agents.comments_agent import aextract_comments, extract_comments
 from app.agents.json_agent import build_structured_json
-from app.agents.llm_agent import run_llm_analysis
-from app.agents.story_agent import run_story_writer
+from app.agents.llm_agent import arun_llm_analysis, run_llm_analysis
+from app.agents.story_agent import arun_story_writer, run_story_writer
+
+# Write the story in parallel with the analysis instead of after it
+FAST_STORY = os.getenv("FAST_STORY", "").lower() in ("1", "true", "yes")
+
+# Nodes that only depend on the fetched post; they run concurrently
+EXTRACTION_NODES = ("extract_metadata", "extract_content", "extract_comments")
+
+# Fields whose reducer appends (lists) or merges (dicts) parallel writes
+_APPENDED_FIELDS = ("llm_calls",)
+_MERGED_FIELDS = ("timings", "ttft")
+
+
+def _changes(before: dict, after: dict) -> dict:
+    """
+    Returns the part of a node's full-state result that the node changed.
+
+    Nodes return `{**state, ...}` copies, so untouched fields are the very
+    same objects as in the input. Only changed fields are handed to the
+    graph, which lets parallel branches write disjoint fields; for reducer
+    fields only the new list items / dict entries are passed on.
+    """
+    changes = {}
+    for key, value in after.items():
+        old = before.get(key)
+        if value is old:
+            continue
+        if key in _APPENDED_FIELDS and isinstance(old, list) and value[:len(old)] == old:
+            value = value[len(old):]
+        elif key in _MERGED_FIELDS and isinstance(old, dict):
+            value = {k: v for k, v in value.items() if k not in old or old[k] is not v}
+        changes[key] = value
+    return changes
+
+
+def _node(name: str, func, afunc=None, join: bool = False):
+    """
+    Wraps a node so the compiled graph supports both invoke() and ainvoke().
+
+    I/O-bound nodes pass a native coroutine as `afunc`; pure nodes only have
+    the sync function, which runs as-is on either path. Every node is
+    instrumented (duration/error metrics and state["timings"][name]) and
+    reports only the fields it changed (see _changes()). A `join` node is
+    skipped when one of the parallel branches feeding it has failed.
+    """
+    instrumented = instrument_node(name, func)
+
+    def _run(state: WorkflowState, config=None) -> dict:
+        if join and state.get("error"):
+            return {}
+        return _changes(state, instrumented(state, config))
+
+    _arun = None
+    if afunc:
+        ainstrumented = ainstrument_node(name, afunc)
+
+        async def _arun(state: WorkflowState, config=None) -> dict:
+            return _changes(state, await ainstrumented(state, config))
+
+    return RunnableLambda(_run, afunc=_arun, name=name)
 
 
 def _route_after_validation(state: WorkflowState) -> str:
     if state.get("error") or not state.get("is_valid"):
         return "end"
-    return "extract_metadata"
+    return "fetch_post"
 
 
-def _route_on_error(next_node: str):
-    def _router(state: WorkflowState) -> str:
-        return "end" if state.get("error") else next_node
+def _route_on_error(*next_nodes: str):
+    def _router(state: WorkflowState):
+        if state.get("error"):
+            return "end"
+        return next_nodes[0] if len(next_nodes) == 1 else list(next_nodes)
     return _router
 
 
-def build_workflow() -> StateGraph:
+def build_workflow(fast_story: bool = FAST_STORY) -> StateGraph:
+    """
+    Builds and compiles the pipeline graph.
+
+    validate_url → fetch_post, then metadata, content and comment extraction
+    run in parallel and join at build_json. With `fast_story` the story
+    writer starts together with the analysis instead of waiting for it (the
+    story prompt then gets no analysis), so the LLM phase takes as long as
+    the slower of the two calls instead of their sum.
+
+    The compiled graph can be driven synchronously (invoke/stream) or from an
+    event loop (ainvoke/astream); on the async path Reddit and Ollama calls
+    use the native async clients instead of blocking threads. Streamed
+    "updates" carry only the fields each node changed.
+    """
     graph = StateGraph(WorkflowState)
 
-    graph.add_node("validate_url",      validate_url)
-    graph.add_node("extract_metadata",  extract_metadata)
-    graph.add_node("extract_content",   extract_content)
-    graph.add_node("build_json",        build_structured_json)
-    graph.add_node("llm_analysis",      run_llm_analysis)
-    graph.add_node("story_writer",      run_story_writer)   # ← new node
+    graph.add_node("validate_url",      _node("validate_url", validate_url))
+    graph.add_node("fetch_post",        _node("fetch_post", fetch_post, afetch_post))
+    graph.add_node("extract_metadata",  _node("extract_metadata", extract_metadata, aextract_metadata))
+    graph.add_node("extract_content",   _node("extract_content", extract_content, aextract_content))
+    graph.add_node("extract_comments",  _node("extract_comments", extract_comments, aextract_comments))
+    graph.add_node("build_json",        _node("build_json", build_structured_json, join=True))
+    graph.add_node("llm_analysis",      _node("llm_analysis", run_llm_analysis, arun_llm_analysis))
+    graph.add_node("story_writer",      _node("story_writer", run_story_writer, arun_story_writer))   # ← new node
 
     graph.set_entry_point("validate_url")
 
     graph.add_conditional_edges(
         "validate_url",
         _route_after_validation,
-        {"extract_metadata": "extract_metadata", "end": END},
-    )
-    graph.add_conditional_edges(
-        "extract_metadata",
-        _route_on_error("extract_content"),
-        {"extract_content": "extract_content", "end": END},
+        {"fetch_post": "fetch_post", "end": END},
     )
     graph.add_conditional_edges(
-        "extract_content",
-        _route_on_error("build_json"),
-        {"build_json": "build_json", "end": END},
-    )
-    graph.add_conditional_edges(
-        "build_json",
-        _route_on_error("llm_analysis"),
-        {"llm_analysis": "llm_analysis", "end": END},
-    )
-    graph.add_conditional_edges(
-        "llm_analysis",
-        _route_on_error("story_writer"),
-        {"story_writer": "story_writer", "end": END},
+        "fetch_post",
+        _route_on_error(*EXTRACTION_NODES),
+        {**{node: node for node in EXTRACTION_NODES}, "end": END},
     )
+    # build_json waits for all three branches
+    graph.add_edge(list(EXTRACTION_NODES), "build_json")
+
+    if fast_story:
+        graph.add_conditional_edges(
+            "build_json",
+            _route_on_error("llm_analysis", "story_writer"),
+            {"llm_analysis": "llm_analysis", "story_writer": "story_writer", "end": END},
+        )
+        graph.add_edge("llm_analysis", END)
+    else:
+        graph.add_conditional_edges(
+            "build_json",
+            _route_on_error("llm_analysis"),
+            {"llm_analysis": "llm_analysis", "end": END},
+        )
+        graph.add_conditional_edges(
+            "llm_analysis",
+            _route_on_error("story_writer"),
+            {"story_writer": "story_writer", "end": END},
+        )
 
     graph.add_edge("story_writer", END)
 
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
@@ -0,0 +1,174 @@
+"""
+End-to-end check of the HTTP job API (app/server.py) against local Reddit/Ollama stand-ins.
+
+Starts the API on a free port with a small worker pool, then from `--clients`
+threads submits `--posts` distinct posts (each `--duplicates` times, to
+exercise job reuse), follows every job's Server-Sent Events to the "done"
+event and cross-checks it with GET /jobs/<id>. Submissions beyond the queue
+limit get 429 and are retried after Retry-After, so admission control is
+exercised too. Exits non-zero if any job fails or the event stream is
+inconsistent.
+
+    python -m benchmarks.api --posts 12 --duplicates 2 --clients 8 --workers 2 --max-queued 4 \\
+        --ollama-latency 0.1 --tokens-per-second 200
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+from benchmarks.fake_servers import FakeOllama, FakeReddit
+from benchmarks.fixtures import _with_post, load_fixture, post_permalink
+from benchmarks.run import configure_environment
+
+
+def _request(method: str, url: str, body: dict | None = None) -> tuple[int, dict, dict]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return resp.status, dict(resp.headers), json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), json.loads(exc.read() or b"{}")
+
+
+def _read_events(url: str) -> Iterator[tuple[str, dict]]:
+    """Yields (event, data) pairs from an SSE stream as they arrive, until the server closes it."""
+    event, data = None, []
+    with urllib.request.urlopen(url, timeout=60) as resp:
+        for raw in resp:
+            line = raw.decode("utf-8").rstrip("\n")
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data.append(line[len("data: "):])
+            elif not line and event:
+                yield event, json.loads("\n".join(data))
+                event, data = None, []
+
+
+def run_client(base: str, post_url: str) -> dict:
+    """Submits one post (retrying on 429), follows its events and checks the outcome."""
+    started = time.perf_counter()
+    rejected = 0
+    while True:
+        status, headers, job = _request("POST", f"{base}/jobs", {"url": post_url})
+        if status != 429:
+            break
+        rejected += 1
+        time.sleep(float(headers.get("Retry-After", 1)) / 10)  # the stand-ins are fast; don't wait the full hint
+
+    problems = []
+    if status not in (200, 202):
+        return {"ok": False, "rejected": rejected, "problems": [f"POST /jobs returned {status}: {job}"]}
+
+    first_token = None
+    events = []
+    for event, data in _read_events(f"{base}/jobs/{job['id']}/events"):
+        if event == "token" and first_token is None:
+            first_token = time.perf_counter() - started
+        events.append((event, data))
+    elapsed = time.perf_counter() - started
+
+    if not events or events[-1][0] != "done":
+        problems.append("event stream did not end with a done event")
+    finished = {d["node"] for e, d in events if e == "node" and d["status"] != "running"}
+    for node in ("validate_url", "fetch_post", "build_json", "llm_analysis", "story_writer"):
+        if node not in finished:
+            problems.append(f"no completion event for {node}")
+
+    _, _, final = _request("GET", f"{base}/jobs/{job['id']}")
+    result = final.get("result") or {}
+    if final.get("status") != "done" or result.get("error"):
+        problems.append(f"job ended with status={final.get('status')} error={result.get('error')}")
+    if not result.get("story"):
+        problems.append("no story in the result")
+    streamed = "".join(d["text"] for e, d in events if e == "token" and d["node"] == "story_writer")
+    # Stored LLM text is whitespace-trimmed
+    if status == 202 and streamed.strip() != result.get("story"):
+        problems.append("streamed story tokens differ from the stored story")
+
+    return {
+        "ok": not problems,
+        "created": status == 202,
+        "rejected": rejected,
+        "events": len(events),
+        "first_token": first_token,
+        "elapsed": elapsed,
+        "problems": problems,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end check of the HTTP job API against local stand-ins")
+    parser.add_argument("--posts", type=int, default=12, help="Distinct posts to submit")
+    parser.add_argument("--duplicates", type=int, default=2, help="Submissions per post (extra ones reuse the job)")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent API clients")
+    parser.add_argument("--workers", type=int, default=2, help="API worker pool size")
+    parser.add_argument("--max-queued", type=int, default=4, help="API queue limit (admission control)")
+    parser.add_argument("--ollama-latency", type=float, default=0.05, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--log-level", default="CRITICAL")
+    args = parser.parse_args()
+
+    base_thread = load_fixture("small")
+    threads = [_with_post(base_thread, f"p{i}") for i in range(args.posts)]
+    post_urls = ["https://www.reddit.com" + post_permalink(thread) for thread in threads]
+
+    with FakeReddit(threads) as reddit, FakeOllama(
+        latency=args.ollama_latency, tokens_per_second=args.tokens_per_second, max_tokens=32,
+    ) as ollama:
+        configure_environment(reddit.url, ollama.url)
+
+        from app.logger import configure_logging
+        from app.jobs import JobManager
+        from app.server import start_api_server
+
+        configure_logging(args.log_level, stream=sys.stderr)
+        manager = JobManager(workers=args.workers, max_queued=args.max_queued)
+        server = start_api_server(manager, port=0, host="127.0.0.1")
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        # Every post once before any duplicate, so the first wave overfills the queue
+        submissions = post_urls * args.duplicates
+        print(
+            f"API check: {len(submissions)} submissions of {len(post_urls)} posts, {args.clients} clients, "
+            f"{args.workers} workers, max {args.max_queued} queued ...",
+            file=sys.stderr,
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            outcomes = list(pool.map(lambda url: run_client(base, url), submissions))
+        wall = time.perf_counter() - started
+
+        _, _, health = _request("GET", f"{base}/healthz")
+        server.shutdown()
+        manager.shutdown()
+        ollama_requests = ollama.requests
+
+    failed = [o for o in outcomes if not o["ok"]]
+    latencies = sorted(o["elapsed"] for o in outcomes if o["ok"])
+    ttfts = sorted(o["first_token"] for o in outcomes if o.get("first_token") is not None)
+    print(f"submissions={len(outcomes)} ok={len(outcomes) - len(failed)} failed={len(failed)} wall={wall:.2f}s")
+    print(
+        f"jobs created={sum(o.get('created', False) for o in outcomes)}"
+        f" reused={sum(1 for o in outcomes if o['ok'] and not o['created'])}"
+        f" 429s={sum(o['rejected'] for o in outcomes)}"
+        f" ollama requests={ollama_requests}"
+    )
+    if latencies:
+        print(f"end to end p50={latencies[len(latencies) // 2]:.3f}s max={latencies[-1]:.3f}s", end="")
+        print(f"  first token p50={ttfts[len(ttfts) // 2]:.3f}s" if ttfts else "")
+    print(f"healthz {health}")
+    for outcome in failed[:5]:
+        print("FAILED:", "; ".join(outcome["problems"]))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
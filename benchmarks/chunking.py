@@ -0,0 +1,67 @@
+"""
+Differential check for token_budget.split_into_chunks / _split_oversized.
+
+Splits random text mixing ASCII, multibyte characters (CJK, accents,
+emoji) and whitespace, often with no space to cut on, and checks that the
+pieces put back together equal the input minus whitespace and that no
+piece exceeds the byte limit (unless it is a single character wider than
+the limit).
+
+Usage:
+    python -m benchmarks.chunking [--cases 20000]
+"""
+
+import argparse
+import random
+import re
+import sys
+
+from app.agents.token_budget import BYTES_PER_TOKEN, _split_oversized, split_into_chunks
+
+_ATOMS = ["a", "word", "日本語", "テキスト", "é", "ß", "😀", "👍🏽", " ", "\n", "\n\n", "x" * 30, "語" * 40]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _problems(text: str, pieces: list[str], max_bytes: int) -> list[str]:
+    problems = []
+    if "".join(_WHITESPACE.sub("", p) for p in pieces) != _WHITESPACE.sub("", text):
+        problems.append("pieces do not reassemble to the input")
+    for piece in pieces:
+        if len(piece.encode("utf-8")) > max_bytes and len(piece) > 1:
+            problems.append(f"piece of {len(piece.encode('utf-8'))} bytes exceeds {max_bytes}")
+    return problems
+
+
+def differential(cases: int, seed: int = 0) -> int:
+    """Returns the number of inputs that were split incorrectly (or raised)."""
+    rnd = random.Random(seed)
+    failures = 0
+    for _ in range(cases):
+        text = "".join(rnd.choice(_ATOMS) for _ in range(rnd.randint(0, 200)))
+        max_tokens = rnd.randint(1, 64)
+        max_bytes = max(1, int(max_tokens * BYTES_PER_TOKEN))
+        try:
+            problems = _problems(text, _split_oversized(text, max_bytes), max_bytes)
+            problems += _problems(text, split_into_chunks(text, max_tokens), max_bytes)
+        except UnicodeError as exc:
+            problems = [repr(exc)]
+        if problems:
+            failures += 1
+            if failures <= 5:
+                print(f"FAILED max_tokens={max_tokens} {text[:80]!r}: {'; '.join(problems)}", file=sys.stderr)
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check token_budget chunking on multibyte text")
+    parser.add_argument("--cases", type=int, default=20_000, help="Random inputs to split")
+    args = parser.parse_args()
+
+    failures = differential(args.cases)
+    print(f"differential: {args.cases} cases, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
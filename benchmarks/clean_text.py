@@ -0,0 +1,110 @@
+"""
+Differential check and microbenchmark for content_agent._clean_text.
+
+Compares the precompiled single-pass normaliser against the original
+implementation (kept below as _legacy_clean_text) on random markup-heavy
+snippets, then times both on large generated selftexts.
+
+Usage:
+    python -m benchmarks.clean_text [--cases 200000] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import sys
+import timeit
+
+from app.agents.content_agent import _clean_text
+
+
+def _legacy_clean_text(raw: str) -> str:
+    """The pre-optimisation _clean_text, kept verbatim as the reference."""
+    html_entities = {
+        "&amp;": "&", "&lt;": "<", "&gt;": ">",
+        "&quot;": '"', "&#39;": "'", "&nbsp;": " ",
+    }
+    for entity, char in html_entities.items():
+        raw = raw.replace(entity, char)
+
+    raw = re.sub(r"\[([^\]]+)\]\([^)]+\)", r"\1", raw)
+    raw = re.sub(r"https?://\S+", "", raw)
+    raw = re.sub(r"(\*{1,3}|_{1,3})(.*?)\1", r"\2", raw)
+    raw = re.sub(r"\r\n|\r", "\n", raw)
+    raw = re.sub(r"\n{3,}", "\n\n", raw)
+    raw = raw.strip()
+
+    return raw
+
+
+# Fragments chosen to hit every pass and the boundaries between them
+_ATOMS = [
+    "&", "amp;", "lt;", "gt;", "quot;", "#39;", "nbsp;",
+    "&amp;", "&lt;", "&gt;", "&quot;", "&#39;", "&nbsp;",
+    "[", "]", "(", ")", "](", "http://", "https://example.com/",
+    "*", "**", "***", "_", "__", "___",
+    "\r", "\n", "\r\n", " ", ":", "/", "a", "word",
+]
+
+_MARKUP_PARAGRAPH = (
+    "Some **bold** and _italic_ text &amp; more &lt;tags&gt; &quot;quoted&quot; "
+    "see [the docs](https://example.com/docs) or https://example.org/raw.\r\n\r\n\r\n"
+)
+_PLAIN_PARAGRAPH = "A plain sentence without any markup, just words and more words. " * 20
+
+
+def differential(cases: int, seed: int = 0) -> int:
+    """Returns the number of inputs where the two implementations disagree."""
+    rnd = random.Random(seed)
+    mismatches = 0
+    for _ in range(cases):
+        text = "".join(rnd.choice(_ATOMS) for _ in range(rnd.randint(0, 40)))
+        expected, actual = _legacy_clean_text(text), _clean_text(text)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH {text!r}: {expected!r} != {actual!r}", file=sys.stderr)
+    return mismatches
+
+
+def benchmark(repeat: int) -> list[dict]:
+    selftexts = {
+        "markup": (_MARKUP_PARAGRAPH + _PLAIN_PARAGRAPH + "\n") * 2000,
+        "plain": (_PLAIN_PARAGRAPH + "\n\n") * 2000,
+    }
+    results = []
+    for name, text in selftexts.items():
+        assert _legacy_clean_text(text) == _clean_text(text), name
+        legacy = min(timeit.repeat(lambda: _legacy_clean_text(text), number=1, repeat=repeat))
+        current = min(timeit.repeat(lambda: _clean_text(text), number=1, repeat=repeat))
+        results.append({
+            "case": name,
+            "chars": len(text),
+            "legacy_ms": round(legacy * 1000, 2),
+            "current_ms": round(current * 1000, 2),
+            "speedup": round(legacy / current, 1),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check and time content_agent._clean_text")
+    parser.add_argument("--cases", type=int, default=200_000, help="Random inputs for the differential check")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+
+    mismatches = differential(args.cases)
+    print(f"differential: {args.cases} cases, {mismatches} mismatches")
+
+    for row in benchmark(args.repeat):
+        print(
+            f"{row['case']:<7} {row['chars']:>9} chars  "
+            f"legacy {row['legacy_ms']:>8.2f} ms  current {row['current_ms']:>8.2f} ms  "
+            f"x{row['speedup']}"
+        )
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
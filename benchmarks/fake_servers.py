@@ -0,0 +1,316 @@
+"""
+Local HTTP stand-ins for Reddit and Ollama used by the benchmarks.
+
+Both servers run on 127.0.0.1 in a background thread and only use the
+standard library, so benchmarks need no network access:
+
+    with FakeReddit(threads) as reddit, FakeOllama(latency=0.05) as ollama:
+        os.environ["REDDIT_API_BASE_URL"] = reddit.url
+        os.environ["OLLAMA_BASE_URL"] = ollama.url
+        ...
+
+Point the app at them by setting the environment *before* importing `app`,
+since service settings are read at import time.
+
+For load tests both servers can inject faults at random: throttling
+responses (429 from Reddit, 503 "server busy" from Ollama), slow responses,
+and timeouts, where the server stalls and then drops the connection without
+answering.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_POST_PATH = re.compile(r"/comments/([a-z0-9]+)", re.IGNORECASE)
+_LISTING_PATH = re.compile(r"^/r/([^/]+)/(new|hot|top)\.json$")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    # Headers and body are separate writes; without TCP_NODELAY delayed ACKs add ~40ms per response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # noqa: A002 — silence per-request logging
+        pass
+
+    def send_json(self, status: int, body, headers: dict | None = None) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def inject_fault(self) -> bool:
+        """Applies a randomly drawn fault; returns True when the request is finished."""
+        fault = self.fake.draw_fault()
+        if fault == "throttle":
+            self.send_json(
+                self.fake.throttle_status,
+                {"error": "too many requests"},
+                {"Retry-After": str(self.fake.retry_after)},
+            )
+            return True
+        if fault == "timeout":
+            time.sleep(self.fake.timeout_seconds)
+            self.close_connection = True
+            return True
+        if fault == "slow":
+            time.sleep(self.fake.slow_seconds)
+        return False
+
+
+class _FakeServer:
+    """
+    Runs a handler class on an ephemeral localhost port in a daemon thread.
+
+    Fault rates are per-request probabilities:
+        throttle_rate: answer with `throttle_status` and a Retry-After header.
+        slow_rate:     wait `slow_seconds` before answering normally.
+        timeout_rate:  wait `timeout_seconds`, then close without answering.
+    """
+
+    handler: type[_Handler]
+    throttle_status = 429
+
+    def __init__(
+        self,
+        throttle_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        slow_seconds: float = 1.0,
+        timeout_seconds: float = 5.0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ):
+        self.throttle_rate = throttle_rate
+        self.slow_rate = slow_rate
+        self.timeout_rate = timeout_rate
+        self.slow_seconds = slow_seconds
+        self.timeout_seconds = timeout_seconds
+        self.retry_after = retry_after
+        self.faults = {"throttle": 0, "slow": 0, "timeout": 0}
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(self.handler):
+            fake = server
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def draw_fault(self) -> str | None:
+        with self._lock:
+            roll = self._random.random()
+            for fault, rate in (("throttle", self.throttle_rate), ("timeout", self.timeout_rate), ("slow", self.slow_rate)):
+                if roll < rate:
+                    self.faults[fault] += 1
+                    return fault
+                roll -= rate
+        return None
+
+    def start(self) -> "_FakeServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _RedditHandler(_Handler):
+    fake: "FakeReddit"
+
+    def do_GET(self):
+        self.fake.count_request()
+        if self.inject_fault():
+            return
+        parsed = urlparse(self.path)
+        time.sleep(self.fake.latency)
+
+        if parsed.path == "/api/morechildren.json":
+            ids = parse_qs(parsed.query).get("children", [""])[0].split(",")
+            return self.send_json(200, self.fake.more_children([i for i in ids if i]))
+
+        listing = _LISTING_PATH.match(parsed.path)
+        if listing:
+            return self.send_json(200, self.fake.listing(listing.group(1)))
+
+        match = _POST_PATH.search(parsed.path)
+        thread = self.fake.threads.get(match.group(1).lower()) if match else None
+        if thread is None:
+            return self.send_json(404, {"message": "Not Found", "error": 404})
+        self.send_json(200, thread)
+
+
+class FakeReddit(_FakeServer):
+    """
+    Serves recorded thread payloads keyed by post ID.
+
+    Supports post .json URLs, /r/<sub>/<sort>.json listings (all threads, one
+    page) and /api/morechildren.json, which synthesises a comment for every
+    requested ID.
+    """
+
+    handler = _RedditHandler
+
+    def __init__(self, threads: list[list], latency: float = 0.0, **faults):
+        self.threads = {thread[0]["data"]["children"][0]["data"]["id"].lower(): thread for thread in threads}
+        self.latency = latency
+        super().__init__(**faults)
+
+    def listing(self, subreddit: str) -> dict:
+        children = [thread[0]["data"]["children"][0] for thread in self.threads.values()]
+        return {"kind": "Listing", "data": {"after": None, "before": None, "children": children}}
+
+    def more_children(self, ids: list[str]) -> dict:
+        things = []
+        for comment_id in ids:
+            score = int(hashlib.sha1(comment_id.encode()).hexdigest()[:4], 16) % 3000
+            things.append({"kind": "t1", "data": {
+                "id": comment_id,
+                "author": f"more_{comment_id}",
+                "score": score,
+                "depth": 0,
+                "body": f"Expanded comment {comment_id} with score {score}.",
+            }})
+        return {"json": {"errors": [], "data": {"things": things}}}
+
+
+class _OllamaHandler(_Handler):
+    fake: "FakeOllama"
+
+    def do_GET(self):
+        self.fake.count_request()
+        if self.path == "/api/tags":
+            return self.send_json(200, {"models": [{"name": self.fake.tagged(name)} for name in self.fake.models]})
+        if self.path == "/api/ps":
+            return self.send_json(200, {"models": [{"name": name} for name in sorted(self.fake.loaded)]})
+        self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        self.fake.count_request()
+        if self.path != "/api/chat":
+            return self.send_json(404, {"error": "not found"})
+
+        # The body is read first so a faulted keep-alive connection stays in sync
+        request = self.read_json()
+        if self.inject_fault():
+            return
+        model = request.get("model", "")
+        self.fake.loaded.add(self.fake.tagged(model))
+        if not request.get("messages"):
+            # Ollama treats a chat request without messages as load-only
+            return self.send_json(200, {
+                "model": model,
+                "message": {"role": "assistant", "content": ""},
+                "done_reason": "load",
+                "done": True,
+            })
+        prompt_chars = sum(len(m.get("content", "")) for m in request.get("messages", []))
+        limit = (request.get("options") or {}).get("num_predict") or self.fake.max_tokens
+        tokens = [f"tok{i} " for i in range(max(1, min(limit, self.fake.max_tokens)))]
+
+        time.sleep(self.fake.latency)
+        if not request.get("stream", True):
+            time.sleep(len(tokens) * self.fake.token_interval)
+            return self.send_json(200, {
+                "model": model,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "done": True,
+                **self.fake.stats(prompt_chars, len(tokens)),
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            time.sleep(self.fake.token_interval)
+            self._chunk({"model": model, "message": {"role": "assistant", "content": token}, "done": False})
+        self._chunk({"model": model, "message": {"role": "assistant", "content": ""}, "done": True,
+                     **self.fake.stats(prompt_chars, len(tokens))})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeOllama(_FakeServer):
+    """
+    Minimal Ollama /api/chat, /api/tags and /api/ps implementation.
+
+    Args:
+        latency:           Seconds before the first token (prompt processing).
+        tokens_per_second: Generation speed; 0 emits tokens without delay.
+        max_tokens:        Upper bound on generated tokens per call
+                           (options.num_predict lowers it further).
+        models:            Names reported by /api/tags (untagged ones as "<name>:latest",
+                           like Ollama).
+        **faults:          Fault injection settings (see _FakeServer).
+    """
+
+    handler = _OllamaHandler
+    throttle_status = 503  # Ollama's "server busy" when its request queue is full
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        tokens_per_second: float = 0.0,
+        max_tokens: int = 64,
+        models: tuple[str, ...] = ("bench-model",),
+        **faults,
+    ):
+        self.latency = latency
+        self.token_interval = 1.0 / tokens_per_second if tokens_per_second > 0 else 0.0
+        self.max_tokens = max_tokens
+        self.models = list(models)
+        self.loaded: set[str] = set()
+        super().__init__(**faults)
+
+    @staticmethod
+    def tagged(name: str) -> str:
+        return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+    def stats(self, prompt_chars: int, eval_count: int) -> dict:
+        """Generation counters in Ollama's final-response format (durations in ns)."""
+        return {
+            "prompt_eval_count": max(1, prompt_chars // 4),
+            "eval_count": eval_count,
+            "load_duration": 0,
+            "prompt_eval_duration": int(self.latency * 1e9),
+            "eval_duration": int(eval_count * self.token_interval * 1e9),
+            "total_duration": int((self.latency + eval_count * self.token_interval) * 1e9),
+        }
@@ -0,0 +1,126 @@
+"""
+Reddit thread fixtures for the benchmark suite.
+
+Each fixture is a post .json payload exactly as Reddit returns it
+([post_listing, comment_listing]). `small` is a recorded thread shipped in
+benchmarks/data/; the large fixtures are generated deterministically from it
+so the repository does not carry multi-megabyte files.
+
+Record a real thread as a new fixture (needs network access):
+    python -m benchmarks.fixtures --record https://www.reddit.com/r/<sub>/comments/<id>/<slug>/ --name my_thread
+"""
+
+import argparse
+import copy
+import json
+import random
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+FIXTURES = ("small", "huge_selftext", "huge_comments")
+
+_PARAGRAPHS = [
+    "The hallway light flickered twice before settling into a dull **orange** glow &amp; I kept walking.",
+    "Nobody on the third floor answered when I knocked, though I could hear a _television_ through the door.",
+    "I checked the [maintenance log](https://example.com/log) again: no entries since 1987.",
+    "My neighbour said &quot;don&#39;t worry about the noises&quot; and closed the door before I could ask which noises.",
+    "At night the elevator stops on floors that do not exist in the directory. See https://example.com/floors for the plans.",
+]
+
+
+def post_id(payload: list) -> str:
+    """Returns the base-36 ID of the post in a thread payload."""
+    return payload[0]["data"]["children"][0]["data"]["id"]
+
+
+def post_permalink(payload: list) -> str:
+    return payload[0]["data"]["children"][0]["data"]["permalink"]
+
+
+def load_recorded(name: str) -> list:
+    """Loads a recorded thread payload from benchmarks/data/<name>_post.json."""
+    with open(DATA_DIR / f"{name}_post.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _with_post(base: list, suffix: str, **fields) -> list:
+    payload = copy.deepcopy(base)
+    post = payload[0]["data"]["children"][0]["data"]
+    old_id, new_id = post["id"], post["id"] + suffix
+    post.update(fields)
+    post["id"] = new_id
+    post["name"] = f"t3_{new_id}"
+    post["permalink"] = post["permalink"].replace(f"/comments/{old_id}/", f"/comments/{new_id}/")
+    post["url"] = "https://www.reddit.com" + post["permalink"]
+    return payload
+
+
+def huge_selftext(paragraphs: int = 9000, seed: int = 1) -> list:
+    """The recorded post with a ~1 MB Markdown-heavy selftext."""
+    rnd = random.Random(seed)
+    body = "\n\n".join(rnd.choice(_PARAGRAPHS) for _ in range(paragraphs))
+    return _with_post(load_recorded("small"), "hs", selftext=body)
+
+
+def _comment(rnd: random.Random, comment_id: str, depth: int, fanout: int, max_depth: int) -> dict:
+    replies = []
+    if depth < max_depth:
+        replies = [
+            _comment(rnd, f"{comment_id}_{i}", depth + 1, max(1, fanout // 2), max_depth)
+            for i in range(rnd.randint(0, fanout))
+        ]
+    return {"kind": "t1", "data": {
+        "id": comment_id,
+        "name": f"t1_{comment_id}",
+        "author": f"user_{rnd.randint(1, 5000)}",
+        "score": rnd.randint(-20, 5000),
+        "depth": depth,
+        "body": " ".join(rnd.choice(_PARAGRAPHS) for _ in range(rnd.randint(1, 3))),
+        "replies": {"kind": "Listing", "data": {"children": replies}} if replies else "",
+    }}
+
+
+def huge_comments(top_level: int = 400, fanout: int = 6, max_depth: int = 6, more_ids: int = 300, seed: int = 2) -> list:
+    """The recorded post with a deep, wide comment tree and `more` stubs."""
+    rnd = random.Random(seed)
+    payload = _with_post(load_recorded("small"), "hc")
+    children = [_comment(rnd, f"c{i}", 0, fanout, max_depth) for i in range(top_level)]
+    ids = [f"m{i}" for i in range(more_ids)]
+    children.append({"kind": "more", "data": {"count": len(ids), "id": ids[0], "depth": 0, "children": ids}})
+    payload[1]["data"]["children"] = children
+    return payload
+
+
+def load_fixture(name: str) -> list:
+    """Returns the thread payload for one of FIXTURES (or any recorded name)."""
+    if name == "huge_selftext":
+        return huge_selftext()
+    if name == "huge_comments":
+        return huge_comments()
+    return load_recorded(name)
+
+
+def record(url: str, name: str) -> Path:
+    """Fetches a live thread through the app's Reddit client settings and saves it."""
+    import requests
+    from app.services.reddit_service import HEADERS, THREAD_PARAMS, _to_json_url
+
+    response = requests.get(_to_json_url(url), params=THREAD_PARAMS, headers=HEADERS, timeout=15)
+    response.raise_for_status()
+    path = DATA_DIR / f"{name}_post.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(response.json(), f, indent=1, ensure_ascii=False)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record Reddit thread fixtures for the benchmarks")
+    parser.add_argument("--record", metavar="URL", required=True, help="Reddit post URL to record")
+    parser.add_argument("--name", required=True, help="Fixture name (saved as data/<name>_post.json)")
+    args = parser.parse_args()
+    print(record(args.record, args.name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Load-testing harness: N concurrent pipelines against local Reddit/Ollama stand-ins.
+
+Drives either entry point for a fixed duration or request count:
+
+    --runner cli        app.main.run_pipeline (the compiled LangGraph graph)
+    --runner streamlit  app.jobs.PipelineJob (the Streamlit UI's background
+                        job: streamed task events and LLM tokens)
+
+The stand-ins can inject Reddit 429s, Ollama 503s, slow responses and
+timeouts. The report gives throughput, p50/p95/p99 per stage and end to end,
+error rates by stage, fault counts and peak RSS; use it to size --workers,
+REDDIT/OLLAMA concurrency limits and Ollama slots before deploying.
+
+    python -m benchmarks.load --concurrency 16 --duration 30 \\
+        --reddit-throttle-rate 0.02 --ollama-slow-rate 0.1 --ollama-latency 0.2 --tokens-per-second 50
+"""
+
+import argparse
+import itertools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from benchmarks.fake_servers import FakeOllama, FakeReddit
+from benchmarks.fixtures import load_fixture, post_permalink
+from benchmarks.run import configure_environment, summarize
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _make_cli_runner():
+    from app.main import run_pipeline
+    from app.registry import get_workflow
+
+    graph = get_workflow()
+
+    def run(url: str) -> tuple[dict, dict]:
+        # The harness cycles a few fixture URLs: coalescing would hide most of the load
+        result = run_pipeline(url, app=graph, coalesce=False)
+        # Every graph node records its duration in state["timings"]
+        return result, result.get("timings", {})
+
+    return run
+
+
+def _make_streamlit_runner():
+    from app.jobs import PipelineJob
+    from app.registry import get_workflow
+
+    graph = get_workflow()
+
+    def run(url: str) -> tuple[dict, dict]:
+        # A fresh job per request: JobManager would reuse results for repeated URLs
+        job = PipelineJob(url)
+        result = job.run(graph)
+        stages = {node: entry["elapsed"] for node, entry in job.snapshot()["nodes"].items()}
+        return result, stages
+
+    return run
+
+
+RUNNERS = {"cli": _make_cli_runner, "streamlit": _make_streamlit_runner}
+
+
+def _failed_stage(result: dict, stages: dict) -> str | None:
+    if not result.get("error"):
+        return None
+    # The failing node is the last one that ran
+    return next(reversed(stages), "unknown")
+
+
+def run_load(
+    runner: str,
+    urls: list[str],
+    concurrency: int,
+    duration: float | None,
+    max_requests: int | None,
+) -> dict:
+    """Runs pipelines from `concurrency` threads until the duration or request budget is used."""
+    run_one = RUNNERS[runner]()
+    lock = threading.Lock()
+    next_url = itertools.cycle(urls)
+    issued = 0
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    error_examples: dict[str, str] = {}
+    completed = failed = 0
+    deadline = time.monotonic() + duration if duration else None
+
+    def worker() -> None:
+        nonlocal issued, completed, failed
+        while True:
+            with lock:
+                if max_requests is not None and issued >= max_requests:
+                    return
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                issued += 1
+                url = next(next_url)
+
+            started = time.perf_counter()
+            try:
+                result, stages = run_one(url)
+            except Exception as exc:
+                result, stages = {"error": f"{type(exc).__name__}: {exc}"}, {"exception": 0.0}
+            elapsed = time.perf_counter() - started
+
+            stage = _failed_stage(result, stages)
+            with lock:
+                samples.setdefault("end_to_end", []).append(elapsed)
+                for name, seconds in stages.items():
+                    samples.setdefault(name, []).append(seconds)
+                if stage is None:
+                    completed += 1
+                else:
+                    failed += 1
+                    errors[stage] = errors.get(stage, 0) + 1
+                    error_examples.setdefault(stage, str(result["error"])[:200])
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.monotonic() - started
+
+    total = completed + failed
+    return {
+        "runner": runner,
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 2),
+        "requests": total,
+        "completed": completed,
+        "failed": failed,
+        "throughput_per_second": round(completed / wall, 2) if wall else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "errors_by_stage": {
+            stage: {"count": count, "rate": round(count / total, 4), "example": error_examples[stage]}
+            for stage, count in errors.items()
+        },
+        "latency": {name: summarize(values) for name, values in samples.items()},
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"runner={report['runner']} concurrency={report['concurrency']} "
+        f"requests={report['requests']} completed={report['completed']} failed={report['failed']} "
+        f"wall={report['wall_seconds']}s"
+    )
+    print(f"throughput {report['throughput_per_second']}/s  error rate {report['error_rate']:.2%}  "
+          f"peak RSS {report['peak_rss_mb']} MB")
+    print(f"\n{'stage':<20} {'n':>6} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for name, stats in report["latency"].items():
+        print(f"{name:<20} {stats['n']:>6} {stats['median_ms']:>8.1f}ms {stats['p95_ms']:>8.1f}ms {stats['p99_ms']:>8.1f}ms")
+    if report["errors_by_stage"]:
+        print("\nerrors by stage:")
+        for stage, info in report["errors_by_stage"].items():
+            print(f"  {stage:<18} {info['count']:>6} ({info['rate']:.2%})  e.g. {info['example']}")
+    print(f"\ninjected faults: reddit {report['faults']['reddit']}  ollama {report['faults']['ollama']}")
+    for host in report.get("ollama_hosts") or []:
+        print(f"ollama host {host['url']}: {host['requests']} requests, {host['errors']} errors"
+              + (" (ejected)" if host["ejected"] else ""))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the pipeline against local Reddit/Ollama stand-ins")
+    parser.add_argument("--runner", choices=tuple(RUNNERS), default="cli", help="Entry point to drive")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent pipelines")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--duration", type=float, help="Run for this many seconds (default 30)")
+    budget.add_argument("--requests", type=int, help="Run exactly this many pipelines")
+    parser.add_argument("--fixtures", default="small", help="Comma-separated fixture names to cycle through")
+    parser.add_argument("--warm-cache", action="store_true", help="Keep the post and LLM caches enabled")
+    parser.add_argument("--reddit-concurrency", type=int, help="In-flight Reddit request limit")
+    parser.add_argument("--ollama-concurrency", type=int, help="In-flight Ollama request limit")
+    parser.add_argument("--client-timeout", type=float, default=10.0, help="Reddit/Ollama client timeout (seconds)")
+    parser.add_argument("--ollama-hosts", type=int, default=1, help="Fake Ollama servers behind the OLLAMA_HOSTS pool")
+
+    stand_ins = parser.add_argument_group("stand-in behaviour")
+    stand_ins.add_argument("--reddit-latency", type=float, default=0.0)
+    stand_ins.add_argument("--ollama-latency", type=float, default=0.0, help="Seconds before the first token")
+    stand_ins.add_argument("--tokens-per-second", type=float, default=0.0)
+    stand_ins.add_argument("--max-tokens", type=int, default=64)
+    for target in ("reddit", "ollama"):
+        stand_ins.add_argument(f"--{target}-throttle-rate", type=float, default=0.0)
+        stand_ins.add_argument(f"--{target}-slow-rate", type=float, default=0.0)
+        stand_ins.add_argument(f"--{target}-timeout-rate", type=float, default=0.0)
+    stand_ins.add_argument("--slow-seconds", type=float, default=1.0, help="Delay added by a slow response")
+    stand_ins.add_argument("--timeout-seconds", type=float, default=12.0, help="Stall before a dropped response")
+    stand_ins.add_argument("--seed", type=int, default=0, help="Fault injection RNG seed")
+    parser.add_argument("--log-level", default="CRITICAL", help="App log level (errors are summarised in the report)")
+    parser.add_argument("--output", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    if args.duration is None and args.requests is None:
+        args.duration = 30.0
+
+    def faults(target: str, seed_offset: int = 0) -> dict:
+        return {
+            "throttle_rate": getattr(args, f"{target}_throttle_rate"),
+            "slow_rate": getattr(args, f"{target}_slow_rate"),
+            "timeout_rate": getattr(args, f"{target}_timeout_rate"),
+            "slow_seconds": args.slow_seconds,
+            "timeout_seconds": args.timeout_seconds,
+            "seed": args.seed + seed_offset,
+        }
+
+    threads = [load_fixture(name.strip()) for name in args.fixtures.split(",") if name.strip()]
+    urls = ["https://www.reddit.com" + post_permalink(thread) for thread in threads]
+
+    reddit = FakeReddit(threads, latency=args.reddit_latency, **faults("reddit"))
+    ollamas = [
+        FakeOllama(
+            latency=args.ollama_latency,
+            tokens_per_second=args.tokens_per_second,
+            max_tokens=args.max_tokens,
+            **faults("ollama", seed_offset=i),
+        )
+        for i in range(max(1, args.ollama_hosts))
+    ]
+    with ExitStack() as stack:
+        for server in (reddit, *ollamas):
+            stack.enter_context(server)
+        configure_environment(reddit.url, ollamas[0].url)
+        os.environ["OLLAMA_HOSTS"] = ",".join(ollama.url for ollama in ollamas)
+        os.environ["REDDIT_REQUEST_TIMEOUT"] = str(args.client_timeout)
+        os.environ["OLLAMA_REQUEST_TIMEOUT"] = str(args.client_timeout)
+        if args.warm_cache:
+            os.environ["LLM_CACHE_DISABLED"] = ""
+        else:
+            os.environ["REDDIT_POST_CACHE_SIZE"] = "0"
+
+        from app.logger import configure_logging
+        from app.services.http_client import set_concurrency_limit
+
+        configure_logging(args.log_level, stream=sys.stderr)
+
+        if args.reddit_concurrency:
+            set_concurrency_limit("reddit", args.reddit_concurrency)
+        if args.ollama_concurrency:
+            set_concurrency_limit("ollama", args.ollama_concurrency)
+
+        print(f"Load test: {args.runner} runner, {args.concurrency} concurrent pipelines ...", file=sys.stderr)
+        report = run_load(args.runner, urls, args.concurrency, args.duration, args.requests)
+        ollama_faults: dict[str, int] = {}
+        for ollama in ollamas:
+            for kind, count in ollama.faults.items():
+                ollama_faults[kind] = ollama_faults.get(kind, 0) + count
+        report["faults"] = {"reddit": dict(reddit.faults), "ollama": ollama_faults}
+        report["server_requests"] = {"reddit": reddit.requests, "ollama": sum(o.requests for o in ollamas)}
+
+        from app.services.ollama_pool import get_ollama_pool
+
+        if get_ollama_pool().multi_host:
+            report["ollama_hosts"] = get_ollama_pool().snapshot()
+
+    from app.services.rate_limit import reddit_rate_limiter
+
+    report["reddit_rate_limit"] = reddit_rate_limiter.snapshot()
+    report["peak_rss_mb"] = _peak_rss_mb()
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
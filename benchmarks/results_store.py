@@ -0,0 +1,138 @@
+"""
+Scale check for the results store (app/services/results_store.py).
+
+Runs one pipeline against the local Reddit/Ollama stand-ins for a realistic
+result, stores `--rows` variants of it (spread over subreddits, scores,
+creation times and models) in a temporary database, then times batched
+writes, point lookups, indexed queries and a full export, and checks that
+re-storing a post version replaces its row instead of adding one.
+
+    python -m benchmarks.results_store --rows 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_servers import FakeOllama, FakeReddit
+from benchmarks.fixtures import load_fixture, post_permalink
+from benchmarks.run import configure_environment, summarize
+
+SUBREDDITS = [f"sub{i}" for i in range(50)]
+MODELS = ["llama3.2", "qwen2.5:7b", "mistral"]
+
+
+def _variant(base: dict, i: int, rng: random.Random, now: float) -> dict:
+    post_id = f"x{i:07x}"
+    subreddit = rng.choice(SUBREDDITS)
+    post = {
+        **base["post_data"],
+        "id": post_id,
+        "name": f"t3_{post_id}",
+        "subreddit": subreddit,
+        "created_utc": now - rng.uniform(0, 365 * 86400),
+    }
+    calls = [{**call, "model": rng.choice(MODELS)} for call in base["llm_calls"]]
+    return {
+        **base,
+        "user_url": f"https://www.reddit.com/r/{subreddit}/comments/{post_id}/post/",
+        "post_data": post,
+        "upvotes": rng.randint(0, 50000),
+        "content_hash": f"{i:064x}",
+        "llm_calls": calls,
+    }
+
+
+def _timed(samples: list[float], func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    samples.append(time.perf_counter() - started)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scale check for the results store")
+    parser.add_argument("--rows", type=int, default=100_000, help="Results to store")
+    parser.add_argument("--lookups", type=int, default=2_000, help="Point lookups to time")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per write transaction")
+    args = parser.parse_args()
+
+    thread = load_fixture("small")
+    with FakeReddit([thread]) as reddit, FakeOllama(latency=0, tokens_per_second=0, max_tokens=32) as ollama:
+        configure_environment(reddit.url, ollama.url)
+        from app.main import run_pipeline
+
+        base = run_pipeline("https://www.reddit.com" + post_permalink(thread), coalesce=False)
+    if base.get("error"):
+        sys.exit(f"Pipeline failed: {base['error']}")
+
+    from app.services.results_store import ResultsStore
+
+    rng = random.Random(7)
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.sqlite3")
+        store = ResultsStore(path=path, batch_size=args.batch_size, enabled=True)
+
+        print(f"Storing {args.rows:,} results ...", file=sys.stderr)
+        started = time.perf_counter()
+        for i in range(args.rows):
+            store.add(_variant(base, i, rng, now))
+        store.flush()
+        write_seconds = time.perf_counter() - started
+
+        problems = []
+        if store.count() != args.rows:
+            problems.append(f"expected {args.rows} rows, found {store.count()}")
+        # Same post and content again: replaced, not duplicated
+        store.add(_variant(base, 0, random.Random(1), now))
+        if store.count() != args.rows:
+            problems.append("re-storing a post version added a row")
+
+        lookups = []
+        for _ in range(args.lookups):
+            i = rng.randrange(args.rows)
+            result = _timed(lookups, store.get, f"x{i:07x}")
+            if result is None or result.get("content_hash") != f"{i:064x}":
+                problems.append(f"lookup of x{i:07x} failed")
+                break
+
+        queries = {
+            "subreddit, newest 100": dict(subreddit="sub7", limit=100),
+            "min score, top 100": dict(min_score=45000, order_by="score", limit=100),
+            "model + last 7 days": dict(model="mistral", since=now - 7 * 86400, limit=None),
+            "subreddit + last 30 days": dict(subreddit="sub3", since=now - 30 * 86400, limit=None),
+        }
+        query_times = {}
+        for label, filters in queries.items():
+            samples: list[float] = []
+            for _ in range(20):
+                rows = _timed(samples, store.query, **filters)
+            query_times[label] = (summarize(samples), len(rows))
+
+        started = time.perf_counter()
+        exported = sum(1 for _ in store.iter_results(subreddit="sub1"))
+        export_seconds = time.perf_counter() - started
+        if exported != store.count(subreddit="sub1"):
+            problems.append("export row count differs from count()")
+
+        store.close()
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    print(f"writes      : {args.rows:,} rows in {write_seconds:.2f}s ({args.rows / write_seconds:,.0f} rows/s), "
+          f"{size_mb:.0f} MB")
+    lookup = summarize(lookups)
+    print(f"get()       : median {lookup['median_ms']}ms  p99 {lookup['p99_ms']}ms")
+    for label, (stats, n) in query_times.items():
+        print(f"query()     : {label:<26} {n:>6,} rows  median {stats['median_ms']}ms  p95 {stats['p95_ms']}ms")
+    print(f"export      : {exported:,} full results in {export_seconds:.2f}s")
+    for problem in problems:
+        print("FAILED:", problem)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
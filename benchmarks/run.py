@@ -0,0 +1,268 @@
+"""
+Offline benchmark suite for the pipeline.
+
+Replays Reddit thread fixtures (see benchmarks/fixtures.py) from a local
+Reddit stand-in and answers LLM calls from a fake Ollama server, then times:
+
+- every node of app/workflow.py, called in graph order
+- content_agent._clean_text and json_agent.build_structured_json in isolation
+- the compiled graph end to end, and its overhead over the summed node times
+
+Results are written as a JSON baseline that later runs can be compared with:
+
+    python -m benchmarks.run --output benchmarks/baselines/main.json
+    python -m benchmarks.run --compare benchmarks/baselines/main.json
+
+--compare exits with status 1 when any median regressed by more than
+--threshold (and by more than NOISE_FLOOR_MS).
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fake_servers import FakeOllama, FakeReddit
+from benchmarks.fixtures import FIXTURES, load_fixture, post_permalink
+
+BENCH_MODEL = "bench-model"
+
+# Absolute slowdowns below this are treated as timer noise by --compare
+NOISE_FLOOR_MS = 1.0
+
+NODE_ORDER = (
+    "validate_url",
+    "fetch_post",
+    "extract_metadata",
+    "extract_content",
+    "extract_comments",
+    "build_json",
+    "llm_analysis",
+    "story_writer",
+)
+
+
+def configure_environment(reddit_url: str, ollama_url: str) -> None:
+    """Points the app at the fake servers. Must run before `app` is imported."""
+    os.environ.update({
+        "REDDIT_API_BASE_URL": reddit_url,
+        "OLLAMA_BASE_URL": ollama_url,
+        "OLLAMA_API_KEY": "",
+        "OLLAMA_MODEL_LOCAL": BENCH_MODEL,
+        "OLLAMA_MODEL_CLOUD": BENCH_MODEL,
+        "LLM_CACHE_DISABLED": "1",
+        "RESULTS_STORE_DISABLED": "1",
+        # The stand-in has no rate limit; keep the client-side bucket out of the numbers
+        "REDDIT_REQUESTS_PER_MINUTE": "1000000",
+        "REDDIT_BURST": "1000000",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+
+
+def summarize(samples: list[float]) -> dict:
+    """Millisecond statistics for a list of durations in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+
+    def pct(q: float) -> float:
+        return round(ms[min(len(ms) - 1, round(q * (len(ms) - 1)))], 3)
+
+    return {
+        "n": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def _time(func, *args) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def _nodes() -> dict:
+    from app.agents.validator import validate_url
+    from app.agents.fetch_agent import fetch_post
+    from app.agents.metadata_agent import extract_metadata
+    from app.agents.content_agent import extract_content
+    from app.agents.comments_agent import extract_comments
+    from app.agents.json_agent import build_structured_json
+    from app.agents.llm_agent import run_llm_analysis
+    from app.agents.story_agent import run_story_writer
+
+    return {
+        "validate_url": validate_url,
+        "fetch_post": fetch_post,
+        "extract_metadata": extract_metadata,
+        "extract_content": extract_content,
+        "extract_comments": extract_comments,
+        "build_json": build_structured_json,
+        "llm_analysis": run_llm_analysis,
+        "story_writer": run_story_writer,
+    }
+
+
+def _clear_caches() -> None:
+    from app.services.reddit_service import comment_cache, post_cache
+
+    post_cache.clear()
+    comment_cache.clear()
+
+
+def bench_fixture(name: str, url: str, selftext: str, repeat: int) -> dict:
+    """Runs every measurement for one fixture; returns {metric: stats}."""
+    from app.agents.content_agent import _clean_text
+    from app.registry import get_workflow
+    from app.state import initial_state
+
+    nodes = _nodes()
+    samples: dict[str, list[float]] = {node: [] for node in NODE_ORDER}
+    inputs: dict[str, dict] = {}
+
+    # One warm-up pass (imports, prompt parsing, connection setup), then `repeat` timed passes
+    for run in range(repeat + 1):
+        _clear_caches()
+        state = initial_state(url)
+        for node in NODE_ORDER:
+            inputs[node] = state
+            elapsed, state = _time(nodes[node], state)
+            if state.get("error"):
+                raise RuntimeError(f"{name}: node {node} failed: {state['error']}")
+            if run:
+                samples[node].append(elapsed)
+
+    results = {f"{name}/node/{node}": summarize(samples[node]) for node in NODE_ORDER}
+
+    results[f"{name}/clean_text"] = summarize([_time(_clean_text, selftext)[0] for _ in range(repeat)])
+    results[f"{name}/build_json"] = summarize(
+        [_time(nodes["build_json"], inputs["build_json"])[0] for _ in range(repeat)]
+    )
+
+    app = get_workflow()
+    end_to_end = []
+    for run in range(repeat + 1):
+        _clear_caches()
+        elapsed, final = _time(app.invoke, initial_state(url))
+        if final.get("error"):
+            raise RuntimeError(f"{name}: pipeline failed: {final['error']}")
+        if run:
+            end_to_end.append(elapsed)
+    results[f"{name}/end_to_end"] = summarize(end_to_end)
+
+    # Negative when the parallel extraction branches overlap by more than the graph costs
+    node_total = sum(results[f"{name}/node/{node}"]["median_ms"] for node in NODE_ORDER)
+    results[f"{name}/graph_overhead"] = {
+        "n": repeat,
+        "median_ms": round(results[f"{name}/end_to_end"]["median_ms"] - node_total, 3),
+    }
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(fixtures: list[str], repeat: int, ollama: dict) -> dict:
+    threads = {name: load_fixture(name) for name in fixtures}
+
+    with FakeReddit(list(threads.values())) as reddit, FakeOllama(**ollama) as fake_ollama:
+        configure_environment(reddit.url, fake_ollama.url)
+        results = {}
+        for name, thread in threads.items():
+            url = "https://www.reddit.com" + post_permalink(thread)
+            selftext = thread[0]["data"]["children"][0]["data"].get("selftext", "")
+            print(f"Benchmarking {name} ...", file=sys.stderr)
+            results.update(bench_fixture(name, url, selftext, repeat))
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "fake_ollama": ollama,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints a median-by-median comparison; returns the regressed metric names."""
+    regressions = []
+    print(f"{'metric':<44} {'baseline':>11} {'current':>11} {'change':>8}")
+    for metric, stats in current["results"].items():
+        old = baseline.get("results", {}).get(metric)
+        if old is None:
+            print(f"{metric:<44} {'-':>11} {stats['median_ms']:>9.2f}ms {'new':>8}")
+            continue
+        before, after = old["median_ms"], stats["median_ms"]
+        change = (after - before) / before if before > 0 else 0.0
+        regressed = after - before > NOISE_FLOOR_MS and change > threshold
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{metric:<44} {before:>9.2f}ms {after:>9.2f}ms {change:>+7.0%}{flag}")
+        if regressed:
+            regressions.append(metric)
+    return regressions
+
+
+def print_results(report: dict) -> None:
+    print(f"{'metric':<44} {'median':>11} {'p95':>11} {'min':>11}")
+    for metric, stats in report["results"].items():
+        p95 = f"{stats['p95_ms']:.2f}ms" if "p95_ms" in stats else "-"
+        low = f"{stats['min_ms']:.2f}ms" if "min_ms" in stats else "-"
+        print(f"{metric:<44} {stats['median_ms']:>9.2f}ms {p95:>11} {low:>11}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks against fake Reddit/Ollama servers")
+    parser.add_argument("--fixtures", default=",".join(FIXTURES), help="Comma-separated fixture names")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per measurement (after one warm-up)")
+    parser.add_argument("--ollama-latency", type=float, default=0.0, help="Fake Ollama seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Fake Ollama generation speed (0 = instant)")
+    parser.add_argument("--max-tokens", type=int, default=64, help="Fake Ollama tokens per response")
+    parser.add_argument("--output", help="Write the results as a JSON baseline to this path")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    ollama = {
+        "latency": args.ollama_latency,
+        "tokens_per_second": args.tokens_per_second,
+        "max_tokens": args.max_tokens,
+    }
+    fixtures = [name.strip() for name in args.fixtures.split(",") if name.strip()]
+    report = run_suite(fixtures, args.repeat, ollama)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.output}", file=sys.stderr)
+
+    if not args.compare:
+        print_results(report)
+        return
+
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
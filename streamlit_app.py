@@ -1,6 +1,5 @@
 import streamlit as st
 import json
-import time
 import os
 from dotenv import load_dotenv
 
@@ -14,13 +13,36 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
+# ── Model warm-up ──────────────────────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def warm_up_models():
+    """Preloads the Ollama models once per server process, in the background."""
+    from app.registry import start_warm_up
+
+    return start_warm_up()
+
+
+warm_up_models()
+
+
+# ── Background pipeline runner ─────────────────────────────────────────────────
+@st.cache_resource(show_spinner=False)
+def job_manager():
+    """
+    One worker pool per server process, shared by all sessions.
+
+    Pipelines run on its threads, not in the script thread, so reruns only
+    render progress. Sessions submitting the same post follow one run, and
+    finished results are reused for a while (see app.jobs.JobManager).
+    """
+    from app.jobs import JobManager
+
+    return JobManager()
+
+
 # ── Session state defaults ─────────────────────────────────────────────────────
-if "pipeline_running" not in st.session_state:
-    st.session_state.pipeline_running = False
-if "pipeline_done" not in st.session_state:
-    st.session_state.pipeline_done = False
-if "pipeline_result" not in st.session_state:
-    st.session_state.pipeline_result = None
+if "job_id" not in st.session_state:
+    st.session_state.job_id = None
 if "submitted_url" not in st.session_state:
     st.session_state.submitted_url = ""
 
@@ -582,61 +604,62 @@ def render_status_bar(url: str, done: bool = False):
     """, unsafe_allow_html=True)
 
 
-def run_pipeline_with_progress(url: str):
-    """Run the full pipeline, updating the animated log after each node."""
-    from app.state import initial_state
-    from app.agents.validator import validate_url
-    from app.agents.metadata_agent import extract_metadata
-    from app.agents.content_agent import extract_content
-    from app.agents.json_agent import build_structured_json
-    from app.agents.llm_agent import run_llm_analysis
-    from app.agents.story_agent import run_story_writer
+# (graph node, icon, label, description) in graph order
+STEPS = [
+    ("validate_url",     "🔗", "URL Validation",       "Verifying Reddit URL format & accessibility"),
+    ("fetch_post",       "📥", "Post Fetch",           "Downloading the thread once for all extractors"),
+    ("extract_metadata", "📡", "Metadata Extraction",  "Pulling post title, upvotes, author, subreddit"),
+    ("extract_content",  "📄", "Content Extraction",   "Scraping and cleaning body text"),
+    ("extract_comments", "💬", "Comment Extraction",   "Selecting top comments by score"),
+    ("build_json",       "🗂️", "JSON Structuring",     "Normalising data into structured payload"),
+    ("llm_analysis",     "🤖", "LLM Analysis",         "Running local model — summarising & analysing"),
+    ("story_writer",     "✍️", "Story Writer",          "Generating narrative from analysis"),
+]
 
-    STEPS = [
-        ("🔗", "URL Validation",       "Verifying Reddit URL format & accessibility"),
-        ("📡", "Metadata Extraction",  "Pulling post title, upvotes, author, subreddit"),
-        ("📄", "Content Extraction",   "Scraping body text and top comments"),
-        ("🗂️", "JSON Structuring",     "Normalising data into structured payload"),
-        ("🤖", "LLM Analysis",         "Running local model — summarising & analysing"),
-        ("✍️", "Story Writer",          "Generating narrative from analysis"),
-    ]
 
-    stages = [(icon, label, "pending", None) for icon, label, _ in STEPS]
-    placeholder = st.empty()
+@st.fragment(run_every=0.5)
+def render_job_progress(job_id: str):
+    """
+    Re-renders the pipeline log and the streaming LLM text from the job's
+    progress every half second; only this fragment reruns, and the script
+    thread never waits on the pipeline. Switches to the result view once
+    the job has finished.
+    """
+    job = job_manager().get(job_id)
+    if job is None:
+        st.rerun()
+    snapshot = job.snapshot()
 
-    def refresh(idx, status, elapsed=None):
-        stages[idx] = (STEPS[idx][0], STEPS[idx][1], status, elapsed)
-        with placeholder.container():
-            render_pipeline_log(stages)
+    stages = []
+    for node, icon, label, _ in STEPS:
+        entry = snapshot["nodes"].get(node, {})
+        stages.append((icon, label, entry.get("status", "pending"), entry.get("elapsed")))
+    render_pipeline_log(stages)
 
-    def run_step(idx, fn, state):
-        refresh(idx, "running")
-        t0 = time.perf_counter()
-        result = fn(state)
-        elapsed = time.perf_counter() - t0
-        refresh(idx, "error" if result.get("error") else "done", elapsed)
-        return result
+    for node, text in snapshot["text"].items():
+        if node in LIVE_PANELS and snapshot["nodes"].get(node, {}).get("status") == "running":
+            render_live_text(node, text)
 
-    state = initial_state(url)
+    if job.finished:
+        st.rerun()
 
-    state = run_step(0, validate_url, state)
-    if state.get("error") or not state.get("is_valid"):
-        return state
 
-    state = run_step(1, extract_metadata, state)
-    if state.get("error"): return state
+LIVE_PANELS = {
+    "llm_analysis": ("LLM Analysis", "analysis-output"),
+    "story_writer": ("Generated Story", "story-output"),
+}
 
-    state = run_step(2, extract_content, state)
-    if state.get("error"): return state
 
-    state = run_step(3, build_structured_json, state)
-    if state.get("error"): return state
+def render_text_panel(label: str, text: str, css_class: str):
+    st.markdown(f'<div class="panel-label">{label}</div>', unsafe_allow_html=True)
+    st.markdown(f'<div class="result-panel"><div class="{css_class}">{text}</div></div>',
+                unsafe_allow_html=True)
 
-    state = run_step(4, run_llm_analysis, state)
-    if state.get("error"): return state
 
-    state = run_step(5, run_story_writer, state)
-    return state
+def render_live_text(node: str, text: str):
+    """Render LLM output while it is still streaming in."""
+    label, css_class = LIVE_PANELS[node]
+    render_text_panel(f"{label} · streaming", text + " ▌", css_class)
 
 
 def render_results(result: dict):
@@ -654,9 +677,7 @@ def render_results(result: dict):
     with tab_story:
         story = result.get("story", "")
         if story:
-            st.markdown('<div class="panel-label">Generated Story</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="result-panel"><div class="story-output">{story}</div></div>',
-                        unsafe_allow_html=True)
+            render_text_panel("Generated Story", story, "story-output")
             st.download_button(
                 label="⬇  Download Story (.txt)",
                 data=story,
@@ -669,9 +690,7 @@ def render_results(result: dict):
     with tab_analysis:
         analysis = result.get("llm_response", "")
         if analysis:
-            st.markdown('<div class="panel-label">LLM Analysis</div>', unsafe_allow_html=True)
-            st.markdown(f'<div class="result-panel"><div class="analysis-output">{analysis}</div></div>',
-                        unsafe_allow_html=True)
+            render_text_panel("LLM Analysis", analysis, "analysis-output")
         else:
             st.markdown('<div class="error-box">No analysis available.</div>', unsafe_allow_html=True)
 
@@ -697,8 +716,20 @@ model_name = os.getenv("OLLAMA_MODEL_CLOUD", "")
 base_url_env = os.getenv("OLLAMA_CLOUD_BASE_URL", "")
 
 # ── State-driven layout ────────────────────────────────────────────────────────
-is_running = st.session_state.pipeline_running
-is_done    = st.session_state.pipeline_done
+job = job_manager().get(st.session_state.job_id) if st.session_state.job_id else None
+is_running = job is not None and not job.finished
+is_done    = job is not None and job.finished
+
+
+def reset_button():
+    st.markdown('<div class="reset-btn">', unsafe_allow_html=True)
+    if st.button("↺  New URL", key="reset_btn"):
+        # A running job keeps going in the background; its result stays cached
+        st.session_state.job_id        = None
+        st.session_state.submitted_url = ""
+        st.rerun()
+    st.markdown('</div>', unsafe_allow_html=True)
+
 
 # ── Show URL input only when idle ──────────────────────────────────────────────
 if not is_running and not is_done:
@@ -730,11 +761,17 @@ if not is_running and not is_done:
             st.markdown('<div class="error-box">⚠ Please enter a Reddit post URL.</div>',
                         unsafe_allow_html=True)
         else:
-            st.session_state.submitted_url    = url.strip()
-            st.session_state.pipeline_running = True
-            st.session_state.pipeline_done    = False
-            st.session_state.pipeline_result  = None
-            st.rerun()
+            from app.jobs import QueueFull
+
+            try:
+                job_id = job_manager().submit(url.strip()).id
+            except QueueFull:
+                st.markdown('<div class="error-box">⚠ The server is busy — please try again in a minute.</div>',
+                            unsafe_allow_html=True)
+            else:
+                st.session_state.submitted_url = url.strip()
+                st.session_state.job_id        = job_id
+                st.rerun()
 
     else:
         # ── Empty state ──────────────────────────────────────────────────────
@@ -759,35 +796,28 @@ if not is_running and not is_done:
 # ── Running state ──────────────────────────────────────────────────────────────
 elif is_running:
     submitted = st.session_state.submitted_url
-    render_status_bar(submitted, done=False)
 
-    st.markdown('<div class="panel-label">Pipeline</div>', unsafe_allow_html=True)
-    result = run_pipeline_with_progress(submitted)
+    col_status, col_reset = st.columns([5, 1])
+    with col_status:
+        render_status_bar(submitted, done=False)
+    with col_reset:
+        reset_button()
 
-    st.session_state.pipeline_result  = result
-    st.session_state.pipeline_running = False
-    st.session_state.pipeline_done    = True
-    st.rerun()
+    st.markdown('<div class="panel-label">Pipeline</div>', unsafe_allow_html=True)
+    render_job_progress(job.id)
 
 
 # ── Done state ─────────────────────────────────────────────────────────────────
 elif is_done:
     submitted = st.session_state.submitted_url
-    result    = st.session_state.pipeline_result
+    result    = job.result
 
     # Compact status + reset button side by side
     col_status, col_reset = st.columns([5, 1])
     with col_status:
         render_status_bar(submitted, done=True)
     with col_reset:
-        st.markdown('<div class="reset-btn">', unsafe_allow_html=True)
-        if st.button("↺  New URL", key="reset_btn"):
-            st.session_state.pipeline_running = False
-            st.session_state.pipeline_done    = False
-            st.session_state.pipeline_result  = None
-            st.session_state.submitted_url    = ""
-            st.rerun()
-        st.markdown('</div>', unsafe_allow_html=True)
+        reset_button()
 
     if result and result.get("error"):
         st.markdown(